@@ -0,0 +1,68 @@
+"""rbac_association_unique
+
+Revision ID: 3e7a0c9b4f12
+Revises: 8d3f6b2a1c57
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3e7a0c9b4f12"
+down_revision: Union[str, Sequence[str], None] = "8d3f6b2a1c57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Make role_permissions / user_roles pairs unique."""
+    # 去除重复的关联行（保留最早的一行）
+    op.execute(
+        """
+        DELETE FROM role_permissions a
+        USING role_permissions b
+        WHERE a.role_id = b.role_id
+          AND a.permission_id = b.permission_id
+          AND a.id > b.id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM user_roles a
+        USING user_roles b
+        WHERE a.user_id = b.user_id AND a.role_id = b.role_id AND a.id > b.id
+        """
+    )
+
+    # 唯一索引取代原来的 (role_id, permission_id) 普通索引
+    op.drop_index("idx_rbac_permission_chain", table_name="role_permissions")
+    op.create_index(
+        "uq_role_permissions_role_id_permission_id",
+        "role_permissions",
+        ["role_id", "permission_id"],
+        unique=True,
+    )
+    op.create_index(
+        "uq_user_roles_user_id_role_id",
+        "user_roles",
+        ["user_id", "role_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Restore non-unique association indexes."""
+    op.drop_index("uq_user_roles_user_id_role_id", table_name="user_roles")
+    op.drop_index(
+        "uq_role_permissions_role_id_permission_id", table_name="role_permissions"
+    )
+    op.create_index(
+        "idx_rbac_permission_chain",
+        "role_permissions",
+        ["role_id", "permission_id"],
+        unique=False,
+    )
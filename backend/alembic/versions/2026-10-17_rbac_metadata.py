@@ -0,0 +1,37 @@
+"""rbac_metadata
+
+Revision ID: 8d3f6b2a1c57
+Revises: 5c1e7a9d2b40
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d3f6b2a1c57"
+down_revision: Union[str, Sequence[str], None] = "5c1e7a9d2b40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create rbac_metadata table."""
+    op.create_table(
+        "rbac_metadata",
+        sa.Column("key", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.String(length=128), nullable=False),
+        sa.Column(
+            "updated_at", sa.DateTime(), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("key", name=op.f("pk_rbac_metadata")),
+    )
+
+
+def downgrade() -> None:
+    """Drop rbac_metadata table."""
+    op.drop_table("rbac_metadata")
@@ -0,0 +1,80 @@
+"""role_inheritance
+
+Revision ID: 6b1d4e8f2a93
+Revises: 3e7a0c9b4f12
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6b1d4e8f2a93"
+down_revision: Union[str, Sequence[str], None] = "3e7a0c9b4f12"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create role_parents and role_closure tables."""
+    op.create_table(
+        "role_parents",
+        sa.Column("role_id", sa.Integer(), nullable=False),
+        sa.Column("parent_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["role_id"],
+            ["roles.id"],
+            name=op.f("fk_role_parents_role_id_roles"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["parent_id"],
+            ["roles.id"],
+            name=op.f("fk_role_parents_parent_id_roles"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("role_id", "parent_id", name=op.f("pk_role_parents")),
+    )
+    op.create_index(
+        op.f("ix_role_parents_parent_id"), "role_parents", ["parent_id"], unique=False
+    )
+
+    op.create_table(
+        "role_closure",
+        sa.Column("ancestor_id", sa.Integer(), nullable=False),
+        sa.Column("descendant_id", sa.Integer(), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["ancestor_id"],
+            ["roles.id"],
+            name=op.f("fk_role_closure_ancestor_id_roles"),
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["descendant_id"],
+            ["roles.id"],
+            name=op.f("fk_role_closure_descendant_id_roles"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "ancestor_id", "descendant_id", name=op.f("pk_role_closure")
+        ),
+    )
+    op.create_index(
+        "ix_role_closure_descendant_ancestor",
+        "role_closure",
+        ["descendant_id", "ancestor_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Drop role_parents and role_closure tables."""
+    op.drop_index("ix_role_closure_descendant_ancestor", table_name="role_closure")
+    op.drop_table("role_closure")
+    op.drop_index(op.f("ix_role_parents_parent_id"), table_name="role_parents")
+    op.drop_table("role_parents")
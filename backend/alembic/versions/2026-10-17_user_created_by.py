@@ -0,0 +1,44 @@
+"""user_created_by
+
+Revision ID: 9c2e5a7d1b84
+Revises: 6b1d4e8f2a93
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2e5a7d1b84"
+down_revision: Union[str, Sequence[str], None] = "6b1d4e8f2a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add users.created_by_id for the user:read@created row scope."""
+    op.add_column("users", sa.Column("created_by_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        op.f("fk_users_created_by_id_users"),
+        "users",
+        "users",
+        ["created_by_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        op.f("ix_users_created_by_id"), "users", ["created_by_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drop users.created_by_id."""
+    op.drop_index(op.f("ix_users_created_by_id"), table_name="users")
+    op.drop_constraint(
+        op.f("fk_users_created_by_id_users"), "users", type_="foreignkey"
+    )
+    op.drop_column("users", "created_by_id")
@@ -0,0 +1,136 @@
+"""
+JWT 编解码后端基准测试
+
+对每个可用的 TokenCodec 后端测量签发/验证吞吐量（ops/s）以及每个令牌的内存分配峰值，
+用于根据实测数据选择 TOKEN_CODEC。
+
+用法（在 backend 目录下）:
+    python -m scripts.benchmark_token_codecs
+    python -m scripts.benchmark_token_codecs --algorithms HS256,RS256,ES256 -n 20000
+
+RS*/ES* 使用临时生成的密钥，不读取 JWT_KEYS_DIR。
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+from src.auth import keys
+from src.auth.codecs import CODECS, TokenCodec, create_codec
+from src.auth.keys import SYMMETRIC_ALGORITHMS
+from src.config import settings
+
+_CURVES = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}
+
+
+def _signing_keys(algorithm: str, keys_dir: Path) -> keys.SigningKeys:
+    settings.ALGORITHM = algorithm
+    if algorithm not in SYMMETRIC_ALGORITHMS:
+        if algorithm in _CURVES:
+            private_key = ec.generate_private_key(_CURVES[algorithm])
+        else:
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        kid = f"bench-{algorithm.lower()}"
+        algorithm_dir = keys_dir / algorithm
+        algorithm_dir.mkdir()
+        (algorithm_dir / f"{kid}.pem").write_bytes(
+            private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+        settings.JWT_KEYS_DIR = str(algorithm_dir)
+        settings.JWT_ACTIVE_KID = kid
+    return keys.load_signing_keys()
+
+
+def _claims() -> dict:
+    now = time.time()
+    # 与 create_access_token 签发的声明结构一致
+    return {
+        "uid": 1,
+        "rid": [1, 2],
+        "ver": 1700000000000000,
+        "exp": int(now) + 1800,
+        "iat": now,
+        "sub": "benchmark_user",
+        "jti": uuid.uuid4().hex,
+    }
+
+
+def _ops_per_second(func, args: list, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(args[i % len(args)])
+    return iterations / (time.perf_counter() - start)
+
+
+def _peak_bytes_per_op(func, args: list, samples: int) -> float:
+    total = 0
+    tracemalloc.start()
+    try:
+        for i in range(samples):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            func(args[i % len(args)])
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - baseline
+    finally:
+        tracemalloc.stop()
+    return total / samples
+
+
+def benchmark(codec: TokenCodec, iterations: int, samples: int) -> dict:
+    claims = [_claims() for _ in range(100)]
+    tokens = [codec.encode(c) for c in claims]
+    for token in tokens:  # 预热
+        codec.decode(token)
+
+    return {
+        "encode_ops": _ops_per_second(codec.encode, claims, iterations),
+        "decode_ops": _ops_per_second(codec.decode, tokens, iterations),
+        "encode_bytes": _peak_bytes_per_op(codec.encode, claims, samples),
+        "decode_bytes": _peak_bytes_per_op(codec.decode, tokens, samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JWT 编解码后端基准测试")
+    parser.add_argument(
+        "--algorithms", default="HS256", help="逗号分隔，如 HS256,RS256"
+    )
+    parser.add_argument("--codecs", default=",".join(CODECS), help="逗号分隔")
+    parser.add_argument("-n", "--iterations", type=int, default=10000)
+    parser.add_argument("--samples", type=int, default=500, help="内存分配采样次数")
+    args = parser.parse_args()
+
+    print(
+        f"{'codec':<8} {'alg':<6} {'encode ops/s':>13} {'decode ops/s':>13} "
+        f"{'encode B/op':>12} {'decode B/op':>12}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for algorithm in args.algorithms.split(","):
+            signing_keys = _signing_keys(algorithm.strip(), Path(tmp))
+            for name in args.codecs.split(","):
+                try:
+                    codec = create_codec(name.strip(), signing_keys)
+                except RuntimeError as e:
+                    print(f"{name:<8} {algorithm:<6} 跳过: {e}")
+                    continue
+                result = benchmark(codec, args.iterations, args.samples)
+                print(
+                    f"{name:<8} {algorithm:<6} {result['encode_ops']:>13,.0f} "
+                    f"{result['decode_ops']:>13,.0f} {result['encode_bytes']:>12,.0f} "
+                    f"{result['decode_bytes']:>12,.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+API 密钥
+
+供服务账号等机器客户端使用的长期凭证，通过 X-API-Key 请求头传递，
+get_current_user 将其作为 Bearer 令牌之外的另一种认证方式。
+
+- 密钥格式为 sk_<随机串>，只在创建时返回一次明文
+- 数据库只保存 HMAC-SHA256(pepper, 密钥) 的十六进制摘要，校验只需一次哈希和一次索引查询，
+  不涉及 bcrypt 或 JWT
+- 密钥绑定到用户：权限即该用户的角色权限。需要按角色授权的机器客户端，
+  可创建一个仅分配了相应角色的服务账号用户
+- 管理密钥（创建/列出/吊销）只接受 Bearer 令牌，泄露的密钥不能为自己签发新密钥；
+  修改密码和退出所有设备时吊销该用户的全部密钥
+- 校验结果在进程内缓存（未知密钥短暂负缓存），吊销密钥或用户变更时通过消息总线跨 worker 失效；
+  消息总线未在监听时不使用缓存
+"""
+
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import models
+from src.auth.constants import API_KEY_INVALIDATION_CHANNEL, USER_INVALIDATION_CHANNEL
+from src.config import settings
+from src.pubsub import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+API_KEY_PREFIX = "sk_"
+
+
+@dataclass(frozen=True, slots=True)
+class ApiKeyIdentity:
+    """API 密钥对应的认证身份"""
+
+    key_id: int
+    user_id: int
+    username: str
+    expires_at: datetime | None
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at <= _utcnow()
+
+
+def _utcnow() -> datetime:
+    # 与数据库中不带时区的时间戳保持一致（UTC）
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def hash_api_key(api_key: str) -> str:
+    pepper = settings.API_KEY_PEPPER or settings.SECRET_KEY
+    return hmac.new(pepper.encode(), api_key.encode(), hashlib.sha256).hexdigest()
+
+
+class ApiKeyCache:
+    """密钥摘要 -> 身份 的进程内 LRU 缓存（含未知密钥的负缓存）"""
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # key_hash -> (identity 或 None, expires_at)
+        self._entries: OrderedDict[str, tuple[ApiKeyIdentity | None, float]] = (
+            OrderedDict()
+        )
+        self.generation = 0
+
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return invalidation_bus.is_listening
+
+    def get(self, key_hash: str) -> tuple[bool, ApiKeyIdentity | None]:
+        """返回 (是否命中, 身份)；命中且身份为 None 表示已知无效"""
+        if not self.enabled:
+            return False, None
+        entry = self._entries.get(key_hash)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key_hash]
+            self._misses += 1
+            return False, None
+        self._entries.move_to_end(key_hash)
+        self._hits += 1
+        return True, entry[0]
+
+    def put(
+        self, key_hash: str, identity: ApiKeyIdentity | None, generation: int
+    ) -> None:
+        if not self.enabled or generation != self.generation:
+            return
+        ttl = self.ttl if identity is not None else self.negative_ttl
+        self._entries[key_hash] = (identity, time.monotonic() + ttl)
+        self._entries.move_to_end(key_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_key(self, key_hash: str) -> None:
+        self.generation += 1
+        self._entries.pop(key_hash, None)
+
+    def invalidate_user(self, message: str) -> None:
+        """用户被更新或删除：丢弃该用户的所有密钥（用户变更很少，线性扫描即可）"""
+        user_id = int(message)
+        self.generation += 1
+        for key_hash, (identity, _) in list(self._entries.items()):
+            if identity is not None and identity.user_id == user_id:
+                del self._entries[key_hash]
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    async def on_resync(self, redis_client) -> None:
+        self.clear()
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+        }
+
+
+api_key_cache = ApiKeyCache(
+    max_entries=settings.API_KEY_CACHE_MAX_ENTRIES,
+    ttl=settings.API_KEY_CACHE_TTL_SECONDS,
+    negative_ttl=settings.API_KEY_CACHE_NEGATIVE_TTL_SECONDS,
+)
+invalidation_bus.subscribe(API_KEY_INVALIDATION_CHANNEL, api_key_cache.invalidate_key)
+invalidation_bus.subscribe(USER_INVALIDATION_CHANNEL, api_key_cache.invalidate_user)
+invalidation_bus.on_resync(api_key_cache.on_resync)
+
+
+async def authenticate_api_key(db: AsyncSession, api_key: str) -> ApiKeyIdentity | None:
+    """校验 API 密钥，无效、已吊销或已过期时返回 None"""
+    if not api_key.startswith(API_KEY_PREFIX) or len(api_key) > 128:
+        return None
+
+    key_hash = hash_api_key(api_key)
+    hit, identity = api_key_cache.get(key_hash)
+    if not hit:
+        generation = api_key_cache.generation
+        result = await db.execute(
+            select(
+                models.ApiKey.id,
+                models.ApiKey.expires_at,
+                models.User.id,
+                models.User.username,
+            )
+            .join(models.User, models.User.id == models.ApiKey.user_id)
+            .where(
+                models.ApiKey.key_hash == key_hash,
+                models.ApiKey.revoked_at.is_(None),
+            )
+        )
+        row = result.one_or_none()
+        identity = None
+        if row is not None:
+            key_id, expires_at, user_id, username = row
+            identity = ApiKeyIdentity(
+                key_id=key_id,
+                user_id=user_id,
+                username=username,
+                expires_at=expires_at,
+            )
+        api_key_cache.put(key_hash, identity, generation)
+
+    if identity is None or identity.is_expired():
+        return None
+    return identity
+
+
+async def create_api_key(
+    db: AsyncSession, user_id: int, name: str, expires_in_days: int | None = None
+) -> tuple[models.ApiKey, str]:
+    """创建 API 密钥，返回 (记录, 密钥明文)；明文只在此时可见"""
+    api_key = f"{API_KEY_PREFIX}{secrets.token_urlsafe(32)}"
+    expires_at = (
+        _utcnow() + timedelta(days=expires_in_days) if expires_in_days else None
+    )
+    db_key = models.ApiKey(
+        user_id=user_id,
+        name=name,
+        prefix=api_key[:12],
+        key_hash=hash_api_key(api_key),
+        expires_at=expires_at,
+    )
+    db.add(db_key)
+    await db.commit()
+    await db.refresh(db_key)
+    return db_key, api_key
+
+
+async def list_api_keys(db: AsyncSession, user_id: int) -> list[models.ApiKey]:
+    result = await db.execute(
+        select(models.ApiKey)
+        .where(models.ApiKey.user_id == user_id)
+        .order_by(models.ApiKey.created_at.desc())
+    )
+    return list(result.scalars().all())
+
+
+async def revoke_api_key(db: AsyncSession, user_id: int, key_id: int) -> bool:
+    """吊销用户的 API 密钥，密钥不存在或已吊销时返回 False"""
+    result = await db.execute(
+        update(models.ApiKey)
+        .where(
+            models.ApiKey.id == key_id,
+            models.ApiKey.user_id == user_id,
+            models.ApiKey.revoked_at.is_(None),
+        )
+        .values(revoked_at=_utcnow())
+        .returning(models.ApiKey.key_hash)
+    )
+    key_hash = result.scalar_one_or_none()
+    if key_hash is None:
+        return False
+    await db.commit()
+
+    await _publish_key_invalidations([key_hash])
+    return True
+
+
+async def revoke_user_api_keys(db: AsyncSession, user_id: int) -> int:
+    """吊销用户的全部 API 密钥（修改密码、退出所有设备时），返回吊销数量"""
+    result = await db.execute(
+        update(models.ApiKey)
+        .where(
+            models.ApiKey.user_id == user_id,
+            models.ApiKey.revoked_at.is_(None),
+        )
+        .values(revoked_at=_utcnow())
+        .returning(models.ApiKey.key_hash)
+    )
+    key_hashes = list(result.scalars().all())
+    if not key_hashes:
+        return 0
+    await db.commit()
+
+    await _publish_key_invalidations(key_hashes)
+    return len(key_hashes)
+
+
+async def _publish_key_invalidations(key_hashes: list[str]) -> None:
+    from src.redis_client import get_redis_client
+
+    try:
+        async for redis_client in get_redis_client():
+            for key_hash in key_hashes:
+                await invalidation_bus.publish(
+                    redis_client, API_KEY_INVALIDATION_CHANNEL, key_hash
+                )
+    except Exception as e:
+        logger.warning(f"广播 API 密钥失效消息失败: {e}")
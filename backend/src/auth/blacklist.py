@@ -1,32 +1,159 @@
-from datetime import timedelta
+"""
+JWT 吊销（黑名单）管理
+
+令牌通过 jti 吊销，Redis 中只保存 blacklist:jti:<jti>，过期时间为令牌的剩余有效期。
+
+每个 worker 维护一个已吊销 jti 的 Bloom 过滤器，并通过 Redis pub/sub 与其他
+worker 保持同步。绝大多数请求携带的是未吊销的令牌，Bloom 过滤器可以确定地
+给出“未吊销”的结论，无需访问 Redis；只有过滤器命中时才到 Redis 确认。
+消息总线未在监听时（如启动中或断线），回退为每次都查询 Redis。
+"""
+
+import hashlib
+import math
+import time
 
 import redis.asyncio as redis
-from src.auth.constants import REDIS_BLACKLIST_PREFIX
 
+from src.auth.constants import (
+    REDIS_BLACKLIST_JTI_PREFIX,
+    REDIS_BLACKLIST_PREFIX,
+    REVOCATION_CHANNEL,
+)
+from src.config import settings
+from src.pubsub import invalidation_bus
+
+
+class BloomFilter:
+    """固定容量的 Bloom 过滤器（无假阴性，假阳性率由容量和目标误判率决定）"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationFilter:
+    """进程内已吊销 jti 集合（Bloom 过滤器 + 定期从 Redis 重建）"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._bloom = BloomFilter(capacity, error_rate)
+        # 重建期间收到的 jti，重建完成后补充到新过滤器中
+        self._pending: list[str] | None = None
 
-async def add_token_to_blacklist(
-    redis_client: redis.Redis, token: str, expires_in: timedelta
-):
+        self._filtered = 0
+        self._redis_checks = 0
+        self._false_positives = 0
+
+    def add(self, jti: str) -> None:
+        self._bloom.add(jti)
+        if self._pending is not None:
+            self._pending.append(jti)
+
+    async def is_revoked(self, redis_client: redis.Redis, jti: str) -> bool:
+        """过滤器未命中即确定未吊销；命中（或尚未同步）时到 Redis 确认"""
+        synced = invalidation_bus.is_listening
+        if synced and jti not in self._bloom:
+            self._filtered += 1
+            return False
+
+        self._redis_checks += 1
+        revoked = bool(await redis_client.exists(f"{REDIS_BLACKLIST_JTI_PREFIX}{jti}"))
+        if synced and not revoked:
+            self._false_positives += 1
+        return revoked
+
+    async def rebuild(self, redis_client: redis.Redis) -> None:
+        """从 Redis 中仍然有效的吊销记录重建过滤器（同时清除已过期的条目）"""
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        self._pending = []
+        try:
+            async for key in redis_client.scan_iter(
+                match=f"{REDIS_BLACKLIST_JTI_PREFIX}*", count=1000
+            ):
+                bloom.add(key[len(REDIS_BLACKLIST_JTI_PREFIX) :])
+            for jti in self._pending:
+                bloom.add(jti)
+            self._bloom = bloom
+        finally:
+            self._pending = None
+
+    def stats(self) -> dict:
+        return {
+            "synced": invalidation_bus.is_listening,
+            "entries": self._bloom.count,
+            "capacity": self.capacity,
+            "filtered": self._filtered,
+            "redis_checks": self._redis_checks,
+            "false_positives": self._false_positives,
+        }
+
+
+revocation_filter = RevocationFilter(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+)
+invalidation_bus.subscribe(REVOCATION_CHANNEL, revocation_filter.add)
+invalidation_bus.on_resync(revocation_filter.rebuild)
+
+
+async def add_token_to_blacklist(redis_client: redis.Redis, payload: dict) -> None:
     """
-    Adds a token to the blacklist with an expiration time.
+    Revokes a token by its jti until the token expires naturally.
 
     Args:
         redis_client: Redis client instance
-        token: JWT token to blacklist
-        expires_in: Time until the token expires naturally
+        payload: Decoded token payload (must contain jti and exp)
     """
-    await redis_client.set(f"{REDIS_BLACKLIST_PREFIX}{token}", "true", ex=expires_in)
+    jti = payload.get("jti")
+    expires_in = int(payload.get("exp", 0) - time.time())
+    if not jti or expires_in <= 0:
+        return
 
+    await redis_client.set(f"{REDIS_BLACKLIST_JTI_PREFIX}{jti}", "1", ex=expires_in)
+    await invalidation_bus.publish(redis_client, REVOCATION_CHANNEL, jti)
 
-async def is_token_blacklisted(redis_client: redis.Redis, token: str) -> bool:
+
+async def is_token_blacklisted(
+    redis_client: redis.Redis, token: str, payload: dict
+) -> bool:
     """
-    Checks if a token is in the blacklist.
+    Checks if a token has been revoked.
 
     Args:
         redis_client: Redis client instance
-        token: JWT token to check
+        token: Raw JWT (only used for tokens issued without a jti)
+        payload: Decoded token payload
 
     Returns:
-        bool: True if token is blacklisted, False otherwise
+        bool: True if token is revoked, False otherwise
     """
-    return await redis_client.exists(f"{REDIS_BLACKLIST_PREFIX}{token}")
+    jti = payload.get("jti")
+    if not jti:
+        # 兼容升级前签发、不含 jti 的令牌
+        return bool(await redis_client.exists(f"{REDIS_BLACKLIST_PREFIX}{token}"))
+
+    return await revocation_filter.is_revoked(redis_client, jti)
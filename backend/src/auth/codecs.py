@@ -0,0 +1,214 @@
+"""
+JWT 编解码后端
+
+create_access_token / decode_and_verify_token 通过 TokenCodec 接口编解码令牌，
+具体实现由 TOKEN_CODEC 配置选择：
+
+- jose: python-jose（默认，支持全部已配置算法）
+- pyjwt: PyJWT（可选依赖，需要 pip install "pyjwt[crypto]"）
+- native: 基于标准库 hmac 的实现，仅支持 HS256/HS384/HS512
+
+各后端签发的令牌格式相同，可以互相验证。
+切换前可以运行 python -m scripts.benchmark_token_codecs 比较各后端的吞吐量和内存分配。
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
+
+from jose import JWTError, jwt
+
+from src.auth import keys
+from src.auth.keys import SYMMETRIC_ALGORITHMS, SigningKeys
+from src.config import settings
+
+
+class InvalidTokenError(Exception):
+    """令牌格式、签名或声明无效"""
+
+
+class TokenCodec(ABC):
+    """JWT 编解码接口"""
+
+    name: str
+
+    def __init__(self, signing_keys: SigningKeys):
+        self.signing_keys = signing_keys
+
+    @abstractmethod
+    def encode(self, claims: dict) -> str:
+        """签发令牌（claims 中的时间均为数值时间戳）"""
+
+    @abstractmethod
+    def decode(self, token: str) -> dict:
+        """
+        验证签名和时间声明（exp/nbf/iat）并返回载荷
+
+        Raises:
+            InvalidTokenError: 令牌无效
+        """
+
+
+class JoseCodec(TokenCodec):
+    name = "jose"
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(
+            claims,
+            self.signing_keys.signing_key,
+            algorithm=self.signing_keys.algorithm,
+            headers=self.signing_keys.headers,
+        )
+
+    def decode(self, token: str) -> dict:
+        try:
+            return jwt.decode(
+                token,
+                self.signing_keys.verification_key(token),
+                algorithms=[self.signing_keys.algorithm],
+            )
+        except JWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+
+class PyJWTCodec(TokenCodec):
+    name = "pyjwt"
+
+    def __init__(self, signing_keys: SigningKeys):
+        try:
+            import jwt as pyjwt
+        except ImportError as e:
+            raise RuntimeError(
+                "TOKEN_CODEC=pyjwt 需要安装 PyJWT: uv sync --extra pyjwt"
+                '（或 pip install "pyjwt[crypto]"）'
+            ) from e
+
+        super().__init__(signing_keys)
+        self._pyjwt = pyjwt
+        # jose 的 Key 对象内部持有 cryptography 密钥，PyJWT 可以直接使用
+        self._signing_key = getattr(
+            signing_keys.signing_key, "prepared_key", signing_keys.signing_key
+        )
+        self._verification_keys = {
+            kid: key.prepared_key for kid, key in signing_keys.verification_keys.items()
+        }
+
+    def encode(self, claims: dict) -> str:
+        return self._pyjwt.encode(
+            claims,
+            self._signing_key,
+            algorithm=self.signing_keys.algorithm,
+            headers=self.signing_keys.headers,
+        )
+
+    def decode(self, token: str) -> dict:
+        try:
+            key = self._signing_key
+            if self._verification_keys:
+                kid = self._pyjwt.get_unverified_header(token).get("kid")
+                key = self._verification_keys.get(kid)
+                if key is None:
+                    raise InvalidTokenError(f"Unknown key id: {kid}")
+            return self._pyjwt.decode(
+                token, key, algorithms=[self.signing_keys.algorithm]
+            )
+        except self._pyjwt.PyJWTError as e:
+            raise InvalidTokenError(str(e)) from e
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+class NativeHMACCodec(TokenCodec):
+    """标准库实现的 HS256/HS384/HS512，省去通用 JWS 库的密钥构造与多算法分派"""
+
+    name = "native"
+
+    _DIGESTS = {
+        "HS256": hashlib.sha256,
+        "HS384": hashlib.sha384,
+        "HS512": hashlib.sha512,
+    }
+
+    def __init__(self, signing_keys: SigningKeys):
+        if signing_keys.algorithm not in SYMMETRIC_ALGORITHMS:
+            raise RuntimeError(
+                f"TOKEN_CODEC=native 仅支持 HS256/HS384/HS512，当前算法: {signing_keys.algorithm}"
+            )
+        super().__init__(signing_keys)
+        self._key = signing_keys.signing_key.encode()
+        self._digest = self._DIGESTS[signing_keys.algorithm]
+        # 头部固定不变，预先编码
+        self._header = _b64encode(
+            json.dumps(
+                {"alg": signing_keys.algorithm, "typ": "JWT"}, separators=(",", ":")
+            ).encode()
+        )
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        return hmac.new(self._key, signing_input, self._digest).digest()
+
+    def encode(self, claims: dict) -> str:
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = self._header + b"." + payload
+        return (signing_input + b"." + _b64encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict:
+        try:
+            header, payload, signature = token.split(".")
+            if header.encode() != self._header:
+                # 其他库签发的令牌头部字段顺序可能不同
+                alg = json.loads(_b64decode(header)).get("alg")
+                if alg != self.signing_keys.algorithm:
+                    raise InvalidTokenError("The specified alg value is not allowed")
+            expected = self._sign(f"{header}.{payload}".encode())
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                raise InvalidTokenError("Signature verification failed.")
+            claims = json.loads(_b64decode(payload))
+        except (ValueError, binascii.Error, AttributeError) as e:
+            raise InvalidTokenError("Invalid token format") from e
+
+        if not isinstance(claims, dict):
+            raise InvalidTokenError("Invalid payload")
+        self._validate_claims(claims)
+        return claims
+
+    @staticmethod
+    def _validate_claims(claims: dict) -> None:
+        now = time.time()
+        for name in ("exp", "nbf", "iat"):
+            if name in claims and (
+                isinstance(claims[name], bool)
+                or not isinstance(claims[name], (int, float))
+            ):
+                raise InvalidTokenError(f"Invalid {name} claim")
+        if "exp" in claims and claims["exp"] < now:
+            raise InvalidTokenError("Signature has expired.")
+        if "nbf" in claims and claims["nbf"] > now:
+            raise InvalidTokenError("The token is not yet valid (nbf)")
+        if "sub" in claims and not isinstance(claims["sub"], str):
+            raise InvalidTokenError("Subject must be a string.")
+
+
+CODECS: dict[str, type[TokenCodec]] = {
+    JoseCodec.name: JoseCodec,
+    PyJWTCodec.name: PyJWTCodec,
+    NativeHMACCodec.name: NativeHMACCodec,
+}
+
+
+def create_codec(name: str, signing_keys: SigningKeys) -> TokenCodec:
+    """按名称创建编解码后端（后端不可用时抛出 RuntimeError）"""
+    return CODECS[name](signing_keys)
+
+
+token_codec = create_codec(settings.TOKEN_CODEC, keys.signing_keys)
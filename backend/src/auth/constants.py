@@ -1,4 +1,18 @@
 # Auth module constants
 
 # Redis key prefixes
-REDIS_BLACKLIST_PREFIX = "blacklist:"
+REDIS_BLACKLIST_PREFIX = "blacklist:"  # 不含 jti 的旧令牌（按完整 token 吊销）
+REDIS_BLACKLIST_JTI_PREFIX = "blacklist:jti:"
+REDIS_PRINCIPAL_VERSION_PREFIX = "auth:principal_version:"
+REDIS_TOKEN_EPOCH_PREFIX = "auth:tokens_valid_after:"
+REDIS_REFRESH_TOKEN_PREFIX = "auth:refresh:"
+REDIS_REFRESH_FAMILY_PREFIX = "auth:refresh_family:"
+REDIS_LOGIN_FAILURES_PREFIX = "auth:login_failures:"
+REDIS_LOGIN_LOCK_PREFIX = "auth:login_lock:"
+REDIS_LOGIN_STRIKES_PREFIX = "auth:login_strikes:"
+
+# Redis pub/sub 频道
+REVOCATION_CHANNEL = "auth:revocations"
+TOKEN_EPOCH_CHANNEL = "auth:token_epochs"
+USER_INVALIDATION_CHANNEL = "auth:user_invalidations"
+API_KEY_INVALIDATION_CHANNEL = "auth:api_key_invalidations"
@@ -1,11 +1,15 @@
 import redis.asyncio as redis
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth import models, service
+from src.auth import models
+from src.auth.api_keys import authenticate_api_key
 from src.auth.blacklist import is_token_blacklisted
+from src.auth.principal import Principal, principal_from_claims
 from src.auth.security import decode_and_verify_token
+from src.auth.token_epoch import is_token_before_epoch
+from src.auth.user_cache import UserSnapshot, load_user_snapshot
 from src.config import settings
 from src.database import get_async_db
 from src.redis_client import get_redis_client
@@ -13,32 +17,50 @@ from src.redis_client import get_redis_client
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_PREFIX}/auth/token", auto_error=False
 )
+api_key_scheme = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+
+async def _get_api_key_principal(db: AsyncSession, api_key: str) -> Principal:
+    identity = await authenticate_api_key(db, api_key)
+    if identity is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+        )
+    return Principal(id=identity.user_id, username=identity.username)
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
+    api_key: str | None = Depends(api_key_scheme),
     db: AsyncSession = Depends(get_async_db),
     redis_client: redis.Redis = Depends(get_redis_client),
-) -> models.User:
+) -> Principal:
     """
-    Dependency to get the current user from a token.
-    Checks for token validity and blacklist status.
+    Dependency to get the current principal from a token.
+    Checks for token validity, blacklist status and the user's token epoch.
+
+    When the token carries up-to-date principal claims the principal is
+    built from the claims alone; otherwise the user is loaded from the DB.
+    Requests without a bearer token may authenticate with an X-API-Key header.
     """
     if token is None:
+        if api_key is not None:
+            return await _get_api_key_principal(db, api_key)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if await is_token_blacklisted(redis_client, token):
+    payload = decode_and_verify_token(token)
+    if await is_token_blacklisted(redis_client, token, payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    payload = decode_and_verify_token(token)
     username: str = payload.get("sub")
     if username is None:
         raise HTTPException(
@@ -47,7 +69,72 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = await service.get_user_by_username(db, username=username)
+    principal = await principal_from_claims(redis_client, payload)
+    if principal is None:
+        user = await load_user_snapshot(db, username=username)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = Principal(id=user.id, username=user.username)
+
+    if await is_token_before_epoch(redis_client, principal.id, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+async def get_current_bearer_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
+) -> Principal:
+    """
+    Dependency like get_current_user, but API keys are not accepted.
+    Used by endpoints that act on the session itself (logout) or that
+    manage credentials (API keys), so a leaked key cannot mint new keys.
+    """
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Bearer token required",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(token, None, db, redis_client)
+
+
+async def get_current_user_snapshot(
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserSnapshot:
+    """
+    Dependency to get a read-only snapshot of the current user.
+    Served from the in-process user cache when possible.
+    """
+    snapshot = await load_user_snapshot(db, user_id=principal.id)
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return snapshot
+
+
+async def get_current_user_model(
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> models.User:
+    """
+    Dependency to get the current user as an ORM object.
+    Use it only when the endpoint modifies the user row.
+    """
+    user = await db.get(models.User, principal.id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
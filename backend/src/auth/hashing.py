@@ -0,0 +1,236 @@
+"""
+密码哈希服务
+
+bcrypt 是刻意设计的慢哈希（单次约 200-300ms），如果在事件循环中同步执行，
+会阻塞同一 worker 上的所有请求。本模块将哈希与校验放到独立的进程池中执行：
+
+- 进程池在应用启动时预热，避免首个登录请求承担进程创建和 bcrypt 后端加载的开销
+- 通过并发上限 + 有界等待队列控制负载，队列满时直接返回 503，而不是无限堆积
+- 记录队列深度和耗时等指标，便于观察登录高峰期的排队情况
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+
+from src.auth import security
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# 进程池中执行的函数（必须是模块级函数，才能被子进程 pickle 调用）
+# ============================================================================
+
+
+def _hash_in_worker(password: str, rounds: int) -> str:
+    return security.hash_password(password, rounds)
+
+
+def _verify_in_worker(password: str, hashed_password: str) -> bool:
+    return security.verify_password(password, hashed_password)
+
+
+def _warm_up_worker() -> None:
+    # 触发 passlib 加载 bcrypt 后端
+    security.hash_password("warm-up", 4)
+
+
+def _measure_in_worker(rounds: int) -> float:
+    started = time.perf_counter()
+    security.hash_password("calibration-password", rounds)
+    return time.perf_counter() - started
+
+
+# ============================================================================
+# 哈希服务
+# ============================================================================
+
+
+class PasswordHashingService:
+    """基于进程池的异步密码哈希服务"""
+
+    def __init__(self, max_workers: int, max_concurrency: int, max_queue_size: int):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency
+        self.max_queue_size = max_queue_size
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        # 指标
+        self._queued = 0
+        self._in_flight = 0
+        self._max_queue_depth = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._total_wait_seconds = 0.0
+        self._total_run_seconds = 0.0
+        self._max_latency_seconds = 0.0
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # 使用 spawn 避免 fork 继承事件循环、数据库连接等父进程状态
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 信号量绑定到事件循环，事件循环变化时（如测试）需要重新创建
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def start(self) -> None:
+        """创建进程池并预热所有工作进程"""
+        executor = self._ensure_executor()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, _warm_up_worker)
+                for _ in range(self.max_workers)
+            )
+        )
+        logger.info(
+            f"密码哈希进程池已就绪: workers={self.max_workers}, "
+            f"耗时={time.perf_counter() - started:.3f}s"
+        )
+
+    def shutdown(self) -> None:
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func, *args):
+        if self._queued >= self.max_queue_size:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry later",
+                headers={"Retry-After": "1"},
+            )
+
+        enqueued_at = time.perf_counter()
+        self._queued += 1
+        self._max_queue_depth = max(self._max_queue_depth, self._queued)
+        semaphore = self._get_semaphore()
+        try:
+            await semaphore.acquire()
+        finally:
+            self._queued -= 1
+
+        started_at = time.perf_counter()
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._ensure_executor(), func, *args)
+        except BrokenProcessPool:
+            # 工作进程异常退出，丢弃进程池，下次调用时重建
+            self._failed += 1
+            self._executor = None
+            logger.error("密码哈希进程池已损坏，将在下次调用时重建")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is temporarily unavailable",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self._in_flight -= 1
+            semaphore.release()
+            finished_at = time.perf_counter()
+            self._completed += 1
+            self._total_wait_seconds += started_at - enqueued_at
+            self._total_run_seconds += finished_at - started_at
+            self._max_latency_seconds = max(
+                self._max_latency_seconds, finished_at - enqueued_at
+            )
+
+    async def hash(self, password: str) -> str:
+        """计算密码哈希（使用当前 bcrypt cost）"""
+        return await self._run(_hash_in_worker, password, security.get_bcrypt_rounds())
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """校验密码"""
+        return await self._run(_verify_in_worker, password, hashed_password)
+
+    async def calibrate(self, target_ms: int, min_rounds: int, max_rounds: int) -> int:
+        """
+        在工作进程中逐级测量 bcrypt 耗时，返回不超过目标耗时的最大 cost
+
+        cost 每加 1 耗时翻倍，因此从下限开始测量，首次超过目标即停止；
+        即使下限已超过目标耗时，也不会低于安全下限。
+        """
+        chosen = min_rounds
+        for rounds in range(min_rounds, max_rounds + 1):
+            elapsed_ms = await self._run(_measure_in_worker, rounds) * 1000
+            logger.info(f"bcrypt 校准: rounds={rounds}, 耗时={elapsed_ms:.1f}ms")
+            if elapsed_ms > target_ms:
+                break
+            chosen = rounds
+        return chosen
+
+    def stats(self) -> dict:
+        """当前队列深度与耗时指标"""
+        completed = self._completed or 1
+        return {
+            "workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue_size": self.max_queue_size,
+            "queue_depth": self._queued,
+            "max_queue_depth": self._max_queue_depth,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "failed": self._failed,
+            "avg_wait_ms": round(self._total_wait_seconds / completed * 1000, 3),
+            "avg_run_ms": round(self._total_run_seconds / completed * 1000, 3),
+            "max_latency_ms": round(self._max_latency_seconds * 1000, 3),
+        }
+
+
+password_hasher = PasswordHashingService(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    max_queue_size=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def hash_password(password: str) -> str:
+    """异步计算密码哈希（在进程池中执行）"""
+    return await password_hasher.hash(password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """异步校验密码（在进程池中执行）"""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def calibrate_bcrypt_rounds() -> int:
+    """
+    启动时校准 bcrypt cost 并写回 settings.BCRYPT_ROUNDS
+
+    已显式配置 BCRYPT_ROUNDS 时不做校准，直接使用配置值。
+    """
+    if settings.BCRYPT_ROUNDS is None:
+        settings.BCRYPT_ROUNDS = await password_hasher.calibrate(
+            target_ms=settings.BCRYPT_TARGET_MS,
+            min_rounds=settings.BCRYPT_MIN_ROUNDS,
+            max_rounds=settings.BCRYPT_MAX_ROUNDS,
+        )
+    rounds = security.get_bcrypt_rounds()
+    logger.info(f"bcrypt cost: {rounds} (目标耗时 {settings.BCRYPT_TARGET_MS}ms)")
+    return rounds
@@ -0,0 +1,106 @@
+"""
+JWT 签名密钥
+
+HS* 算法使用 SECRET_KEY 签名和验证，令牌不带 kid。
+
+RS*/ES* 算法从 JWT_KEYS_DIR 加载密钥，每个密钥一个 PEM 文件，文件名（不含扩展名）即 kid：
+
+- JWT_ACTIVE_KID 指定的密钥（必须是私钥）用于签名，令牌头部携带其 kid
+- 目录中的所有密钥都用于验证，并以公钥形式发布在 /.well-known/jwks.json
+
+轮换密钥时先放入新私钥并切换 JWT_ACTIVE_KID，待旧令牌全部过期后再移除旧密钥文件
+（也可以只保留旧密钥的公钥 PEM）。下游服务按 kid 从 JWKS 中选择公钥即可在本地验证令牌。
+
+密钥在导入时一次性加载并构造为 jose 的 Key 对象，JWKS 响应体也预先序列化，
+签名、验证和 JWKS 请求都不再重复解析 PEM。
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from jose import JWTError, jwk, jwt
+
+from src.config import settings
+
+SYMMETRIC_ALGORITHMS = frozenset({"HS256", "HS384", "HS512"})
+
+
+@dataclass(frozen=True)
+class SigningKeys:
+    """当前进程使用的签名/验证密钥"""
+
+    algorithm: str
+    signing_key: Any
+    kid: str | None = None
+    # kid -> 验证用公钥（仅非对称算法）
+    verification_keys: dict[str, Any] = field(default_factory=dict)
+    # 预先序列化的 JWKS 响应体
+    jwks: bytes = b'{"keys":[]}'
+
+    @property
+    def headers(self) -> dict | None:
+        """签名时附加的 JWT 头部"""
+        return {"kid": self.kid} if self.kid else None
+
+    def verification_key(self, token: str) -> Any:
+        """
+        按令牌头部的 kid 选择验证密钥
+
+        Raises:
+            JWTError: 令牌头部无法解析或 kid 未知
+        """
+        if not self.verification_keys:
+            return self.signing_key
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.verification_keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown key id: {kid}")
+        return key
+
+
+def _load_asymmetric_keys(algorithm: str) -> SigningKeys:
+    if not settings.JWT_KEYS_DIR or not settings.JWT_ACTIVE_KID:
+        raise RuntimeError(f"{algorithm} 签名需要配置 JWT_KEYS_DIR 和 JWT_ACTIVE_KID")
+
+    verification_keys: dict[str, Any] = {}
+    public_jwks: list[dict] = []
+    signing_key = None
+    for path in sorted(Path(settings.JWT_KEYS_DIR).glob("*.pem")):
+        kid = path.stem
+        key = jwk.construct(path.read_text(), algorithm)
+        public_key = key if key.is_public() else key.public_key()
+        if kid == settings.JWT_ACTIVE_KID:
+            if key.is_public():
+                raise RuntimeError(f"签名密钥 {path} 必须是私钥")
+            signing_key = key
+
+        verification_keys[kid] = public_key
+        public_jwks.append(
+            {**public_key.to_dict(), "kid": kid, "use": "sig", "alg": algorithm}
+        )
+
+    if signing_key is None:
+        raise RuntimeError(
+            f"在 {settings.JWT_KEYS_DIR} 中找不到签名密钥 {settings.JWT_ACTIVE_KID}.pem"
+        )
+
+    return SigningKeys(
+        algorithm=algorithm,
+        signing_key=signing_key,
+        kid=settings.JWT_ACTIVE_KID,
+        verification_keys=verification_keys,
+        jwks=json.dumps({"keys": public_jwks}, separators=(",", ":")).encode(),
+    )
+
+
+def load_signing_keys() -> SigningKeys:
+    """根据配置加载签名密钥（配置错误时抛出 RuntimeError，阻止应用启动）"""
+    algorithm = settings.ALGORITHM
+    if algorithm in SYMMETRIC_ALGORITHMS:
+        return SigningKeys(algorithm=algorithm, signing_key=settings.SECRET_KEY)
+    return _load_asymmetric_keys(algorithm)
+
+
+signing_keys = load_signing_keys()
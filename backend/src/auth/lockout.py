@@ -0,0 +1,208 @@
+"""
+登录失败计数与渐进式锁定
+
+按用户名和请求来源（IP）分别统计窗口期内的登录失败次数，任一维度超过阈值即锁定，
+锁定时长随锁定次数指数增长（LOGIN_LOCKOUT_BASE_SECONDS * 2^(n-1)，上限 LOGIN_LOCKOUT_MAX_SECONDS）。
+
+来源取自 login_source：后端位于反向代理之后时，只有对端地址在 TRUSTED_PROXIES 中，
+才使用代理设置的 X-Real-IP / X-Forwarded-For；未配置可信代理时无法区分客户端，
+不按来源锁定（否则所有客户端共用代理地址，任意 20 次失败会锁定所有人的登录）。
+
+锁定检查在 verify_password 之前执行，被锁定的请求直接返回 429，不再消耗 bcrypt 算力；
+失败计数与锁定判定在一个 Lua 脚本中原子完成。
+
+Redis 不可用时放行（只记录警告），避免 Redis 故障导致所有用户无法登录。
+"""
+
+import hashlib
+import ipaddress
+import logging
+import math
+from functools import lru_cache
+
+import redis.asyncio as redis
+from fastapi import HTTPException, Request, status
+from redis.exceptions import NoScriptError
+
+from src.auth.constants import (
+    REDIS_LOGIN_FAILURES_PREFIX,
+    REDIS_LOGIN_LOCK_PREFIX,
+    REDIS_LOGIN_STRIKES_PREFIX,
+)
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS: 失败计数、锁定、锁定次数（用户名维度在前，来源维度在后且可省略，各 3 个）
+# ARGV: 窗口期、用户名阈值、来源阈值、基础锁定时长、最长锁定时长、锁定次数保留时长
+# 返回：{用户名维度锁定秒数[, 来源维度锁定秒数]}（0 表示未触发锁定）
+_RECORD_FAILURE_SCRIPT = """
+local result = {}
+for i = 0, #KEYS / 3 - 1 do
+    local failures_key = KEYS[i * 3 + 1]
+    local lock_key = KEYS[i * 3 + 2]
+    local strikes_key = KEYS[i * 3 + 3]
+    local threshold = tonumber(ARGV[2 + i])
+    local locked_for = 0
+
+    local failures = redis.call('INCR', failures_key)
+    if failures == 1 then
+        redis.call('EXPIRE', failures_key, ARGV[1])
+    end
+    if failures >= threshold then
+        local strikes = redis.call('INCR', strikes_key)
+        redis.call('EXPIRE', strikes_key, ARGV[6])
+        locked_for = math.min(tonumber(ARGV[4]) * 2 ^ (strikes - 1), tonumber(ARGV[5]))
+        redis.call('SET', lock_key, 1, 'EX', locked_for)
+        redis.call('DEL', failures_key)
+    end
+    result[i + 1] = locked_for
+end
+return result
+"""
+_RECORD_FAILURE_SCRIPT_SHA = hashlib.sha1(_RECORD_FAILURE_SCRIPT.encode()).hexdigest()
+
+
+def _username_id(username: str) -> str:
+    # 用户名来自未经校验的表单，取摘要以限制键长度
+    return hashlib.blake2b(username.encode(), digest_size=16).hexdigest()
+
+
+def _keys(username: str, source: str | None) -> list[str]:
+    scopes = [f"user:{_username_id(username)}"]
+    if source is not None:
+        scopes.append(f"ip:{source}")
+    return [
+        f"{prefix}{scope}"
+        for scope in scopes
+        for prefix in (
+            REDIS_LOGIN_FAILURES_PREFIX,
+            REDIS_LOGIN_LOCK_PREFIX,
+            REDIS_LOGIN_STRIKES_PREFIX,
+        )
+    ]
+
+
+@lru_cache(maxsize=8)
+def _parse_networks(entries: tuple[str, ...]) -> tuple:
+    return tuple(ipaddress.ip_network(entry, strict=False) for entry in entries)
+
+
+def _parse_ip(value: str | None):
+    try:
+        return ipaddress.ip_address(value.strip()) if value else None
+    except ValueError:
+        return None
+
+
+def login_source(request: Request) -> str | None:
+    """
+    登录请求的客户端 IP，无法可靠确定时返回 None（不按来源锁定）
+
+    - 对端是可信代理：取 X-Real-IP，没有时取 X-Forwarded-For 中最右侧的非可信地址
+    - 对端不是可信代理：对端即客户端（直连后端）
+    - 未配置可信代理：无法判断对端是否为代理，返回 None
+    """
+    networks = _parse_networks(tuple(settings.TRUSTED_PROXIES))
+    peer = _parse_ip(request.client.host if request.client else None)
+    if not networks or peer is None:
+        return None
+
+    def trusted(address) -> bool:
+        return any(address in network for network in networks)
+
+    if not trusted(peer):
+        return str(peer)
+
+    real_ip = _parse_ip(request.headers.get("x-real-ip"))
+    if real_ip is not None:
+        return str(real_ip)
+    forwarded = request.headers.get("x-forwarded-for", "").split(",")
+    for entry in reversed(forwarded):
+        address = _parse_ip(entry)
+        if address is None:
+            return None
+        if not trusted(address):
+            return str(address)
+    return None
+
+
+async def ensure_login_allowed(
+    redis_client: redis.Redis, username: str, source: str | None
+) -> None:
+    """
+    检查用户名或来源是否处于锁定期
+
+    Raises:
+        HTTPException: 429，Retry-After 为剩余锁定秒数
+    """
+    if not settings.LOGIN_LOCKOUT_ENABLED:
+        return
+
+    lock_keys = _keys(username, source)[1::3]
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for lock_key in lock_keys:
+                pipe.pttl(lock_key)
+            remaining_ms = max(await pipe.execute())
+    except Exception as e:
+        logger.warning(f"检查登录锁定状态失败，放行本次登录: {e}")
+        return
+
+    if remaining_ms > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, please try again later",
+            headers={"Retry-After": str(math.ceil(remaining_ms / 1000))},
+        )
+
+
+async def record_login_failure(
+    redis_client: redis.Redis, username: str, source: str | None
+) -> None:
+    """记录一次登录失败，超过阈值时锁定用户名和/或来源"""
+    if not settings.LOGIN_LOCKOUT_ENABLED:
+        return
+
+    keys = _keys(username, source)
+    keys_and_args = (
+        len(keys),
+        *keys,
+        settings.LOGIN_FAILURE_WINDOW_SECONDS,
+        settings.LOGIN_MAX_FAILURES_PER_USER,
+        settings.LOGIN_MAX_FAILURES_PER_SOURCE,
+        settings.LOGIN_LOCKOUT_BASE_SECONDS,
+        settings.LOGIN_LOCKOUT_MAX_SECONDS,
+        settings.LOGIN_LOCKOUT_RESET_SECONDS,
+    )
+    try:
+        try:
+            locked_for = await redis_client.evalsha(
+                _RECORD_FAILURE_SCRIPT_SHA, *keys_and_args
+            )
+        except NoScriptError:
+            locked_for = await redis_client.eval(_RECORD_FAILURE_SCRIPT, *keys_and_args)
+    except Exception as e:
+        logger.warning(f"记录登录失败次数失败: {e}")
+        return
+
+    user_locked_for, source_locked_for = (*locked_for, 0)[:2]
+
+    if user_locked_for or source_locked_for:
+        logger.warning(
+            f"登录失败次数过多，已锁定 user={username!r} ({user_locked_for}s) "
+            f"source={source} ({source_locked_for}s)"
+        )
+
+
+async def clear_login_failures(redis_client: redis.Redis, username: str) -> None:
+    """登录成功后清除该用户名的失败计数（锁定次数保留至自然过期）"""
+    if not settings.LOGIN_LOCKOUT_ENABLED:
+        return
+
+    try:
+        await redis_client.delete(
+            f"{REDIS_LOGIN_FAILURES_PREFIX}user:{_username_id(username)}"
+        )
+    except Exception as e:
+        logger.warning(f"清除登录失败次数失败: {e}")
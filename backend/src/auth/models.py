@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import String, func
+from sqlalchemy import ForeignKey, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from datetime import datetime
 
@@ -18,6 +18,10 @@ class User(Base):
         String(100), unique=True, index=True, nullable=True
     )
     hashed_password: Mapped[str] = mapped_column(String)
+    # 由管理员创建时记录创建者（行级范围 user:read@created 使用）
+    created_by_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True
+    )
 
     # 时间戳字段
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
@@ -29,3 +33,22 @@ class User(Base):
     user_roles: Mapped[list["UserRole"]] = relationship(
         "src.rbac.models.UserRole", back_populates="user", cascade="all, delete-orphan"
     )
+
+
+class ApiKey(Base):
+    """API 密钥表（供服务账号等机器客户端使用，只保存密钥的 HMAC 摘要）"""
+
+    __tablename__ = "api_keys"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
+    name: Mapped[str] = mapped_column(String(100))
+    # 密钥明文的前若干位，便于用户辨认（不足以还原密钥）
+    prefix: Mapped[str] = mapped_column(String(16))
+    key_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    expires_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    revoked_at: Mapped[datetime | None] = mapped_column(nullable=True)
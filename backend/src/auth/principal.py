@@ -0,0 +1,144 @@
+"""
+访问令牌中的主体声明（principal claims）
+
+访问令牌除 sub 外还可携带用户ID、角色ID列表和一个版本戳：
+
+- uid: 用户ID
+- rid: 角色ID列表
+- ver: 签发时该用户的主体版本
+
+用户的角色、用户名等发生变化时会更新 Redis 中的主体版本。请求到达时，
+只要令牌中的 ver 与 Redis 中的当前版本一致，就可以直接根据声明构造主体，
+无需查询数据库；版本不一致或版本不存在时回退到数据库查询。
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+
+import redis.asyncio as redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.constants import REDIS_PRINCIPAL_VERSION_PREFIX
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """当前请求的认证主体（轻量、不可变，不绑定数据库会话）"""
+
+    id: int
+    username: str
+    # 来自令牌声明的角色ID；从数据库加载时为 None（表示未知）
+    role_ids: tuple[int, ...] | None = None
+
+
+def _version_key(user_id: int) -> str:
+    return f"{REDIS_PRINCIPAL_VERSION_PREFIX}{user_id}"
+
+
+def _version_ttl_seconds() -> int:
+    # 版本戳只需覆盖访问令牌的最长有效期；过期后视为版本未知，回退数据库
+    return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 60
+
+
+async def get_principal_version(redis_client: redis.Redis, user_id: int) -> int | None:
+    """获取用户当前主体版本，不存在时返回 None"""
+    version = await redis_client.get(_version_key(user_id))
+    return int(version) if version is not None else None
+
+
+async def ensure_principal_version(redis_client: redis.Redis, user_id: int) -> int:
+    """获取用户当前主体版本，不存在时初始化（用于签发令牌）"""
+    key = _version_key(user_id)
+    ttl = _version_ttl_seconds()
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(key, time.time_ns() // 1000, nx=True, ex=ttl)
+        pipe.expire(key, ttl)
+        pipe.get(key)
+        _, _, version = await pipe.execute()
+    return int(version)
+
+
+async def bump_principal_version(user_id: int) -> None:
+    """
+    更新用户主体版本，使已签发令牌中的声明失效（回退到数据库查询）
+
+    在用户角色、用户名变更或用户删除后调用。
+    """
+    await bump_principal_versions([user_id])
+
+
+async def bump_principal_versions(user_ids: list[int]) -> None:
+    """批量更新主体版本（如删除角色时该角色的全部持有者），一次 Redis 流水线"""
+    from src.redis_client import get_redis_client
+
+    if not user_ids:
+        return
+    version = time.time_ns() // 1000
+    ttl = _version_ttl_seconds()
+    try:
+        async for redis_client in get_redis_client():
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.set(_version_key(user_id), version, ex=ttl)
+                await pipe.execute()
+    except Exception as e:
+        logger.warning(f"更新用户 {user_ids} 主体版本失败: {e}")
+
+
+async def build_token_claims(
+    db: AsyncSession, redis_client: redis.Redis, user_id: int
+) -> dict:
+    """
+    构造访问令牌的主体声明
+
+    未启用主体声明或 Redis 不可用时返回空字典（令牌仅包含 sub）。
+    """
+    if not settings.TOKEN_PRINCIPAL_CLAIMS:
+        return {}
+
+    from src.rbac.models import UserRole
+
+    try:
+        version = await ensure_principal_version(redis_client, user_id)
+    except Exception as e:
+        logger.warning(f"获取用户 {user_id} 主体版本失败，令牌不携带主体声明: {e}")
+        return {}
+
+    result = await db.execute(
+        select(UserRole.role_id)
+        .where(UserRole.user_id == user_id)
+        .order_by(UserRole.role_id)
+    )
+    return {"uid": user_id, "rid": list(result.scalars().all()), "ver": version}
+
+
+async def principal_from_claims(
+    redis_client: redis.Redis, payload: dict
+) -> Principal | None:
+    """
+    根据令牌声明构造主体
+
+    声明缺失、版本过期或 Redis 不可用时返回 None，由调用方回退到数据库查询。
+    """
+    if not settings.TOKEN_PRINCIPAL_CLAIMS:
+        return None
+
+    user_id = payload.get("uid")
+    role_ids = payload.get("rid")
+    version = payload.get("ver")
+    if not isinstance(user_id, int) or role_ids is None or version is None:
+        return None
+
+    try:
+        current_version = await get_principal_version(redis_client, user_id)
+    except Exception:
+        return None
+    if current_version != version:
+        return None
+
+    return Principal(id=user_id, username=payload["sub"], role_ids=tuple(role_ids))
@@ -0,0 +1,162 @@
+"""
+刷新令牌（轮换 + 重用检测）
+
+刷新令牌是不透明的随机字符串，Redis 中只保存其 HMAC-SHA256 摘要：
+
+- auth:refresh:<digest>        -> 所属令牌族ID（TTL 为刷新令牌有效期）
+- auth:refresh_family:<family> -> hash {user_id, current, iat}
+
+同一次登录派生出的刷新令牌属于同一个令牌族，族中只有 current 指向的令牌有效。
+每次刷新都在一个 Lua 脚本内原子地完成校验与轮换：旧令牌的键保留到过期，
+若之后再次出现，说明令牌可能已被窃取，整个令牌族随即失效（重用检测）。
+
+刷新只需一次 Redis 往返，不再执行 bcrypt 校验，因此访问令牌可以设置得很短。
+令牌族的 iat 同样受用户令牌纪元约束：退出所有设备或修改密码后，
+此前登录产生的刷新令牌全部失效。
+"""
+
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+from dataclasses import dataclass
+
+import redis.asyncio as redis
+from redis.exceptions import NoScriptError
+
+from src.auth.constants import (
+    REDIS_REFRESH_FAMILY_PREFIX,
+    REDIS_REFRESH_TOKEN_PREFIX,
+)
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 返回值：{状态, user_id, iat}
+#   1  轮换成功
+#   0  令牌不存在或已过期
+#  -1  令牌族已被吊销
+#  -2  检测到重用，令牌族已吊销
+_ROTATE_SCRIPT = """
+local family = redis.call('GET', KEYS[1])
+if not family then
+    return {0}
+end
+local family_key = ARGV[1] .. family
+local state = redis.call('HMGET', family_key, 'user_id', 'current', 'iat')
+if not state[2] then
+    return {-1}
+end
+if state[2] ~= ARGV[2] then
+    redis.call('DEL', family_key)
+    return {-2, state[1]}
+end
+local ttl = tonumber(ARGV[4])
+redis.call('SET', KEYS[2], family, 'EX', ttl)
+redis.call('HSET', family_key, 'current', ARGV[3])
+redis.call('EXPIRE', family_key, ttl)
+return {1, state[1], state[3]}
+"""
+_ROTATE_SCRIPT_SHA = hashlib.sha1(_ROTATE_SCRIPT.encode()).hexdigest()
+
+
+@dataclass(frozen=True, slots=True)
+class RefreshResult:
+    """刷新令牌轮换结果"""
+
+    user_id: int
+    refresh_token: str
+    # 令牌族的首次登录时间（毫秒），用于与用户令牌纪元比较
+    issued_at_ms: int
+
+
+class RefreshTokenError(Exception):
+    """刷新令牌无效（不存在、已过期、已吊销或被重用）"""
+
+    def __init__(self, reason: str, user_id: int | None = None):
+        super().__init__(reason)
+        self.reason = reason
+        self.user_id = user_id
+
+
+def _digest(token: str) -> str:
+    return hmac.new(
+        settings.SECRET_KEY.encode(), token.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def _token_key(digest: str) -> str:
+    return f"{REDIS_REFRESH_TOKEN_PREFIX}{digest}"
+
+
+def _ttl_seconds() -> int:
+    return settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+
+async def issue_refresh_token(redis_client: redis.Redis, user_id: int) -> str:
+    """登录时创建新的令牌族，并返回其第一个刷新令牌"""
+    token = secrets.token_urlsafe(32)
+    digest = _digest(token)
+    family = secrets.token_hex(16)
+    family_key = f"{REDIS_REFRESH_FAMILY_PREFIX}{family}"
+    ttl = _ttl_seconds()
+
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(_token_key(digest), family, ex=ttl)
+        pipe.hset(
+            family_key,
+            mapping={
+                "user_id": user_id,
+                "current": digest,
+                "iat": time.time_ns() // 1_000_000,
+            },
+        )
+        pipe.expire(family_key, ttl)
+        await pipe.execute()
+    return token
+
+
+async def rotate_refresh_token(redis_client: redis.Redis, token: str) -> RefreshResult:
+    """
+    校验刷新令牌并轮换为新令牌
+
+    Raises:
+        RefreshTokenError: 令牌无效；检测到重用时令牌族已被吊销
+    """
+    digest = _digest(token)
+    new_token = secrets.token_urlsafe(32)
+    new_digest = _digest(new_token)
+    keys_and_args = (
+        2,
+        _token_key(digest),
+        _token_key(new_digest),
+        REDIS_REFRESH_FAMILY_PREFIX,
+        digest,
+        new_digest,
+        _ttl_seconds(),
+    )
+    try:
+        result = await redis_client.evalsha(_ROTATE_SCRIPT_SHA, *keys_and_args)
+    except NoScriptError:
+        result = await redis_client.eval(_ROTATE_SCRIPT, *keys_and_args)
+
+    status = int(result[0])
+    if status == 1:
+        return RefreshResult(
+            user_id=int(result[1]),
+            refresh_token=new_token,
+            issued_at_ms=int(result[2]),
+        )
+    if status == -2:
+        user_id = int(result[1])
+        logger.warning(f"检测到刷新令牌重用，已吊销用户 {user_id} 的令牌族")
+        raise RefreshTokenError("reused", user_id=user_id)
+    raise RefreshTokenError("revoked" if status == -1 else "invalid")
+
+
+async def revoke_refresh_token(redis_client: redis.Redis, token: str) -> None:
+    """吊销刷新令牌所在的整个令牌族（用于退出登录）"""
+    family = await redis_client.get(_token_key(_digest(token)))
+    if family is not None:
+        await redis_client.delete(f"{REDIS_REFRESH_FAMILY_PREFIX}{family}")
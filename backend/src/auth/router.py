@@ -1,21 +1,39 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 import redis.asyncio as redis
 
-from src.auth import schemas, service, models, security
+from src.auth import schemas, service, models, security, keys, api_keys
+from src.auth.principal import Principal, build_token_claims
 from src.schemas import MessageResponse
-from src.auth.dependencies import get_current_user, oauth2_scheme
+from src.auth.dependencies import (
+    get_current_bearer_user,
+    get_current_user_model,
+    oauth2_scheme,
+)
 from src.auth.blacklist import add_token_to_blacklist
+from src.auth.lockout import (
+    clear_login_failures,
+    ensure_login_allowed,
+    login_source,
+    record_login_failure,
+)
+from src.auth.refresh import (
+    RefreshTokenError,
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+from src.auth.token_epoch import is_token_before_epoch, revoke_user_tokens
 from src.rbac import service as rbac_service
 from src.users import service as user_service
-from src.config import settings
 from src.database import get_async_db
 from src.rate_limit import auth_limiter
 from src.redis_client import get_redis_client
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
+# 挂载在根路径下（不带 API 前缀）
+well_known_router = APIRouter(tags=["Authentication"])
 
 
 @router.post(
@@ -51,20 +69,81 @@ async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
     Login and get an access token.
     """
+    # 锁定期内直接拒绝，不执行 bcrypt 校验
+    source = login_source(request)
+    await ensure_login_allowed(redis_client, form_data.username, source)
+
     user = await service.authenticate_user(db, form_data.username, form_data.password)
     if not user:
+        await record_login_failure(redis_client, form_data.username, source)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = security.create_access_token(subject=user.username)
-    return {"access_token": access_token, "token_type": "bearer"}
+    await clear_login_failures(redis_client, form_data.username)
+
+    claims = await build_token_claims(db, redis_client, user.id)
+    access_token = security.create_access_token(subject=user.username, claims=claims)
+    refresh_token = await issue_refresh_token(redis_client, user.id)
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
+
+
+@router.post(
+    "/refresh",
+    response_model=schemas.Token,
+    status_code=status.HTTP_200_OK,
+    summary="Refresh access token",
+)
+async def refresh(
+    body: schemas.RefreshTokenRequest,
+    db: AsyncSession = Depends(get_async_db),
+    redis_client: redis.Redis = Depends(get_redis_client),
+):
+    """
+    Exchange a refresh token for a new access token and a new refresh token.
+    The presented refresh token is consumed; presenting it again revokes
+    the whole session.
+    """
+    invalid_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        result = await rotate_refresh_token(redis_client, body.refresh_token)
+    except RefreshTokenError:
+        raise invalid_exception
+
+    # 退出所有设备或修改密码之前的登录会话不能再刷新
+    if await is_token_before_epoch(
+        redis_client, result.user_id, {"iat": result.issued_at_ms / 1000}
+    ):
+        await revoke_refresh_token(redis_client, result.refresh_token)
+        raise invalid_exception
+
+    user = await db.get(models.User, result.user_id)
+    if user is None:
+        await revoke_refresh_token(redis_client, result.refresh_token)
+        raise invalid_exception
+
+    claims = await build_token_claims(db, redis_client, user.id)
+    access_token = security.create_access_token(subject=user.username, claims=claims)
+    return {
+        "access_token": access_token,
+        "refresh_token": result.refresh_token,
+        "token_type": "bearer",
+    }
 
 
 @router.post(
@@ -74,20 +153,45 @@ async def login(
     summary="User logout",
 )
 async def logout(
-    current_user: schemas.UserRead = Depends(get_current_user),
+    body: schemas.RefreshTokenRequest | None = None,
+    current_user: Principal = Depends(get_current_bearer_user),
     token: str = Depends(oauth2_scheme),
     redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
     Logout and invalidate the current token.
+    When a refresh token is provided, its session is revoked as well.
     """
-    # 计算token剩余有效时间并加入黑名单
-    expires_in = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    await add_token_to_blacklist(redis_client, token, expires_in)
+    # 按 jti 吊销，保留时间为 token 的剩余有效期
+    payload = security.decode_and_verify_token(token)
+    await add_token_to_blacklist(redis_client, payload)
+    if body is not None:
+        await revoke_refresh_token(redis_client, body.refresh_token)
 
     return MessageResponse(message="Successfully logged out")
 
 
+@router.post(
+    "/logout-all",
+    response_model=MessageResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Log out everywhere",
+)
+async def logout_all(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_bearer_user),
+    redis_client: redis.Redis = Depends(get_redis_client),
+):
+    """
+    Revoke every token issued to the current user so far,
+    including refresh tokens and API keys.
+    """
+    await revoke_user_tokens(redis_client, current_user.id)
+    await api_keys.revoke_user_api_keys(db, current_user.id)
+
+    return MessageResponse(message="Logged out from all sessions")
+
+
 @router.post(
     "/change-password",
     response_model=MessageResponse,
@@ -97,10 +201,12 @@ async def logout(
 async def change_password_endpoint(
     request: schemas.ChangePassword,
     db: AsyncSession = Depends(get_async_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: models.User = Depends(get_current_user_model),
+    redis_client: redis.Redis = Depends(get_redis_client),
 ):
     """
     Change user password with current password verification.
+    All previously issued tokens and API keys are revoked.
     """
     success = await service.change_password(
         db=db,
@@ -113,4 +219,85 @@ async def change_password_endpoint(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect or new password is the same as current password.",
         )
+
+    await revoke_user_tokens(redis_client, current_user.id)
+    await api_keys.revoke_user_api_keys(db, current_user.id)
     return MessageResponse(message="Password has been changed successfully.")
+
+
+@router.post(
+    "/api-keys",
+    response_model=schemas.ApiKeyCreated,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create API key",
+)
+async def create_api_key(
+    body: schemas.ApiKeyCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_bearer_user),
+):
+    """
+    Create an API key for the current user (e.g. a service account).
+    The key is only returned once; send it in the X-API-Key header.
+    """
+    db_key, api_key = await api_keys.create_api_key(
+        db, current_user.id, body.name, body.expires_in_days
+    )
+    return schemas.ApiKeyCreated(
+        **schemas.ApiKeyRead.model_validate(db_key).model_dump(), key=api_key
+    )
+
+
+@router.get(
+    "/api-keys",
+    response_model=list[schemas.ApiKeyRead],
+    status_code=status.HTTP_200_OK,
+    summary="List API keys",
+)
+async def list_api_keys(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_bearer_user),
+):
+    """
+    List the current user's API keys (without the secrets).
+    """
+    return await api_keys.list_api_keys(db, current_user.id)
+
+
+@router.delete(
+    "/api-keys/{key_id}",
+    response_model=MessageResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Revoke API key",
+)
+async def revoke_api_key(
+    key_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_bearer_user),
+):
+    """
+    Revoke one of the current user's API keys.
+    """
+    if not await api_keys.revoke_api_key(db, current_user.id, key_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="API key not found"
+        )
+    return MessageResponse(message="API key has been revoked")
+
+
+@well_known_router.get(
+    "/.well-known/jwks.json",
+    summary="JSON Web Key Set",
+    response_class=Response,
+    responses={200: {"content": {"application/json": {}}}},
+)
+async def jwks():
+    """
+    Public keys for verifying access tokens locally (RS*/ES* signing only;
+    the key set is empty when tokens are signed with a shared secret).
+    """
+    return Response(
+        content=keys.signing_keys.jwks,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=300"},
+    )
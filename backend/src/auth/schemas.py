@@ -57,12 +57,50 @@ class UserRead(CustomBaseModel):
 class Token(CustomBaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+
+
+class RefreshTokenRequest(CustomBaseModel):
+    """刷新令牌请求模型"""
+
+    refresh_token: str = Field(
+        ..., min_length=1, max_length=256, description="刷新令牌"
+    )
 
 
 class TokenData(CustomBaseModel):
     username: str | None = None
 
 
+# --- API Key Schemas ---
+
+
+class ApiKeyCreate(CustomBaseModel):
+    """创建 API 密钥请求模型"""
+
+    name: str = Field(..., min_length=1, max_length=100, description="密钥名称")
+    expires_in_days: int | None = Field(
+        None, ge=1, le=3650, description="有效天数（不填则长期有效）"
+    )
+
+
+class ApiKeyRead(CustomBaseModel):
+    """API 密钥信息（不含密钥明文）"""
+
+    id: int
+    name: str
+    prefix: str
+    created_at: datetime
+    expires_at: datetime | None
+    revoked_at: datetime | None
+
+
+class ApiKeyCreated(ApiKeyRead):
+    """新建的 API 密钥，key 只在创建时返回一次"""
+
+    key: str
+
+
 # --- Password Change Schema ---
 
 
@@ -1,36 +1,45 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Any, Union
 
-from jose import jwt
 from passlib.context import CryptContext
+from passlib.hash import bcrypt as bcrypt_handler
 from fastapi import HTTPException, status
-from jose import JWTError
 
+from src.auth import codecs
+from src.auth.token_cache import token_cache
 from src.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-ALGORITHM = settings.ALGORITHM
-SECRET_KEY = settings.SECRET_KEY
+# 未配置且未完成启动校准时使用的 bcrypt cost（passlib 默认值）
+DEFAULT_BCRYPT_ROUNDS = 12
+
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
 
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    subject: Union[str, Any], expires_delta: timedelta = None, claims: dict = None
 ) -> str:
     """
     Creates a new access token.
+    Extra claims (e.g. principal claims) are merged into the payload.
     """
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=ACCESS_TOKEN_EXPIRE_MINUTES
-        )
+        expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    to_encode = {
+        **(claims or {}),
+        "exp": int(expire.timestamp()),
+        # 保留小数部分，便于与毫秒级的用户令牌纪元比较
+        "iat": now.timestamp(),
+        "sub": str(subject),
+        "jti": uuid.uuid4().hex,
+    }
+    return codecs.token_codec.encode(to_encode)
 
 
 def decode_and_verify_token(token: str) -> dict:
@@ -43,11 +52,26 @@ def decode_and_verify_token(token: str) -> dict:
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    if not settings.TOKEN_CACHE_ENABLED:
+        try:
+            return codecs.token_codec.decode(token)
+        except codecs.InvalidTokenError:
+            raise credentials_exception
+
+    digest = token_cache.digest(token)
+    hit, payload = token_cache.get(digest)
+    if hit:
+        if payload is None:
+            raise credentials_exception
+        return dict(payload)
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+        payload = codecs.token_codec.decode(token)
+    except codecs.InvalidTokenError:
+        token_cache.put_invalid(digest)
         raise credentials_exception
+    token_cache.put_valid(digest, token, payload)
+    return dict(payload)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -55,3 +79,47 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Verifies a plain text password against a hashed password.
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_bcrypt_rounds() -> int:
+    """
+    Returns the bcrypt cost currently used for new hashes.
+    Never goes below the configured security floor.
+    """
+    rounds = settings.BCRYPT_ROUNDS or DEFAULT_BCRYPT_ROUNDS
+    return max(rounds, settings.BCRYPT_MIN_ROUNDS)
+
+
+def hash_password(plain_password: str, rounds: int | None = None) -> str:
+    """
+    Hashes a password with bcrypt using the given (or current) cost.
+    """
+    return bcrypt_handler.using(rounds=rounds or get_bcrypt_rounds()).hash(
+        plain_password
+    )
+
+
+def get_hash_rounds(hashed_password: str) -> int | None:
+    """
+    Extracts the bcrypt cost from a stored hash, or None if it is not bcrypt.
+    """
+    try:
+        return bcrypt_handler.from_string(hashed_password).rounds
+    except ValueError:
+        return None
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Checks whether a stored hash should be re-hashed with the current cost.
+
+    Hashes below the security floor are always upgraded. Otherwise the cost
+    may drift by BCRYPT_REHASH_TOLERANCE before it is adjusted, so nodes of
+    different sizes do not keep re-hashing each other's hashes.
+    """
+    stored_rounds = get_hash_rounds(hashed_password)
+    if stored_rounds is None:
+        return pwd_context.needs_update(hashed_password)
+    if stored_rounds < settings.BCRYPT_MIN_ROUNDS:
+        return True
+    return abs(stored_rounds - get_bcrypt_rounds()) > settings.BCRYPT_REHASH_TOLERANCE
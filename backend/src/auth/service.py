@@ -3,7 +3,9 @@ from sqlalchemy import select
 
 from src.auth import models, schemas
 from src.exceptions import UserAlreadyExists
-from src.auth.security import verify_password, pwd_context
+from src.auth import hashing
+from src.auth.security import needs_rehash
+from src.auth.user_cache import invalidate_user_snapshot
 from src.rbac import service as rbac_service
 from src.rbac.models import SystemRoles
 
@@ -35,13 +37,22 @@ async def authenticate_user(
     user = await get_user_by_username(db, username=username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await hashing.verify_password(password, user.hashed_password):
         return None
+
+    # 存量哈希的 cost 与当前校准值偏差过大时，借登录时的明文密码重新哈希
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await hashing.hash_password(password)
+        await db.commit()
+        await db.refresh(user)
     return user
 
 
 async def create_user(
-    db: AsyncSession, user: schemas.UserCreate, role_ids: list[int] | None = None
+    db: AsyncSession,
+    user: schemas.UserCreate,
+    role_ids: list[int] | None = None,
+    created_by_id: int | None = None,
 ):
     """
     创建新用户
@@ -58,13 +69,14 @@ async def create_user(
             raise UserAlreadyExists("email", user.email)
 
     # Hash the password
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = await hashing.hash_password(user.password)
 
     # Create user instance
     db_user = models.User(
         username=user.username,
         email=user.email,
         hashed_password=hashed_password,
+        created_by_id=created_by_id,
     )
 
     # Add to database
@@ -102,18 +114,19 @@ async def change_password(
         bool: 修改是否成功
     """
     # 验证当前密码
-    if not verify_password(current_password, user.hashed_password):
+    if not await hashing.verify_password(current_password, user.hashed_password):
         return False
 
     # 检查新密码是否与当前密码相同
-    if verify_password(new_password, user.hashed_password):
+    if await hashing.verify_password(new_password, user.hashed_password):
         return False
 
     # Hash new password and update user
-    hashed_password = pwd_context.hash(new_password)
+    hashed_password = await hashing.hash_password(new_password)
     user.hashed_password = hashed_password
 
     await db.commit()
     await db.refresh(user)
 
+    await invalidate_user_snapshot(user.id)
     return True
@@ -0,0 +1,147 @@
+"""
+已验证 JWT 载荷的进程内缓存
+
+同一个 bearer token 在有效期内会被反复携带，每次都重新解析并校验签名是浪费。
+本模块按 token 摘要缓存解码后的载荷，直到 token 的 exp 为止：
+
+- 有界 LRU：条目数有上限，超长 token 不缓存载荷，内存占用有硬上限
+- 负缓存：格式错误或签名无效的 token 会被短暂记住，大量垃圾 token 可被廉价拒绝。
+  负缓存是单独的、更小的 LRU，垃圾 token 洪泛不会挤掉已缓存的有效 token
+- 命中/未命中计数，便于观察缓存效果
+
+注意：缓存只替代“解码 + 验签”，吊销检查（黑名单等）仍在每次请求时执行。
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from src.config import settings
+
+
+class TokenCache:
+    """按 token 摘要索引、感知过期时间的 LRU 缓存"""
+
+    def __init__(
+        self,
+        max_entries: int,
+        negative_ttl: float,
+        max_token_bytes: int,
+        negative_max_entries: int | None = None,
+    ):
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self.max_token_bytes = max_token_bytes
+        self.negative_max_entries = (
+            negative_max_entries
+            if negative_max_entries is not None
+            else max(1, max_entries // 10)
+        )
+
+        # digest -> (过期时间戳, 载荷)
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        # 无效 token：digest -> 过期时间戳
+        self._invalid: OrderedDict[bytes, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 指标
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        """token 摘要（作为缓存键，不在内存中保留 token 原文）"""
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, digest: bytes) -> tuple[bool, dict | None]:
+        """
+        查询缓存
+
+        Returns:
+            (是否命中, 载荷)；命中且载荷为 None 表示该 token 已知无效
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                expires_at, payload = entry
+                if expires_at > now:
+                    self._entries.move_to_end(digest)
+                    self._hits += 1
+                    return True, payload
+                del self._entries[digest]
+
+            expires_at = self._invalid.get(digest)
+            if expires_at is not None:
+                if expires_at > now:
+                    self._invalid.move_to_end(digest)
+                    self._negative_hits += 1
+                    return True, None
+                del self._invalid[digest]
+
+            self._misses += 1
+            return False, None
+
+    def put_valid(self, digest: bytes, token: str, payload: dict) -> None:
+        """缓存已验证的载荷，直到 token 过期"""
+        expires_at = payload.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return
+        if len(token) > self.max_token_bytes:
+            return
+        with self._lock:
+            self._invalid.pop(digest, None)
+            self._put(self._entries, self.max_entries, digest, (expires_at, payload))
+
+    def put_invalid(self, digest: bytes) -> None:
+        """短暂记住无效 token（单独的 LRU，不占用有效 token 的容量）"""
+        if self.negative_ttl <= 0:
+            return
+        with self._lock:
+            self._put(
+                self._invalid,
+                self.negative_max_entries,
+                digest,
+                time.time() + self.negative_ttl,
+            )
+
+    def _put(
+        self, entries: OrderedDict, max_entries: int, digest: bytes, value
+    ) -> None:
+        entries[digest] = value
+        entries.move_to_end(digest)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._invalid.clear()
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._negative_hits + self._misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "negative_size": len(self._invalid),
+            "negative_max_entries": self.negative_max_entries,
+            "hits": self._hits,
+            "negative_hits": self._negative_hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": round(
+                (self._hits + self._negative_hits) / lookups if lookups else 0.0, 4
+            ),
+        }
+
+
+token_cache = TokenCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    negative_ttl=settings.TOKEN_CACHE_NEGATIVE_TTL_SECONDS,
+    max_token_bytes=settings.TOKEN_CACHE_MAX_TOKEN_BYTES,
+    negative_max_entries=settings.TOKEN_CACHE_NEGATIVE_MAX_ENTRIES,
+)
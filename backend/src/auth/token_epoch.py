@@ -0,0 +1,148 @@
+"""
+用户级令牌纪元（tokens_valid_after）
+
+每个用户可以有一个纪元时间戳（毫秒），签发时间 iat 早于该时间的访问令牌全部失效。
+访问令牌的 iat 带小数部分（RFC 7519 允许非整数 NumericDate），
+因此吊销后立即重新登录得到的新令牌不会被误判。
+“在所有设备上退出登录”、修改密码等操作只需写入一个 Redis 键，
+不必追踪或逐个吊销该用户签发过的令牌，黑名单键空间也不会因此增长。
+
+纪元键的过期时间等于令牌（含刷新令牌）的最长有效期：届时纪元之前签发的令牌都已自然过期。
+
+与吊销过滤器相同，每个 worker 在进程内保存全部纪元（通过 Redis pub/sub 同步，
+并定期从 Redis 重建），请求校验不访问 Redis；消息总线未在监听时回退到 Redis 查询。
+"""
+
+import logging
+import time
+
+import redis.asyncio as redis
+
+from src.auth.constants import REDIS_TOKEN_EPOCH_PREFIX, TOKEN_EPOCH_CHANNEL
+from src.config import settings
+from src.pubsub import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+
+def _epoch_key(user_id: int) -> str:
+    return f"{REDIS_TOKEN_EPOCH_PREFIX}{user_id}"
+
+
+def _epoch_ttl_seconds() -> int:
+    # 纪元需覆盖访问令牌和刷新令牌中较长的有效期
+    return (
+        max(
+            settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+        )
+        + 60
+    )
+
+
+class TokenEpochCache:
+    """进程内的用户令牌纪元表"""
+
+    def __init__(self):
+        self._epochs: dict[int, int] = {}
+        # 重建期间收到的更新，重建完成后合并到新表中
+        self._pending: list[tuple[int, int]] | None = None
+
+        self._local_checks = 0
+        self._redis_checks = 0
+
+    def apply(self, message: str) -> None:
+        """处理纪元更新消息（格式为 "<user_id>:<epoch>"）"""
+        user_id, epoch = (int(part) for part in message.split(":", 1))
+        self._set(self._epochs, user_id, epoch)
+        if self._pending is not None:
+            self._pending.append((user_id, epoch))
+
+    @staticmethod
+    def _set(epochs: dict[int, int], user_id: int, epoch: int) -> None:
+        # 纪元只前进不后退
+        if epoch > epochs.get(user_id, 0):
+            epochs[user_id] = epoch
+
+    async def get(self, redis_client: redis.Redis, user_id: int) -> int | None:
+        """获取用户的令牌纪元，未设置时返回 None"""
+        if invalidation_bus.is_listening:
+            self._local_checks += 1
+            return self._epochs.get(user_id)
+
+        self._redis_checks += 1
+        epoch = await redis_client.get(_epoch_key(user_id))
+        return int(epoch) if epoch is not None else None
+
+    async def rebuild(self, redis_client: redis.Redis) -> None:
+        """从 Redis 重建纪元表（同时清除已过期的条目）"""
+        epochs: dict[int, int] = {}
+        self._pending = []
+        try:
+            keys = [
+                key
+                async for key in redis_client.scan_iter(
+                    match=f"{REDIS_TOKEN_EPOCH_PREFIX}*", count=1000
+                )
+            ]
+            if keys:
+                for key, epoch in zip(keys, await redis_client.mget(keys)):
+                    if epoch is not None:
+                        user_id = int(key[len(REDIS_TOKEN_EPOCH_PREFIX) :])
+                        self._set(epochs, user_id, int(epoch))
+            for user_id, epoch in self._pending:
+                self._set(epochs, user_id, epoch)
+            self._epochs = epochs
+        finally:
+            self._pending = None
+
+    def stats(self) -> dict:
+        return {
+            "synced": invalidation_bus.is_listening,
+            "entries": len(self._epochs),
+            "local_checks": self._local_checks,
+            "redis_checks": self._redis_checks,
+        }
+
+
+token_epochs = TokenEpochCache()
+invalidation_bus.subscribe(TOKEN_EPOCH_CHANNEL, token_epochs.apply)
+invalidation_bus.on_resync(token_epochs.rebuild)
+
+
+async def revoke_user_tokens(redis_client: redis.Redis, user_id: int) -> None:
+    """使该用户此前签发的所有访问令牌失效"""
+    epoch = time.time_ns() // 1_000_000
+    await redis_client.set(_epoch_key(user_id), epoch, ex=_epoch_ttl_seconds())
+    await invalidation_bus.publish(
+        redis_client, TOKEN_EPOCH_CHANNEL, f"{user_id}:{epoch}"
+    )
+
+
+async def revoke_user_tokens_after_commit(user_id: int) -> None:
+    """
+    在数据库变更提交后吊销用户令牌（如管理员重置密码）
+
+    变更已经生效，Redis 失败时只记录错误，不让已成功的请求返回 500。
+    """
+    from src.redis_client import get_redis_client
+
+    try:
+        async for redis_client in get_redis_client():
+            await revoke_user_tokens(redis_client, user_id)
+    except Exception as e:
+        logger.error(f"吊销用户 {user_id} 的令牌失败: {e}")
+
+
+async def is_token_before_epoch(
+    redis_client: redis.Redis, user_id: int, payload: dict
+) -> bool:
+    """令牌是否签发于用户令牌纪元之前（即已被批量吊销）"""
+    epoch = await token_epochs.get(redis_client, user_id)
+    if epoch is None:
+        return False
+    # 缺少 iat 的旧令牌无法判断签发时间，按已吊销处理
+    issued_at = payload.get("iat")
+    if not isinstance(issued_at, (int, float)):
+        return True
+    return issued_at * 1000 < epoch
@@ -0,0 +1,180 @@
+"""
+用户快照缓存
+
+认证依赖只需要用户的少量只读字段，且用户记录极少变化。本模块在进程内缓存不可变的
+用户快照（按用户ID和用户名索引，LRU + TTL），避免每个请求都加载 ORM User。
+
+用户被更新、删除或修改密码后，通过消息总线通知所有 worker 删除对应快照。
+消息总线未在监听时（可能错过失效消息）不使用缓存，重新连接后清空缓存。
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import models
+from src.auth.constants import USER_INVALIDATION_CHANNEL
+from src.config import settings
+from src.pubsub import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """用户的只读快照（不含密码哈希，不绑定数据库会话）"""
+
+    id: int
+    username: str
+    email: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_model(cls, user: models.User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class UserSnapshotCache:
+    """按用户ID/用户名索引的有界 LRU + TTL 缓存"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # user_id -> (snapshot, expires_at)
+        self._entries: OrderedDict[int, tuple[UserSnapshot, float]] = OrderedDict()
+        self._ids_by_username: dict[str, int] = {}
+        # 每次失效递增；加载期间发生过失效的结果不写入缓存
+        self.generation = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.USER_CACHE_ENABLED and invalidation_bus.is_listening
+
+    def get(
+        self, *, user_id: int | None = None, username: str | None = None
+    ) -> UserSnapshot | None:
+        if not self.enabled:
+            return None
+
+        if user_id is None:
+            user_id = self._ids_by_username.get(username)
+        entry = self._entries.get(user_id) if user_id is not None else None
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                self._remove(user_id)
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(user_id)
+        self._hits += 1
+        return entry[0]
+
+    def put(self, snapshot: UserSnapshot, generation: int) -> None:
+        if not self.enabled or generation != self.generation:
+            return
+
+        self._remove(snapshot.id)
+        self._entries[snapshot.id] = (snapshot, time.monotonic() + self.ttl)
+        self._ids_by_username[snapshot.username] = snapshot.id
+        while len(self._entries) > self.max_entries:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._ids_by_username.pop(evicted.username, None)
+            self._evictions += 1
+
+    def _remove(self, user_id: int) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self._ids_by_username.pop(entry[0].username, None)
+
+    def invalidate(self, user_id: int) -> None:
+        self.generation += 1
+        self._invalidations += 1
+        self._remove(user_id)
+
+    def apply(self, message: str) -> None:
+        """处理失效消息（消息内容为用户ID）"""
+        self.invalidate(int(message))
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._ids_by_username.clear()
+
+    async def on_resync(self, redis_client) -> None:
+        # 断线期间可能错过失效消息，重新连接后全部丢弃
+        self.clear()
+
+    def stats(self) -> dict:
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+        }
+
+
+user_cache = UserSnapshotCache(
+    max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+invalidation_bus.subscribe(USER_INVALIDATION_CHANNEL, user_cache.apply)
+invalidation_bus.on_resync(user_cache.on_resync)
+
+
+async def load_user_snapshot(
+    db: AsyncSession, *, user_id: int | None = None, username: str | None = None
+) -> UserSnapshot | None:
+    """按用户ID或用户名获取用户快照，缓存未命中时查询数据库"""
+    snapshot = user_cache.get(user_id=user_id, username=username)
+    if snapshot is not None:
+        return snapshot
+
+    generation = user_cache.generation
+    if user_id is not None:
+        condition = models.User.id == user_id
+    else:
+        condition = models.User.username == username
+    result = await db.execute(select(models.User).where(condition))
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+
+    snapshot = UserSnapshot.from_model(user)
+    user_cache.put(snapshot, generation)
+    return snapshot
+
+
+async def invalidate_user_snapshot(user_id: int) -> None:
+    """通知所有 worker 删除该用户的快照（在用户数据提交后调用）"""
+    from src.redis_client import get_redis_client
+
+    # publish 会先在本进程内处理，再广播给其他 worker
+    try:
+        async for redis_client in get_redis_client():
+            await invalidation_bus.publish(
+                redis_client, USER_INVALIDATION_CHANNEL, str(user_id)
+            )
+    except Exception as e:
+        logger.warning(f"广播用户 {user_id} 快照失效消息失败: {e}")
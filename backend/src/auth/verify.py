@@ -0,0 +1,220 @@
+"""
+nginx auth_request 校验端点
+
+nginx 通过 auth_request 子请求访问 {API_PREFIX}/auth/verify，用于保护其他上游服务。
+该端点只返回状态码和少量响应头，每个被代理的请求都会调用一次，因此以纯 ASGI 中间件实现，
+放在中间件栈最外层，不经过路由、依赖注入、Pydantic 响应模型和其他中间件：
+
+- 200: 认证通过（且拥有所需权限），响应头 X-User-Id / X-User-Name / X-User-Roles
+- 401: 未认证、令牌无效或已吊销
+- 403: 已认证但缺少所需权限
+- 503: 数据库或 Redis 故障（记录日志，不向外抛出异常；本中间件位于全局异常处理之外）
+
+所需权限通过查询参数 permission 或请求头 X-Required-Permission 指定（格式 target:action）。
+请求头和查询字符串中的非 UTF-8 字节按替换字符解码，得到的令牌/权限无效，结果为 401/403。
+
+认证与 get_current_user 相同（Bearer 令牌或 X-API-Key，黑名单与令牌纪元检查），
+令牌解码走进程内令牌缓存，权限走权限缓存；数据库会话只在缓存未命中时才会实际获取连接。
+数据库和 Redis 通过应用的依赖（含 dependency_overrides）获取。
+"""
+
+import logging
+import time
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.auth.api_keys import authenticate_api_key
+from src.auth.blacklist import is_token_blacklisted
+from src.auth.principal import principal_from_claims
+from src.auth.security import decode_and_verify_token
+from src.auth.token_epoch import is_token_before_epoch
+from src.auth.user_cache import load_user_snapshot
+from src.config import settings
+from src.database import get_async_db
+from src.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+VERIFY_PATH = f"{settings.API_PREFIX}/auth/verify"
+
+
+class _Denied(Exception):
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+
+class _Dependency:
+    """按需从应用依赖（支持 dependency_overrides）获取资源，用完后关闭"""
+
+    def __init__(self, scope: Scope, dependency):
+        app = scope.get("app")
+        overrides = getattr(app, "dependency_overrides", {})
+        self._provider = overrides.get(dependency, dependency)
+        self._generator = None
+        self._value = None
+
+    async def get(self):
+        if self._generator is None:
+            self._generator = self._provider()
+            self._value = await self._generator.__anext__()
+        return self._value
+
+    async def close(self) -> None:
+        if self._generator is not None:
+            try:
+                await self._generator.aclose()
+            except Exception as e:
+                logger.warning(f"auth verify 释放资源失败: {e!r}")
+
+
+class VerifyMetrics:
+    """校验结果计数与平均耗时（中间件实例由 Starlette 创建，指标放在模块级对象中）"""
+
+    def __init__(self):
+        self._counts = {200: 0, 401: 0, 403: 0, 503: 0}
+        self._total_seconds = 0.0
+
+    def record(self, status_code: int, seconds: float) -> None:
+        self._counts[status_code] += 1
+        self._total_seconds += seconds
+
+    def stats(self) -> dict:
+        requests = sum(self._counts.values())
+        return {
+            "requests": requests,
+            "allowed": self._counts[200],
+            "unauthorized": self._counts[401],
+            "forbidden": self._counts[403],
+            "unavailable": self._counts[503],
+            "avg_latency_ms": (
+                round(self._total_seconds / requests * 1000, 3) if requests else None
+            ),
+        }
+
+
+verify_metrics = VerifyMetrics()
+
+
+class AuthVerifyMiddleware:
+    """拦截 VERIFY_PATH，其余请求原样交给内层应用"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] != VERIFY_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        headers, status_code = await self._verify(scope)
+        verify_metrics.record(status_code, time.perf_counter() - start)
+
+        if status_code == 401:
+            headers.append((b"www-authenticate", b"Bearer"))
+        headers.append((b"content-length", b"0"))
+        await send(
+            {"type": "http.response.start", "status": status_code, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _verify(self, scope: Scope) -> tuple[list[tuple[bytes, bytes]], int]:
+        request_headers = dict(scope["headers"])
+        permission = _decode(request_headers.get(b"x-required-permission", b""))
+        if not permission and scope["query_string"]:
+            permission = dict(parse_qsl(_decode(scope["query_string"]))).get(
+                "permission", ""
+            )
+
+        db = _Dependency(scope, get_async_db)
+        redis_client = _Dependency(scope, get_redis_client)
+        try:
+            user_id, username, role_ids = await _authenticate(
+                request_headers, db, redis_client
+            )
+            if permission and not await _has_permission(
+                await db.get(), user_id, permission
+            ):
+                raise _Denied(403)
+            if role_ids is None:
+                role_ids = await _load_role_ids(await db.get(), user_id)
+        except _Denied as denied:
+            return [], denied.status_code
+        except Exception as e:
+            # 给 nginx 一个确定的结果，而不是未处理异常
+            logger.error(f"auth verify 后端故障: {e!r}")
+            return [], 503
+        finally:
+            await db.close()
+            await redis_client.close()
+
+        return [
+            (b"x-user-id", str(user_id).encode()),
+            (b"x-user-name", username.encode()),
+            (b"x-user-roles", ",".join(map(str, role_ids)).encode()),
+        ], 200
+
+
+def _decode(value: bytes) -> str:
+    return value.decode("utf-8", errors="replace")
+
+
+async def _authenticate(
+    request_headers: dict[bytes, bytes], db: _Dependency, redis_client: _Dependency
+) -> tuple[int, str, tuple[int, ...] | None]:
+    """与 get_current_user 相同的认证流程，返回 (用户ID, 用户名, 角色ID 或 None)"""
+    authorization = _decode(request_headers.get(b"authorization", b""))
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        api_key = request_headers.get(b"x-api-key")
+        if api_key is None:
+            raise _Denied(401)
+        identity = await authenticate_api_key(await db.get(), _decode(api_key))
+        if identity is None:
+            raise _Denied(401)
+        return identity.user_id, identity.username, None
+
+    try:
+        payload = decode_and_verify_token(token)
+    except HTTPException:
+        raise _Denied(401)
+    username = payload.get("sub")
+    if username is None:
+        raise _Denied(401)
+
+    client = await redis_client.get()
+    if await is_token_blacklisted(client, token, payload):
+        raise _Denied(401)
+
+    principal = await principal_from_claims(client, payload)
+    if principal is None:
+        user = await load_user_snapshot(await db.get(), username=username)
+        if user is None:
+            raise _Denied(401)
+        user_id, role_ids = user.id, None
+    else:
+        user_id, role_ids = principal.id, principal.role_ids
+
+    if await is_token_before_epoch(client, user_id, payload):
+        raise _Denied(401)
+    return user_id, username, role_ids
+
+
+async def _has_permission(db, user_id: int, permission: str) -> bool:
+    from src.rbac.policy import PolicyEngine
+
+    return await PolicyEngine(db, user_id).allows(permission)
+
+
+async def _load_role_ids(db, user_id: int) -> tuple[int, ...]:
+    from src.rbac.models import UserRole
+
+    result = await db.execute(
+        select(UserRole.role_id)
+        .where(UserRole.user_id == user_id)
+        .order_by(UserRole.role_id)
+    )
+    return tuple(result.scalars().all())
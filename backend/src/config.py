@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 from pydantic import Field, field_validator
-from typing import Annotated, List
+from typing import Annotated, List, Literal
 
 
 class Settings(BaseSettings):
@@ -49,10 +49,88 @@ class Settings(BaseSettings):
         min_length=32,
         description="Secret key for JWT encoding",
     )
+    # HS256/384/512 sign with SECRET_KEY; RS*/ES* sign with the keys in
+    # JWT_KEYS_DIR (<kid>.pem files) and publish them at /.well-known/jwks.json
     ALGORITHM: str = "HS256"
+    JWT_KEYS_DIR: str | None = None
+    JWT_ACTIVE_KID: str | None = None
+    # JWT encode/decode backend: jose | pyjwt (optional dependency) | native (HS* only)
+    TOKEN_CODEC: Literal["jose", "pyjwt", "native"] = "jose"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Opaque refresh tokens, rotated on every use (see auth/refresh.py)
+    REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=14, ge=1)
+    # Embed user id / role ids / version stamp in access tokens so that
+    # get_current_user can skip the database while the stamp is current
+    TOKEN_PRINCIPAL_CLAIMS: bool = True
     PASSWORD_MIN_LENGTH: int = 8
 
+    # Password hashing (bcrypt runs in a dedicated process pool)
+    PASSWORD_HASH_WORKERS: int = Field(default=2, ge=1)
+    PASSWORD_HASH_MAX_CONCURRENCY: int = Field(default=4, ge=1)
+    PASSWORD_HASH_MAX_QUEUE: int = Field(default=64, ge=1)
+    # bcrypt cost: leave unset to calibrate at startup against BCRYPT_TARGET_MS
+    BCRYPT_ROUNDS: int | None = Field(default=None, ge=4, le=31)
+    BCRYPT_TARGET_MS: int = Field(default=250, ge=1)
+    BCRYPT_MIN_ROUNDS: int = Field(default=10, ge=4, le=31)  # security floor
+    BCRYPT_MAX_ROUNDS: int = Field(default=14, ge=4, le=31)
+    # Stored hashes within this many rounds of the current cost are kept as is
+    BCRYPT_REHASH_TOLERANCE: int = Field(default=1, ge=0)
+
+    # In-process cache of verified JWT payloads
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=1)
+    TOKEN_CACHE_NEGATIVE_TTL_SECONDS: float = Field(default=5.0, ge=0)
+    # Invalid tokens are kept in a separate, smaller LRU
+    TOKEN_CACHE_NEGATIVE_MAX_ENTRIES: int = Field(default=1000, ge=1)
+    TOKEN_CACHE_MAX_TOKEN_BYTES: int = Field(default=4096, ge=1)
+
+    # In-process cache of user snapshots used by the auth dependencies
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=1)
+    USER_CACHE_TTL_SECONDS: float = Field(default=300.0, gt=0)
+
+    # User permission cache: per-worker L1 in front of Redis (L2)
+    PERMISSION_CACHE_L1_ENABLED: bool = True
+    PERMISSION_CACHE_L1_MAX_ENTRIES: int = Field(default=10000, ge=1)
+    PERMISSION_CACHE_L1_TTL_SECONDS: float = Field(default=60.0, gt=0)
+    PERMISSION_CACHE_L2_TTL_SECONDS: int = Field(default=600, ge=1)
+
+    # API keys (X-API-Key header): stored as HMAC-SHA256(pepper, key);
+    # the pepper defaults to SECRET_KEY
+    API_KEY_PEPPER: str | None = None
+    API_KEY_CACHE_MAX_ENTRIES: int = Field(default=10000, ge=1)
+    API_KEY_CACHE_TTL_SECONDS: float = Field(default=300.0, gt=0)
+    API_KEY_CACHE_NEGATIVE_TTL_SECONDS: float = Field(default=30.0, ge=0)
+
+    # Pure-ASGI {API_PREFIX}/auth/verify endpoint for nginx auth_request
+    AUTH_VERIFY_ENABLED: bool = True
+
+    # Cross-worker cache invalidation (Redis pub/sub)
+    INVALIDATION_BUS_RESYNC_SECONDS: float = Field(default=300.0, gt=0)
+
+    # Token revocation: per-worker Bloom filter of revoked jtis
+    REVOCATION_BLOOM_CAPACITY: int = Field(default=100000, ge=1)
+    REVOCATION_BLOOM_ERROR_RATE: float = Field(default=0.001, gt=0, lt=1)
+
+    # Login lockout: failures are counted per username and per source IP
+    # within the window; crossing a threshold locks that username/source for
+    # BASE * 2^(lockouts - 1) seconds, capped at MAX
+    LOGIN_LOCKOUT_ENABLED: bool = True
+    LOGIN_FAILURE_WINDOW_SECONDS: int = Field(default=900, ge=1)
+    LOGIN_MAX_FAILURES_PER_USER: int = Field(default=5, ge=1)
+    LOGIN_MAX_FAILURES_PER_SOURCE: int = Field(default=20, ge=1)
+    LOGIN_LOCKOUT_BASE_SECONDS: int = Field(default=30, ge=1)
+    LOGIN_LOCKOUT_MAX_SECONDS: int = Field(default=3600, ge=1)
+    # Lockout count is forgotten after this long without a new lockout
+    LOGIN_LOCKOUT_RESET_SECONDS: int = Field(default=86400, ge=1)
+    # Reverse proxies (IPs or CIDRs, comma string or JSON list) whose
+    # X-Real-IP / X-Forwarded-For headers identify the client. The per-source
+    # lock is only applied when the client address is known: a request from a
+    # trusted proxy carrying the header, or a direct request from any other
+    # peer. Empty disables the per-source lock (only usernames are locked),
+    # since behind a proxy every client would share the proxy's address.
+    TRUSTED_PROXIES: Annotated[List[str], NoDecode] = Field(default_factory=list)
+
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = 60
 
@@ -70,6 +148,31 @@ class Settings(BaseSettings):
                 )
         return v
 
+    @field_validator("ALGORITHM")
+    @classmethod
+    def validate_algorithm(cls, v: str) -> str:
+        """Only algorithms supported by python-jose are accepted"""
+        supported = {"HS256", "HS384", "HS512", "RS256", "RS384", "RS512"}
+        supported |= {"ES256", "ES384", "ES512"}
+        if v not in supported:
+            raise ValueError(
+                f"不支持的 JWT 算法: {v}（可选: {', '.join(sorted(supported))}）"
+            )
+        return v
+
+    @field_validator("TRUSTED_PROXIES")
+    @classmethod
+    def validate_trusted_proxies(cls, v: List[str]) -> List[str]:
+        """Every entry must be an IP address or network"""
+        import ipaddress
+
+        for entry in v:
+            try:
+                ipaddress.ip_network(entry, strict=False)
+            except ValueError:
+                raise ValueError(f"TRUSTED_PROXIES 中的地址无效: {entry}")
+        return v
+
     @field_validator("APP_NAME", mode="before")
     @classmethod
     def default_app_name(cls, v: str | None) -> str | None:
@@ -78,10 +181,10 @@ class Settings(BaseSettings):
             return None
         return v.strip()
 
-    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
+    @field_validator("BACKEND_CORS_ORIGINS", "TRUSTED_PROXIES", mode="before")
     @classmethod
     def assemble_cors_origins(cls, v: str | List[str]) -> List[str]:
-        """Parse CORS origins from comma string or JSON list."""
+        """Parse CORS origins / trusted proxies from comma string or JSON list."""
         if isinstance(v, str):
             value = v.strip()
             if not value:
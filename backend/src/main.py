@@ -8,12 +8,23 @@ from slowapi.errors import RateLimitExceeded
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.schemas import HealthResponse, RootResponse
 
-from src.auth.router import router as auth_router
+from src.auth.router import router as auth_router, well_known_router
 from src.users.router import router as users_router
 from src.rbac.router import router as rbac_router
 from src.config import settings
 from src.database import get_async_db, AsyncSessionLocal
 from src.rbac.init_data import init_rbac_data
+from src.auth.hashing import password_hasher, calibrate_bcrypt_rounds
+from src.auth.token_cache import token_cache
+from src.auth.blacklist import revocation_filter
+from src.auth.token_epoch import token_epochs
+from src.auth.user_cache import user_cache
+from src.auth.api_keys import api_key_cache
+from src.auth.verify import AuthVerifyMiddleware, verify_metrics
+from src.rbac.cache import permission_cache
+from src.rbac.catalog import permission_catalog
+from src.rbac.policy import policy_metrics
+from src.pubsub import invalidation_bus
 from src.middleware import (
     RequestLoggingMiddleware,
     GlobalExceptionHandlerMiddleware,
@@ -43,9 +54,18 @@ async def lifespan(app: FastAPI):
             raise
         logger.warning("⚠️ 应用将以现有权限配置启动（开发环境容错）")
 
+    # 预热密码哈希进程池，并根据当前硬件校准 bcrypt cost
+    await password_hasher.start()
+    await calibrate_bcrypt_rounds()
+
+    # 订阅跨 worker 失效消息（令牌吊销、用户令牌纪元等）
+    await invalidation_bus.start()
+
     yield  # 应用运行期间
 
     # 关闭时清理
+    await invalidation_bus.stop()
+    password_hasher.shutdown()
     logger.info("📴 应用关闭")
 
 
@@ -89,6 +109,10 @@ app.add_middleware(
     ],
 )
 
+# 5. nginx auth_request 校验端点（最外层，命中时不经过其他中间件和路由）
+if settings.AUTH_VERIFY_ENABLED:
+    app.add_middleware(AuthVerifyMiddleware)
+
 
 # 健康检查端点
 @app.get(
@@ -115,6 +139,7 @@ async def health_check(
         "service": app_display_name,
         "version": settings.VERSION if include_details else None,
         "checks": {} if include_details else None,
+        "metrics": {} if include_details else None,
     }
 
     if include_details:
@@ -145,6 +170,18 @@ async def health_check(
             health_status["checks"]["redis"] = f"error: {str(e)}"
             health_status["status"] = "degraded"
 
+        # 运行时指标
+        health_status["metrics"]["password_hashing"] = password_hasher.stats()
+        health_status["metrics"]["token_cache"] = token_cache.stats()
+        health_status["metrics"]["token_revocation"] = revocation_filter.stats()
+        health_status["metrics"]["token_epochs"] = token_epochs.stats()
+        health_status["metrics"]["user_cache"] = user_cache.stats()
+        health_status["metrics"]["api_key_cache"] = api_key_cache.stats()
+        health_status["metrics"]["auth_verify"] = verify_metrics.stats()
+        health_status["metrics"]["permission_cache"] = permission_cache.stats()
+        health_status["metrics"]["permission_catalog"] = permission_catalog.stats()
+        health_status["metrics"]["authorization"] = policy_metrics.stats()
+
     return HealthResponse(**health_status)
 
 
@@ -167,6 +204,7 @@ async def read_root():
 app.include_router(auth_router, prefix=settings.API_PREFIX)
 app.include_router(users_router, prefix=settings.API_PREFIX)
 app.include_router(rbac_router, prefix=settings.API_PREFIX)
+app.include_router(well_known_router)
 
 # Here we will include routers from different modules
 # For example:
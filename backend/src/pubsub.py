@@ -0,0 +1,124 @@
+"""
+跨 worker 消息总线（基于 Redis pub/sub）
+
+gunicorn 的每个 worker 都有自己的进程内缓存。某个 worker 修改数据后，
+需要通知其他 worker 同步更新，本模块提供这一能力：
+
+- subscribe(channel, handler): 注册频道处理函数（同步函数，参数为消息字符串）
+- publish(channel, message): 先在本进程内处理，再广播给其他 worker
+- on_resync(callback): 注册重新同步回调，在连接建立/重连后以及定期执行，
+  用于弥补断线期间可能错过的消息
+
+监听任务在应用生命周期内运行；未运行时 is_listening 为 False，
+依赖本总线的缓存应据此回退到直接查询 Redis。
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+import redis.asyncio as redis
+
+from src.config import settings
+from src.redis_client import redis_pool
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str], None]
+ResyncCallback = Callable[[redis.Redis], Awaitable[None]]
+
+
+class InvalidationBus:
+    """Redis pub/sub 消息总线"""
+
+    def __init__(self, resync_interval: float, reconnect_delay: float = 1.0):
+        self.resync_interval = resync_interval
+        self.reconnect_delay = reconnect_delay
+
+        self._handlers: dict[str, list[MessageHandler]] = {}
+        self._resync_callbacks: list[ResyncCallback] = []
+        self._task: asyncio.Task | None = None
+        self._listening = False
+
+    @property
+    def is_listening(self) -> bool:
+        """当前是否已订阅并完成同步（可以信任进程内状态）"""
+        return self._listening
+
+    def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_resync(self, callback: ResyncCallback) -> None:
+        self._resync_callbacks.append(callback)
+
+    def _dispatch(self, channel: str, message: str) -> None:
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error(f"处理消息失败 channel={channel}: {e}", exc_info=True)
+
+    async def publish(
+        self, redis_client: redis.Redis, channel: str, message: str
+    ) -> None:
+        """在本进程内立即处理，并广播给其他 worker"""
+        self._dispatch(channel, message)
+        try:
+            await redis_client.publish(channel, message)
+        except Exception as e:
+            logger.warning(f"广播消息失败 channel={channel}: {e}")
+
+    async def _resync(self, client: redis.Redis) -> None:
+        for callback in self._resync_callbacks:
+            await callback(client)
+
+    async def _listen_once(self) -> None:
+        client = redis.Redis(connection_pool=redis_pool)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(*self._handlers.keys())
+            # 先订阅再同步：同步期间到达的消息不会丢失
+            await self._resync(client)
+            self._listening = True
+            loop = asyncio.get_running_loop()
+            next_resync = loop.time() + self.resync_interval
+
+            while True:
+                message = await pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    self._dispatch(message["channel"], message["data"])
+                if loop.time() >= next_resync:
+                    await self._resync(client)
+                    next_resync = loop.time() + self.resync_interval
+        finally:
+            self._listening = False
+            await pubsub.aclose()
+            await client.aclose()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"消息总线连接中断，{self.reconnect_delay}s 后重连: {e}")
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def start(self) -> None:
+        if self._task is None and self._handlers:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+invalidation_bus = InvalidationBus(
+    resync_interval=settings.INVALIDATION_BUS_RESYNC_SECONDS
+)
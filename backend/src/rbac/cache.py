@@ -0,0 +1,449 @@
+"""
+用户有效权限位掩码的两级缓存
+
+用户的有效权限只取决于其角色集合，因此缓存分为两部分：
+
+- 用户 -> 角色ID列表：rbac:user_roles:<user_id>，用户角色变更时删除
+- 角色集合 -> 位掩码：rbac:role_set_mask:<注册表指纹>:<RBAC 版本>:<角色签名>，
+  角色签名由角色ID及其代数（generation）组成，拥有相同角色的用户共享同一条目
+
+每个角色有一个代数计数器（Redis 哈希 rbac:role_generations）。角色的权限变更时只需递增该角色的代数，
+包含该角色的所有角色集合的掩码立即不可达（随 TTL 自然过期），与拥有该角色的用户数量无关。
+角色继承自父角色的权限也编译在其掩码中，父角色变更时递增其全部子孙角色的代数。
+全局 RBAC 版本在权限目录变化时递增（all/admin 策略的掩码随之变化）。
+
+两级缓存：
+
+- L1：进程内（用户角色 LRU + TTL，角色集合掩码 LRU，角色代数表），命中时不访问 Redis
+- L2：Redis，未命中 L1 时由一个 Lua 脚本一次往返取得版本、用户角色、角色代数和掩码
+
+各 worker 通过消息总线同步版本、角色代数和用户失效；消息总线未在监听时不使用 L1。
+"""
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import redis.asyncio as redis
+from redis.exceptions import NoScriptError
+
+from src.config import settings
+from src.pubsub import invalidation_bus
+from src.rbac.constants import (
+    RBAC_INVALIDATION_CHANNEL,
+    REDIS_RBAC_VERSION_KEY,
+    REDIS_ROLE_GENERATIONS_KEY,
+    REDIS_ROLE_SET_MASK_PREFIX,
+    REDIS_USER_ROLES_PREFIX,
+)
+from src.rbac.registry import permission_registry
+
+logger = logging.getLogger(__name__)
+
+# KEYS: RBAC 版本、用户角色、角色代数哈希
+# ARGV: 角色集合掩码键前缀（含注册表指纹）
+# 返回：{版本, 用户角色（未缓存时为 false）, 角色签名, 掩码（未缓存时为 false）}
+_LOOKUP_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local roles = redis.call('GET', KEYS[2])
+if not roles then
+    return {version}
+end
+local signature = ''
+if roles ~= '' then
+    local ids = {}
+    for id in string.gmatch(roles, '[^,]+') do
+        ids[#ids + 1] = id
+    end
+    local generations = redis.call('HMGET', KEYS[3], unpack(ids))
+    local parts = {}
+    for i, id in ipairs(ids) do
+        parts[i] = id .. '.' .. (generations[i] or '0')
+    end
+    signature = table.concat(parts, ',')
+end
+local mask = redis.call('GET', ARGV[1] .. version .. ':' .. signature)
+return {version, roles, signature, mask}
+"""
+_LOOKUP_SCRIPT_SHA = hashlib.sha1(_LOOKUP_SCRIPT.encode()).hexdigest()
+
+
+def _user_roles_key(user_id: int) -> str:
+    return f"{REDIS_USER_ROLES_PREFIX}{user_id}"
+
+
+def _mask_key_prefix() -> str:
+    return f"{REDIS_ROLE_SET_MASK_PREFIX}{permission_registry.fingerprint}:"
+
+
+def _signature(role_ids: tuple[int, ...], generations: dict[int, int]) -> str:
+    return ",".join(f"{role_id}.{generations.get(role_id, 0)}" for role_id in role_ids)
+
+
+@dataclass(frozen=True, slots=True)
+class _Lookup:
+    """L2 查询结果"""
+
+    version: int
+    role_ids: tuple[int, ...] | None
+    signature: str | None
+    mask: int | None
+
+
+class PermissionCache:
+    """L1 进程内缓存 + L2 Redis 缓存"""
+
+    def __init__(self, max_entries: int, ttl: float, l2_ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.l2_ttl = l2_ttl
+        # user_id -> (角色ID, 过期时间)
+        self._user_roles: OrderedDict[int, tuple[tuple[int, ...], float]] = (
+            OrderedDict()
+        )
+        # (版本, 角色签名) -> 位掩码；键包含代数和版本，条目本身不会过时
+        self._role_set_masks: OrderedDict[tuple[int, str], int] = OrderedDict()
+        # 本 worker 已知的 RBAC 版本和角色代数（重新同步时从 Redis 读取）
+        self.version: int | None = None
+        self._role_generations: dict[int, int] = {}
+        # 每次用户失效递增；加载期间发生过失效的用户角色不写入 L1
+        self.generation = 0
+
+        self._l1_hits = 0
+        self._l2_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @property
+    def l1_enabled(self) -> bool:
+        return (
+            settings.PERMISSION_CACHE_L1_ENABLED
+            and invalidation_bus.is_listening
+            and self.version is not None
+        )
+
+    def _l1_get(self, user_id: int) -> int | None:
+        entry = self._user_roles.get(user_id)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._user_roles[user_id]
+            return None
+        signature = _signature(entry[0], self._role_generations)
+        mask = self._role_set_masks.get((self.version, signature))
+        if mask is None:
+            return None
+        self._user_roles.move_to_end(user_id)
+        self._role_set_masks.move_to_end((self.version, signature))
+        return mask
+
+    def _l1_put(
+        self,
+        user_id: int,
+        role_ids: tuple[int, ...],
+        version: int,
+        signature: str,
+        mask: int,
+        generation: int,
+    ) -> None:
+        if not self.l1_enabled:
+            return
+        self._role_set_masks[(version, signature)] = mask
+        self._role_set_masks.move_to_end((version, signature))
+        while len(self._role_set_masks) > self.max_entries:
+            self._role_set_masks.popitem(last=False)
+
+        if generation != self.generation:
+            return
+        self._user_roles[user_id] = (role_ids, time.monotonic() + self.ttl)
+        self._user_roles.move_to_end(user_id)
+        while len(self._user_roles) > self.max_entries:
+            self._user_roles.popitem(last=False)
+
+    async def _lookup_many(
+        self, redis_client: redis.Redis, user_ids: list[int]
+    ) -> list[_Lookup]:
+        """一次往返查询多个用户（流水线执行查询脚本）"""
+        mask_key_prefix = _mask_key_prefix()
+        for attempt in range(2):
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for user_id in user_ids:
+                    pipe.evalsha(
+                        _LOOKUP_SCRIPT_SHA,
+                        3,
+                        REDIS_RBAC_VERSION_KEY,
+                        _user_roles_key(user_id),
+                        REDIS_ROLE_GENERATIONS_KEY,
+                        mask_key_prefix,
+                    )
+                try:
+                    results = await pipe.execute()
+                    break
+                except NoScriptError:
+                    if attempt:
+                        raise
+                    await redis_client.script_load(_LOOKUP_SCRIPT)
+        return [self._parse_lookup(result) for result in results]
+
+    @staticmethod
+    def _parse_lookup(result: list) -> _Lookup:
+        version = int(result[0])
+        if len(result) == 1:
+            return _Lookup(version, None, None, None)
+        role_ids = tuple(int(r) for r in result[1].split(",") if r)
+        mask = int(result[3], 16) if len(result) > 3 and result[3] else None
+        return _Lookup(version, role_ids, result[2], mask)
+
+    async def get_or_load(
+        self,
+        user_id: int,
+        load_role_ids: Callable[[], Awaitable[list[int]]],
+        compile_mask: Callable[[list[int]], Awaitable[int]],
+    ) -> int:
+        """
+        获取用户的有效权限位掩码
+
+        缓存未命中时，load_role_ids 从数据库加载用户的角色ID，
+        compile_mask 将角色集合编译为位掩码。
+        """
+        masks = await self.get_many([user_id], lambda _: load_role_ids(), compile_mask)
+        return masks[user_id]
+
+    async def get_many(
+        self,
+        user_ids: list[int],
+        load_role_ids: Callable[[int], Awaitable[list[int]]],
+        compile_mask: Callable[[list[int]], Awaitable[int]],
+    ) -> dict[int, int]:
+        """
+        批量获取多个用户的有效权限位掩码
+
+        L1 未命中的用户在一次 Redis 往返中查询，只有 L2 也未命中的用户才访问数据库。
+        """
+        masks = {}
+        pending = []
+        for user_id in dict.fromkeys(user_ids):
+            mask = self._l1_get(user_id) if self.l1_enabled else None
+            if mask is not None:
+                self._l1_hits += 1
+                masks[user_id] = mask
+            else:
+                pending.append(user_id)
+        if not pending:
+            return masks
+
+        from src.redis_client import get_redis_client
+
+        generation = self.generation
+        lookups = [None] * len(pending)
+        try:
+            async for redis_client in get_redis_client():
+                lookups = await self._lookup_many(redis_client, pending)
+        except Exception:
+            pass  # 缓存失败时降级为数据库查询
+
+        for user_id, lookup in zip(pending, lookups):
+            masks[user_id] = await self._resolve(
+                user_id,
+                lookup,
+                generation,
+                lambda: load_role_ids(user_id),
+                compile_mask,
+            )
+        return masks
+
+    async def _resolve(
+        self,
+        user_id: int,
+        lookup: _Lookup | None,
+        generation: int,
+        load_role_ids: Callable[[], Awaitable[list[int]]],
+        compile_mask: Callable[[list[int]], Awaitable[int]],
+    ) -> int:
+        """根据 L2 查询结果得到位掩码，未命中时从数据库计算并写回缓存"""
+        from src.redis_client import get_redis_client
+
+        if lookup is not None and lookup.mask is not None:
+            self._l2_hits += 1
+            self._l1_put(
+                user_id,
+                lookup.role_ids,
+                lookup.version,
+                lookup.signature,
+                lookup.mask,
+                generation,
+            )
+            return lookup.mask
+
+        self._misses += 1
+        if lookup is None:
+            # Redis 不可用时直接查询数据库
+            return await compile_mask(await load_role_ids())
+
+        role_ids, signature = lookup.role_ids, lookup.signature
+        if role_ids is None:
+            role_ids = tuple(sorted(await load_role_ids()))
+            try:
+                async for redis_client in get_redis_client():
+                    signature = await self._cache_user_roles(
+                        redis_client, user_id, role_ids
+                    )
+            except Exception:
+                pass  # 缓存写入失败不影响功能
+
+        mask = await compile_mask(list(role_ids))
+        if signature is not None:
+            try:
+                async for redis_client in get_redis_client():
+                    await redis_client.set(
+                        f"{_mask_key_prefix()}{lookup.version}:{signature}",
+                        format(mask, "x"),
+                        ex=self.l2_ttl,
+                    )
+            except Exception:
+                pass  # 缓存写入失败不影响功能
+            self._l1_put(user_id, role_ids, lookup.version, signature, mask, generation)
+        return mask
+
+    async def _cache_user_roles(
+        self, redis_client: redis.Redis, user_id: int, role_ids: tuple[int, ...]
+    ) -> str:
+        """写入用户角色，并返回按当前角色代数计算的签名"""
+        await redis_client.set(
+            _user_roles_key(user_id), ",".join(map(str, role_ids)), ex=self.l2_ttl
+        )
+        # 先读取代数再编译：编译期间角色若被修改，结果写入旧代数的键，不会被读到
+        generations = {}
+        if role_ids:
+            values = await redis_client.hmget(
+                REDIS_ROLE_GENERATIONS_KEY, [str(r) for r in role_ids]
+            )
+            generations = {
+                role_id: int(value)
+                for role_id, value in zip(role_ids, values)
+                if value is not None
+            }
+        return _signature(role_ids, generations)
+
+    def apply(self, message: str) -> None:
+        """
+        处理失效消息：
+
+        - "version:<n>"：全局 RBAC 版本变化
+        - "role:<id>:<generation>"：角色代数变化
+        - "user:<id>"：单个用户的角色变化
+        """
+        kind, value = message.split(":", 1)
+        self._invalidations += 1
+        if kind == "version":
+            version = int(value)
+            if self.version is None or version > self.version:
+                self.version = version
+            self._role_set_masks.clear()
+        elif kind == "role":
+            role_id, role_generation = (int(part) for part in value.split(":"))
+            if role_generation > self._role_generations.get(role_id, 0):
+                self._role_generations[role_id] = role_generation
+        else:
+            self.generation += 1
+            self._user_roles.pop(int(value), None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._user_roles.clear()
+        self._role_set_masks.clear()
+
+    async def on_resync(self, redis_client: redis.Redis) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.get(REDIS_RBAC_VERSION_KEY)
+            pipe.hgetall(REDIS_ROLE_GENERATIONS_KEY)
+            version, generations = await pipe.execute()
+        self.version = int(version) if version is not None else 0
+        self._role_generations = {int(k): int(v) for k, v in generations.items()}
+        self.clear()
+
+    def stats(self) -> dict:
+        lookups = self._l1_hits + self._l2_hits + self._misses
+        return {
+            "l1_enabled": self.l1_enabled,
+            "l1_users": len(self._user_roles),
+            "l1_role_sets": len(self._role_set_masks),
+            "version": self.version,
+            "l1_hits": self._l1_hits,
+            "l2_hits": self._l2_hits,
+            "misses": self._misses,
+            "hit_rate": (
+                round((self._l1_hits + self._l2_hits) / lookups, 4) if lookups else None
+            ),
+            "invalidations": self._invalidations,
+        }
+
+
+permission_cache = PermissionCache(
+    max_entries=settings.PERMISSION_CACHE_L1_MAX_ENTRIES,
+    ttl=settings.PERMISSION_CACHE_L1_TTL_SECONDS,
+    l2_ttl=settings.PERMISSION_CACHE_L2_TTL_SECONDS,
+)
+invalidation_bus.subscribe(RBAC_INVALIDATION_CHANNEL, permission_cache.apply)
+invalidation_bus.on_resync(permission_cache.on_resync)
+
+
+async def bump_rbac_version() -> None:
+    """递增全局 RBAC 版本，使所有权限缓存失效（在权限目录变更提交后调用）"""
+    from src.redis_client import get_redis_client
+
+    try:
+        async for redis_client in get_redis_client():
+            version = await redis_client.incr(REDIS_RBAC_VERSION_KEY)
+            await invalidation_bus.publish(
+                redis_client, RBAC_INVALIDATION_CHANNEL, f"version:{version}"
+            )
+    except Exception as e:
+        permission_cache.clear()
+        logger.warning(f"递增 RBAC 版本失败: {e}")
+
+
+async def bump_role_generation(role_id: int) -> None:
+    """递增角色代数，使包含该角色的权限缓存失效（在角色权限变更提交后调用）"""
+    await bump_role_generations([role_id])
+
+
+async def bump_role_generations(role_ids: list[int]) -> None:
+    """批量递增角色代数（如父角色变更时的全部子孙角色）"""
+    from src.redis_client import get_redis_client
+
+    if not role_ids:
+        return
+    try:
+        async for redis_client in get_redis_client():
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for role_id in role_ids:
+                    pipe.hincrby(REDIS_ROLE_GENERATIONS_KEY, str(role_id), 1)
+                generations = await pipe.execute()
+            for role_id, role_generation in zip(role_ids, generations):
+                await invalidation_bus.publish(
+                    redis_client,
+                    RBAC_INVALIDATION_CHANNEL,
+                    f"role:{role_id}:{role_generation}",
+                )
+    except Exception as e:
+        permission_cache.clear()
+        logger.warning(f"递增角色 {role_ids} 代数失败: {e}")
+
+
+async def invalidate_user_permissions(user_id: int) -> None:
+    """使单个用户的权限缓存失效（在用户角色变更提交后调用）"""
+    from src.redis_client import get_redis_client
+
+    try:
+        async for redis_client in get_redis_client():
+            await redis_client.delete(_user_roles_key(user_id))
+            await invalidation_bus.publish(
+                redis_client, RBAC_INVALIDATION_CHANNEL, f"user:{user_id}"
+            )
+    except Exception as e:
+        permission_cache.apply(f"user:{user_id}")
+        logger.warning(f"清除用户 {user_id} 权限缓存失败: {e}")
@@ -0,0 +1,203 @@
+"""
+权限目录快照
+
+all / admin 策略的角色拥有（几乎）全部权限，以前每次权限缓存未命中都要重新查询并排序整张权限表。
+本模块在进程内保存权限目录的不可变快照：
+
+- entries / admin_entries：按 target、action 排序的权限元组（admin 视图不含核心资源的删除权限）
+- all_mask / admin_mask：两种策略对应的权限位掩码
+- 预先序列化的 JSON：按位掩码生成权限列表时只需拼接片段，all/admin 视图直接返回完整 JSON
+- 权限分组（/rbac/permission-groups）的 JSON，由代码中的权限定义生成
+
+权限目录变化（init_rbac_data、创建权限）时会递增全局 RBAC 版本，各 worker 收到版本消息后丢弃快照，
+下次使用时重新加载。消息总线未在监听时不保留快照，每次从数据库加载。
+"""
+
+import json
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.pubsub import invalidation_bus
+from src.rbac import models
+from src.rbac.constants import RBAC_INVALIDATION_CHANNEL
+from src.rbac.registry import permission_registry
+
+# admin 策略不包含这些核心资源的删除权限
+_ADMIN_EXCLUDED_DELETE_TARGETS = ("user", "role", "permission")
+
+# 按位掩码生成的权限列表 JSON 的缓存条目上限（不同角色集合的数量通常很少）
+_MAX_CACHED_MASKS = 1024
+
+
+def is_admin_permission(target: str, action: str) -> bool:
+    """admin 策略是否包含该权限"""
+    return not (target in _ADMIN_EXCLUDED_DELETE_TARGETS and action == "delete")
+
+
+def _dumps(value) -> bytes:
+    # 与 FastAPI 的 JSONResponse 序列化方式一致
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+@dataclass(frozen=True, slots=True)
+class PermissionEntry:
+    """权限的只读快照"""
+
+    id: int
+    target: str
+    action: str
+    display_name: str
+    description: str | None
+
+    @property
+    def permission_key(self) -> str:
+        return f"{self.target}:{self.action}"
+
+    def to_dict(self) -> dict:
+        return {
+            "target": self.target,
+            "action": self.action,
+            "display_name": self.display_name,
+            "description": self.description,
+        }
+
+
+@dataclass(frozen=True)
+class PermissionCatalog:
+    """权限目录快照（创建后不再修改，按掩码生成的 JSON 除外）"""
+
+    entries: tuple[PermissionEntry, ...]
+    admin_entries: tuple[PermissionEntry, ...]
+    all_mask: int
+    admin_mask: int
+    _fragments: tuple[bytes, ...]
+    _json_by_mask: dict[int, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, entries: tuple[PermissionEntry, ...]) -> "PermissionCatalog":
+        admin_entries = tuple(
+            e for e in entries if is_admin_permission(e.target, e.action)
+        )
+        catalog = cls(
+            entries=entries,
+            admin_entries=admin_entries,
+            all_mask=permission_registry.mask_of(e.permission_key for e in entries),
+            admin_mask=permission_registry.mask_of(
+                e.permission_key for e in admin_entries
+            ),
+            _fragments=tuple(_dumps(e.to_dict()) for e in entries),
+        )
+        catalog._json_by_mask[catalog.all_mask] = _dumps([e.to_dict() for e in entries])
+        catalog._json_by_mask[catalog.admin_mask] = _dumps(
+            [e.to_dict() for e in admin_entries]
+        )
+        return catalog
+
+    def entries_in(self, mask: int) -> list[PermissionEntry]:
+        """位掩码包含的权限（按 target、action 排序）"""
+        return [
+            e for e in self.entries if permission_registry.has(mask, e.permission_key)
+        ]
+
+    def permissions_json(self, mask: int) -> bytes:
+        """位掩码包含的权限列表的 JSON（结构化格式）"""
+        cached = self._json_by_mask.get(mask)
+        if cached is not None:
+            return cached
+        body = (
+            b"["
+            + b",".join(
+                fragment
+                for entry, fragment in zip(self.entries, self._fragments)
+                if permission_registry.has(mask, entry.permission_key)
+            )
+            + b"]"
+        )
+        if len(self._json_by_mask) < _MAX_CACHED_MASKS:
+            self._json_by_mask[mask] = body
+        return body
+
+
+async def load_permission_catalog(db: AsyncSession) -> PermissionCatalog:
+    """从数据库加载权限目录"""
+    result = await db.execute(
+        select(
+            models.Permission.id,
+            models.Permission.target,
+            models.Permission.action,
+            models.Permission.display_name,
+            models.Permission.description,
+        ).order_by(models.Permission.target, models.Permission.action)
+    )
+    return PermissionCatalog.build(tuple(PermissionEntry(*row) for row in result.all()))
+
+
+class PermissionCatalogCache:
+    """进程内的权限目录快照"""
+
+    def __init__(self):
+        self._snapshot: PermissionCatalog | None = None
+        # 每次失效递增；加载期间发生过失效的结果不保存
+        self.generation = 0
+
+        self._hits = 0
+        self._loads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return invalidation_bus.is_listening
+
+    async def get(self, db: AsyncSession) -> PermissionCatalog:
+        snapshot = self._snapshot
+        if snapshot is not None and self.enabled:
+            self._hits += 1
+            return snapshot
+        return await self.rebuild(db)
+
+    async def rebuild(self, db: AsyncSession) -> PermissionCatalog:
+        generation = self.generation
+        snapshot = await load_permission_catalog(db)
+        self._loads += 1
+        if self.enabled and generation == self.generation:
+            self._snapshot = snapshot
+        return snapshot
+
+    def apply(self, message: str) -> None:
+        # 只关心全局版本变化（权限目录变更）
+        if message.startswith("version:"):
+            self.clear()
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._snapshot = None
+
+    async def on_resync(self, redis_client) -> None:
+        self.clear()
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "enabled": self.enabled,
+            "permissions": len(snapshot.entries) if snapshot is not None else None,
+            "hits": self._hits,
+            "loads": self._loads,
+        }
+
+
+permission_catalog = PermissionCatalogCache()
+invalidation_bus.subscribe(RBAC_INVALIDATION_CHANNEL, permission_catalog.apply)
+invalidation_bus.on_resync(permission_catalog.on_resync)
+
+_permission_groups_json: bytes | None = None
+
+
+def permission_groups_json() -> bytes:
+    """权限分组配置的 JSON（只取决于代码中的权限定义，生成一次）"""
+    global _permission_groups_json
+    if _permission_groups_json is None:
+        from src.rbac.init_data import auto_generate_permission_groups
+
+        _permission_groups_json = _dumps(auto_generate_permission_groups())
+    return _permission_groups_json
@@ -0,0 +1,19 @@
+# RBAC module constants
+
+# Redis key prefixes
+REDIS_RBAC_VERSION_KEY = "rbac:version"
+REDIS_ROLE_GENERATIONS_KEY = "rbac:role_generations"  # 哈希：role_id -> 代数
+REDIS_USER_ROLES_PREFIX = "rbac:user_roles:"
+REDIS_ROLE_SET_MASK_PREFIX = "rbac:role_set_mask:"
+
+# Redis pub/sub 频道
+RBAC_INVALIDATION_CHANNEL = "rbac:invalidations"
+
+# 启动时 RBAC 同步使用的 Postgres 事务级咨询锁（"rbac" 的 ASCII 编码）
+RBAC_SYNC_LOCK_ID = 0x72626163
+
+# rbac_metadata 中保存已同步的权限/角色定义校验和的键
+RBAC_DEFINITIONS_CHECKSUM_KEY = "definitions_checksum"
+
+# 修改角色继承关系时使用的事务级咨询锁（串行化环检测和闭包表维护）
+ROLE_HIERARCHY_LOCK_ID = 0x726F6C65
@@ -4,24 +4,24 @@ from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.dependencies import get_current_user
-from src.auth.models import User
+from src.auth.principal import Principal
 from src.database import get_async_db
 from src.rbac import service
-from src.rbac.exceptions import InsufficientPermissionsException
+from src.rbac.policy import PolicyEngine, get_policy_engine
 
 
 async def require_permission(
     permission: str,
-    db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user),
-) -> User:
+    policy: PolicyEngine = Depends(get_policy_engine),
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """
     权限检查依赖函数
 
     Args:
         permission: 需要的权限，如 "user:read"
-        db: 数据库会话
-        current_user: 当前用户
+        policy: 当前请求的策略引擎
+        current_user: 当前认证主体
 
     Returns:
         当前用户（如果有权限）
@@ -29,11 +29,7 @@ async def require_permission(
     Raises:
         HTTPException: 如果没有权限
     """
-    has_permission = await service.check_user_permission_cached(
-        db, current_user.id, permission
-    )
-    if not has_permission:
-        raise InsufficientPermissionsException(permission)
+    await policy.require(permission)
     return current_user
 
 
@@ -49,10 +45,10 @@ def create_permission_dependency(permission: str) -> Callable:
     """
 
     async def permission_dependency(
-        db: AsyncSession = Depends(get_async_db),
-        current_user: User = Depends(get_current_user),
-    ) -> User:
-        return await require_permission(permission, db, current_user)
+        policy: PolicyEngine = Depends(get_policy_engine),
+        current_user: Principal = Depends(get_current_user),
+    ) -> Principal:
+        return await require_permission(permission, policy, current_user)
 
     return permission_dependency
 
@@ -73,31 +69,9 @@ require_role_mgmt_access = create_permission_dependency("role_mgmt:access")
 require_perm_mgmt_access = create_permission_dependency("perm_mgmt:access")
 
 
-async def get_current_user_permissions(
-    db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user),
-) -> List[dict]:
-    """
-    获取当前用户的所有权限
-
-    Returns:
-        权限对象列表 (结构化格式)
-    """
-    permissions_objs = await service.get_user_permissions_db(db, current_user.id)
-    return [
-        {
-            "target": p.target,
-            "action": p.action,
-            "display_name": p.display_name,
-            "description": p.description,
-        }
-        for p in permissions_objs
-    ]
-
-
 async def get_current_user_roles(
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ) -> List[dict]:
     """
     获取当前用户的所有角色
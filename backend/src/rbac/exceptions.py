@@ -26,6 +26,13 @@ class RoleNotDeletableException(HTTPException):
         )
 
 
+class RoleHierarchyException(HTTPException):
+    """角色继承关系不合法（父角色不存在或形成环）"""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
 class PermissionAlreadyExistsException(HTTPException):
     """权限已存在异常（内部初始化使用）"""
 
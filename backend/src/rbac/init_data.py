@@ -5,10 +5,16 @@ RBAC 初始化数据脚本
 包含权限模板函数，用于快速创建新模块的标准权限集
 """
 
+import hashlib
+import json
 import logging
+from collections import Counter
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from src.rbac import models, service, schemas
+from src.rbac.cache import bump_rbac_version
+from src.rbac.catalog import permission_catalog
+from src.rbac.constants import RBAC_DEFINITIONS_CHECKSUM_KEY, RBAC_SYNC_LOCK_ID
 from src.rbac.models import SystemRoles
 
 logger = logging.getLogger(__name__)
@@ -113,6 +119,19 @@ CORE_PERMISSIONS = [
         "display_name": "删除用户",
         "description": "删除用户账户",
     },
+    # 用户行级范围权限（target:action@scope，拥有 user:read 时不需要）
+    {
+        "target": "user",
+        "action": "read@self",
+        "display_name": "查看用户（仅自己）",
+        "description": "用户列表中只包含自己",
+    },
+    {
+        "target": "user",
+        "action": "read@created",
+        "display_name": "查看用户（自己创建的）",
+        "description": "用户列表中只包含自己创建的用户",
+    },
     # 角色管理权限
     {
         "target": "role",
@@ -243,202 +262,272 @@ BASE_ROLES = [
 ]
 
 
-async def init_permissions(db: AsyncSession) -> dict[str, models.Permission]:
-    """初始化权限数据 - 基于 target:action 格式"""
-    permissions = {}
+async def _sync_permissions(db: AsyncSession) -> bool:
+    """
+    将代码定义的权限同步到数据库（集合操作，不提交）
 
-    for perm_data in BASE_PERMISSIONS:
-        target = perm_data["target"]
-        action = perm_data["action"]
-        permission_key = f"{target}:{action}"
+    Returns:
+        数据库中的权限是否发生了变化
+    """
+    defined = {
+        "targets": [p["target"] for p in BASE_PERMISSIONS],
+        "actions": [p["action"] for p in BASE_PERMISSIONS],
+        "display_names": [p["display_name"] for p in BASE_PERMISSIONS],
+        "descriptions": [p.get("description") for p in BASE_PERMISSIONS],
+    }
+    undefined_filter = """
+        NOT EXISTS (
+            SELECT 1
+            FROM unnest(CAST(:targets AS text[]), CAST(:actions AS text[]))
+                AS d(target, action)
+            WHERE d.target = p.target AND d.action = p.action
+        )
+    """
 
-        # 检查权限是否已存在（基于target+action）
-        existing = await service.get_permission_by_target_action(db, target, action)
-        if existing:
-            # 更新现有权限的显示名称和描述
-            existing.display_name = perm_data["display_name"]
-            existing.description = perm_data.get("description")
-            await db.commit()
-            await db.refresh(existing)
-            permissions[permission_key] = existing
-            continue
-
-        # 创建新权限
-        try:
-            permission = await service.create_permission(
-                db, schemas.PermissionCreate(**perm_data)
+    # 1. 移除未定义权限的角色分配（role_permissions 外键没有级联删除）
+    removed = await db.execute(
+        text(f"""
+            DELETE FROM role_permissions rp
+            USING permissions p
+            WHERE rp.permission_id = p.id AND {undefined_filter}
+            RETURNING p.target, p.action
+        """),
+        defined,
+    )
+    for permission_key, count in Counter(
+        f"{r.target}:{r.action}" for r in removed
+    ).items():
+        logger.warning(f"删除权限 {permission_key}，将移除 {count} 个角色分配")
+
+    # 2. 删除代码中未定义的权限
+    deleted = await db.execute(
+        text(f"""
+            DELETE FROM permissions p
+            WHERE {undefined_filter}
+            RETURNING p.target, p.action
+        """),
+        defined,
+    )
+    to_delete = sorted(f"{r.target}:{r.action}" for r in deleted)
+
+    # 3. 添加新权限并更新显示名称和描述有变化的权限
+    upserted = (
+        await db.execute(
+            text("""
+            INSERT INTO permissions (target, action, display_name, description)
+            SELECT * FROM unnest(
+                CAST(:targets AS text[]),
+                CAST(:actions AS text[]),
+                CAST(:display_names AS text[]),
+                CAST(:descriptions AS text[])
             )
-            permissions[permission_key] = permission
-        except service.PermissionAlreadyExistsException:
-            # 如果在并发情况下权限已被创建，重新获取
-            existing = await service.get_permission_by_target_action(db, target, action)
-            permissions[permission_key] = existing
+            ON CONFLICT (target, action) DO UPDATE
+            SET display_name = EXCLUDED.display_name,
+                description = EXCLUDED.description
+            WHERE (permissions.display_name, permissions.description)
+                IS DISTINCT FROM (EXCLUDED.display_name, EXCLUDED.description)
+            RETURNING target, action, (xmax = 0) AS inserted
+        """),
+            defined,
+        )
+    ).all()
+    to_add = sorted(f"{r.target}:{r.action}" for r in upserted if r.inserted)
 
-    return permissions
+    logger.info(
+        f"权限同步: 新增={len(to_add)}, 删除={len(to_delete)}, "
+        f"更新={len(upserted) - len(to_add)}"
+    )
+    if to_delete:
+        logger.info(f"✅ 删除权限: {to_delete}")
+    if to_add:
+        logger.info(f"✅ 添加权限: {to_add}")
 
+    return bool(to_delete or upserted)
 
-async def init_roles(
-    db: AsyncSession, permissions: dict[str, models.Permission]
-) -> dict[str, models.Role]:
-    """初始化角色数据 - 基于target+action的新逻辑"""
-    roles = {}
-
-    for role_data in BASE_ROLES:
-        # 检查角色是否已存在
-        existing = await service.get_role_by_name(db, role_data["name"])
-        if existing:
-            updated = False
-            if (
-                role_data.get("display_name")
-                and existing.display_name != role_data["display_name"]
-            ):
-                existing.display_name = role_data["display_name"]
-                updated = True
-            if (
-                role_data.get("description") is not None
-                and existing.description != role_data["description"]
-            ):
-                existing.description = role_data["description"]
-                updated = True
-            desired_strategy = role_data.get("permission_strategy", "explicit")
-            if existing.permission_strategy != desired_strategy:
-                existing.permission_strategy = desired_strategy
-                updated = True
-
-            if updated:
-                await db.commit()
-                await db.refresh(existing)
-
-            roles[role_data["name"]] = existing
-            continue
-
-        # 根据权限策略处理权限分配
-        permission_ids = []
-        permission_strategy = role_data.get("permission_strategy", "explicit")
-
-        if permission_strategy == "explicit":
-            # 明确权限策略：使用权限列表
-            for perm_dict in role_data["permissions"]:
-                permission_key = f"{perm_dict['target']}:{perm_dict['action']}"
-                if permission_key in permissions:
-                    permission_ids.append(permissions[permission_key].id)
-        # all和admin策略不需要明确权限，通过智能检查实现
-
-        # 创建角色
-        try:
-            role_create_data = {
-                "name": role_data["name"],
-                "display_name": role_data["display_name"],
-                "description": role_data["description"],
-                "permission_strategy": permission_strategy,
-                "permission_ids": permission_ids,
-            }
 
-            role = await service.create_role(db, schemas.RoleCreate(**role_create_data))
+async def _sync_roles(db: AsyncSession) -> bool:
+    """
+    将代码定义的基础角色同步到数据库（集合操作，不提交）
+
+    已存在的角色只更新显示名称、描述和权限策略；explicit 角色的权限只在角色新建时分配，
+    之后由管理员维护。
+
+    Returns:
+        数据库中的角色是否发生了变化
+    """
+    upserted = (
+        await db.execute(
+            text("""
+            INSERT INTO roles (name, display_name, description, permission_strategy)
+            SELECT * FROM unnest(
+                CAST(:names AS text[]),
+                CAST(:display_names AS text[]),
+                CAST(:descriptions AS text[]),
+                CAST(:strategies AS text[])
+            )
+            ON CONFLICT (name) DO UPDATE
+            SET display_name = EXCLUDED.display_name,
+                description = EXCLUDED.description,
+                permission_strategy = EXCLUDED.permission_strategy
+            WHERE (roles.display_name, roles.description, roles.permission_strategy)
+                IS DISTINCT FROM (
+                    EXCLUDED.display_name,
+                    EXCLUDED.description,
+                    EXCLUDED.permission_strategy
+                )
+            RETURNING id, (xmax = 0) AS inserted
+        """),
+            {
+                "names": [r["name"] for r in BASE_ROLES],
+                "display_names": [r["display_name"] for r in BASE_ROLES],
+                "descriptions": [r.get("description") for r in BASE_ROLES],
+                "strategies": [
+                    r.get("permission_strategy", "explicit") for r in BASE_ROLES
+                ],
+            },
+        )
+    ).all()
+    created_role_ids = [r.id for r in upserted if r.inserted]
+
+    # all 和 admin 策略不需要明确权限，通过权限目录计算
+    grants = [
+        (role["name"], perm["target"], perm["action"])
+        for role in BASE_ROLES
+        if role.get("permission_strategy", "explicit") == "explicit"
+        for perm in role["permissions"]
+    ]
+    if created_role_ids and grants:
+        names, targets, actions = (list(column) for column in zip(*grants))
+        await db.execute(
+            text("""
+                INSERT INTO role_permissions (role_id, permission_id)
+                SELECT r.id, p.id
+                FROM unnest(
+                    CAST(:names AS text[]),
+                    CAST(:targets AS text[]),
+                    CAST(:actions AS text[])
+                ) AS g(name, target, action)
+                JOIN roles r ON r.name = g.name
+                JOIN permissions p ON p.target = g.target AND p.action = g.action
+                WHERE r.id = ANY(:role_ids)
+            """),
+            {
+                "names": names,
+                "targets": targets,
+                "actions": actions,
+                "role_ids": created_role_ids,
+            },
+        )
+
+    if upserted:
+        logger.info(
+            f"✅ 角色同步: 新增={len(created_role_ids)}, "
+            f"更新={len(upserted) - len(created_role_ids)}"
+        )
+    return bool(upserted)
+
+
+def definitions_checksum() -> str:
+    """代码中权限和基础角色定义的规范化摘要（与定义顺序无关）"""
+    permissions = sorted(
+        (
+            {
+                "target": p["target"],
+                "action": p["action"],
+                "display_name": p["display_name"],
+                "description": p.get("description"),
+            }
+            for p in BASE_PERMISSIONS
+        ),
+        key=lambda p: (p["target"], p["action"]),
+    )
+    roles = sorted(
+        (
+            {
+                "name": r["name"],
+                "display_name": r["display_name"],
+                "description": r.get("description"),
+                "permission_strategy": r.get("permission_strategy", "explicit"),
+                "permissions": sorted(
+                    f"{p['target']}:{p['action']}" for p in r["permissions"]
+                ),
+            }
+            for r in BASE_ROLES
+        ),
+        key=lambda r: r["name"],
+    )
+    canonical = json.dumps(
+        {"permissions": permissions, "roles": roles},
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
 
-            roles[role_data["name"]] = role
-        except service.RoleAlreadyExistsException:
-            # 如果在并发情况下角色已被创建，重新获取
-            existing = await service.get_role_by_name(db, role_data["name"])
-            roles[role_data["name"]] = existing
 
-    return roles
+async def stored_definitions_checksum(db: AsyncSession) -> str | None:
+    """上次同步时记录的定义校验和"""
+    return await db.scalar(
+        text("SELECT value FROM rbac_metadata WHERE key = :key"),
+        {"key": RBAC_DEFINITIONS_CHECKSUM_KEY},
+    )
 
 
-async def init_rbac_data(db: AsyncSession) -> None:
+async def init_rbac_data(db: AsyncSession, force: bool = False) -> bool:
     """
     初始化RBAC数据 - 完全同步模式
     将代码定义的权限与数据库完全同步：
     - 添加新权限
     - 更新已有权限的显示名称和描述
     - 删除代码中未定义的权限
-    """
-
-    # 1. 获取代码中定义的所有权限
-    defined_permissions = {f"{p['target']}:{p['action']}": p for p in BASE_PERMISSIONS}
+    - 创建或更新基础角色
 
-    # 2. 获取数据库中现有权限
-    result = await db.execute(text("SELECT target, action FROM permissions"))
-    db_permissions = {f"{r.target}:{r.action}" for r in result}
+    所有语句都是集合操作，在同一个事务中执行，并持有事务级咨询锁。
+    同步完成后在 rbac_metadata 中记录定义的校验和；校验和未变化时直接跳过（force 强制同步）。
+    多个 worker 同时启动时，第一个拿到锁的 worker 执行同步，其余 worker 拿到锁后发现校验和已更新而跳过。
 
-    # 3. 计算差异
-    to_add = set(defined_permissions.keys()) - db_permissions
-    to_delete = db_permissions - set(defined_permissions.keys())
-    to_update = set(defined_permissions.keys()) & db_permissions
-
-    logger.info(
-        f"权限同步分析: 新增={len(to_add)}, 删除={len(to_delete)}, 更新={len(to_update)}"
-    )
+    Returns:
+        是否执行了同步
+    """
+    checksum = definitions_checksum()
+    try:
+        if not force and await stored_definitions_checksum(db) == checksum:
+            await db.rollback()
+            logger.info("权限定义未变化，跳过同步")
+            return False
 
-    # 4. 删除未定义的权限
-    if to_delete:
-        # 记录被删除权限的影响
-        affected = await db.execute(
-            text("""
-            SELECT p.target, p.action, COUNT(rp.id) as role_count
-            FROM permissions p
-            LEFT JOIN role_permissions rp ON p.id = rp.permission_id
-            WHERE concat(p.target, ':', p.action) = ANY(:perms)
-            GROUP BY p.target, p.action
-        """),
-            {"perms": list(to_delete)},
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(:lock_id)"),
+            {"lock_id": RBAC_SYNC_LOCK_ID},
         )
-
-        for row in affected:
-            if row.role_count > 0:
-                logger.warning(
-                    f"删除权限 {row.target}:{row.action}，"
-                    f"将移除 {row.role_count} 个角色分配"
-                )
-
-        # 执行删除（外键级联会自动删除 role_permissions）
+        # 等待锁期间其他 worker 可能已完成同步
+        if not force and await stored_definitions_checksum(db) == checksum:
+            await db.rollback()
+            logger.info("权限定义已由其他实例同步，跳过")
+            return False
+
+        permissions_changed = await _sync_permissions(db)
+        roles_changed = await _sync_roles(db)
         await db.execute(
             text("""
-            DELETE FROM permissions 
-            WHERE concat(target, ':', action) = ANY(:perms)
-        """),
-            {"perms": list(to_delete)},
-        )
-
-        logger.info(f"✅ 删除权限: {sorted(to_delete)}")
-
-    # 5. 添加新权限
-    if to_add:
-        for perm_key in to_add:
-            perm_data = defined_permissions[perm_key]
-            await db.execute(
-                text("""
-                INSERT INTO permissions (target, action, display_name, description)
-                VALUES (:target, :action, :display_name, :description)
+                INSERT INTO rbac_metadata (key, value) VALUES (:key, :value)
+                ON CONFLICT (key) DO UPDATE
+                SET value = EXCLUDED.value, updated_at = now()
             """),
-                perm_data,
-            )
-
-        logger.info(f"✅ 添加权限: {sorted(to_add)}")
-
-    # 6. 更新已有权限
-    if to_update:
-        for perm_key in to_update:
-            perm_data = defined_permissions[perm_key]
-            await db.execute(
-                text("""
-                UPDATE permissions 
-                SET display_name = :display_name,
-                    description = :description
-                WHERE target = :target AND action = :action
-            """),
-                perm_data,
-            )
-
-        logger.info(f"✅ 更新权限: {len(to_update)} 个")
-
-    # 7. 重新获取所有权限用于角色初始化
-    updated_permissions = await init_permissions(db)
-
-    # 8. 初始化角色
-    await init_roles(db, updated_permissions)
-
-    logger.info(f"📊 权限同步完成，当前总计: {len(defined_permissions)} 个权限")
+            {"key": RBAC_DEFINITIONS_CHECKSUM_KEY, "value": checksum},
+        )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    # 提交之后再使缓存失效，避免其他 worker 在提交前用旧数据重建缓存
+    if permissions_changed or roles_changed:
+        await bump_rbac_version()
+    await permission_catalog.rebuild(db)
+
+    logger.info(f"📊 权限同步完成，当前总计: {len(BASE_PERMISSIONS)} 个权限")
+    return True
 
 
 # ============================================================================
@@ -1,6 +1,7 @@
+from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, String, Text, UniqueConstraint, Index
+from sqlalchemy import ForeignKey, String, Text, UniqueConstraint, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database import Base
@@ -48,6 +49,9 @@ class Role(Base):
     users: Mapped[list["UserRole"]] = relationship(
         back_populates="role", cascade="all, delete-orphan"
     )
+    parent_links: Mapped[list["RoleParent"]] = relationship(
+        foreign_keys="RoleParent.role_id", cascade="all, delete-orphan"
+    )
 
 
 class Permission(Base):
@@ -99,11 +103,52 @@ class RolePermission(Base):
     role_id: Mapped[int] = mapped_column(ForeignKey("roles.id"))
     permission_id: Mapped[int] = mapped_column(ForeignKey("permissions.id"))
 
+    # 同一权限只能分配一次（批量写入使用 ON CONFLICT DO NOTHING）
+    __table_args__ = (
+        Index(
+            "uq_role_permissions_role_id_permission_id",
+            "role_id",
+            "permission_id",
+            unique=True,
+        ),
+    )
+
     # 关系
     role: Mapped["Role"] = relationship(back_populates="role_permissions")
     permission: Mapped["Permission"] = relationship(back_populates="role_permissions")
 
 
+class RoleParent(Base):
+    """角色继承关系表 - 角色直接继承的父角色"""
+
+    __tablename__ = "role_parents"
+
+    role_id: Mapped[int] = mapped_column(
+        ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True
+    )
+    parent_id: Mapped[int] = mapped_column(
+        ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+
+class RoleClosure(Base):
+    """角色继承的传递闭包表 - 每个角色的全部祖先（不含自身），在写入继承关系时维护"""
+
+    __tablename__ = "role_closure"
+
+    ancestor_id: Mapped[int] = mapped_column(
+        ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[int] = mapped_column(
+        ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True
+    )
+    depth: Mapped[int] = mapped_column()  # 最短继承路径长度（直接父角色为 1）
+
+    __table_args__ = (
+        Index("ix_role_closure_descendant_ancestor", "descendant_id", "ancestor_id"),
+    )
+
+
 class UserRole(Base):
     """用户角色关联表 - 简化模型"""
 
@@ -113,6 +158,23 @@ class UserRole(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     role_id: Mapped[int] = mapped_column(ForeignKey("roles.id"))
 
+    # 同一角色只能分配一次（批量写入使用 ON CONFLICT DO NOTHING）
+    __table_args__ = (
+        Index("uq_user_roles_user_id_role_id", "user_id", "role_id", unique=True),
+    )
+
     # 关系
     user: Mapped["User"] = relationship("User", back_populates="user_roles")
     role: Mapped["Role"] = relationship(back_populates="users")
+
+
+class RbacMetadata(Base):
+    """RBAC 元数据表 - 键值对（如已同步的权限定义校验和）"""
+
+    __tablename__ = "rbac_metadata"
+
+    key: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[str] = mapped_column(String(128))
+    updated_at: Mapped[datetime] = mapped_column(
+        server_default=func.now(), onupdate=func.now()
+    )
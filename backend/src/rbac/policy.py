@@ -0,0 +1,116 @@
+"""
+授权策略引擎
+
+所有授权检查（rbac/dependencies 的 require_*、users/dependencies 的 *_or_self、
+rbac/router 中的临时检查、/auth/verify）都通过 PolicyEngine 完成：
+
+- 每个请求一个引擎实例：get_policy_engine 作为 FastAPI 依赖，同一请求内的多个依赖共享依赖缓存中的实例
+- 用户的有效权限位掩码在每个请求中只读取一次（进程内 L1 / Redis L2 / 数据库）
+- 同一请求内的重复判断直接返回记忆的结果
+- 按权限记录放行 / 拒绝次数和判断耗时（/health 的 authorization 指标）
+"""
+
+import time
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.dependencies import get_current_user
+from src.auth.principal import Principal
+from src.database import get_async_db
+from src.rbac import service
+from src.rbac.exceptions import InsufficientPermissionsException
+from src.rbac.registry import permission_registry
+
+# 未登记的权限标识（如 /auth/verify 查询参数中的任意字符串）合并统计，避免指标无限增长
+_UNKNOWN_PERMISSION = "<unknown>"
+
+
+class PolicyMetrics:
+    """按权限统计的授权决策次数与平均耗时"""
+
+    def __init__(self):
+        # 权限 -> [放行次数, 拒绝次数, 累计耗时秒数]
+        self._decisions: dict[str, list] = {}
+        self._memoized = 0
+
+    def record(self, permission: str, allowed: bool, seconds: float) -> None:
+        if permission_registry.bit(permission) is None:
+            permission = _UNKNOWN_PERMISSION
+        counters = self._decisions.get(permission)
+        if counters is None:
+            counters = self._decisions[permission] = [0, 0, 0.0]
+        counters[0 if allowed else 1] += 1
+        counters[2] += seconds
+
+    def record_memoized(self) -> None:
+        self._memoized += 1
+
+    def stats(self) -> dict:
+        return {
+            "memoized": self._memoized,
+            "permissions": {
+                permission: {
+                    "allowed": allowed,
+                    "denied": denied,
+                    "avg_latency_ms": round(
+                        total_seconds / (allowed + denied) * 1000, 3
+                    ),
+                }
+                for permission, (allowed, denied, total_seconds) in sorted(
+                    self._decisions.items()
+                )
+            },
+        }
+
+
+policy_metrics = PolicyMetrics()
+
+
+class PolicyEngine:
+    """单个请求内某个用户的授权决策"""
+
+    def __init__(self, db: AsyncSession, user_id: int):
+        self.db = db
+        self.user_id = user_id
+        self._mask: int | None = None
+        self._decisions: dict[str, bool] = {}
+
+    async def mask(self) -> int:
+        """用户的有效权限位掩码（每个引擎只读取一次缓存）"""
+        if self._mask is None:
+            self._mask = await service.get_user_permission_mask_cached(
+                self.db, self.user_id
+            )
+        return self._mask
+
+    async def allows(self, permission: str) -> bool:
+        decision = self._decisions.get(permission)
+        if decision is not None:
+            policy_metrics.record_memoized()
+            return decision
+
+        start = time.perf_counter()
+        decision = service.check_permissions_in_mask(await self.mask(), [permission])[
+            permission
+        ]
+        policy_metrics.record(permission, decision, time.perf_counter() - start)
+        self._decisions[permission] = decision
+        return decision
+
+    async def require(self, permission: str) -> None:
+        """没有权限时抛出 403"""
+        if not await self.allows(permission):
+            raise InsufficientPermissionsException(permission)
+
+    async def allows_or_self(self, user_id: int, permission: str) -> bool:
+        """操作自己的资源，或拥有对应权限"""
+        return user_id == self.user_id or await self.allows(permission)
+
+
+async def get_policy_engine(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+) -> PolicyEngine:
+    """当前请求的策略引擎（FastAPI 依赖缓存保证同一请求内只创建一次）"""
+    return PolicyEngine(db, current_user.id)
@@ -0,0 +1,83 @@
+"""
+权限位图注册表
+
+为每个 target:action 分配一个位序号，角色和用户的有效权限编译为整数位掩码：
+
+- 角色掩码：explicit 角色为其权限位之和；all / admin 策略角色由权限目录计算
+- 用户掩码：用户所有角色掩码按位或
+- 权限检查：一次位与运算
+
+位序号按 BASE_PERMISSIONS 的定义顺序分配；数据库中存在但代码未定义的权限
+（如运行期间通过 create_permission 创建）在首次遇到时追加到末尾，已分配的位序号不会改变。
+不同 worker 的追加顺序可能不同，缓存键中应包含 fingerprint，只复用同一注册表编译出的掩码。
+"""
+
+import hashlib
+from collections.abc import Iterable
+
+
+class PermissionRegistry:
+    """target:action -> 位序号"""
+
+    def __init__(self):
+        self._keys: list[str] = []
+        self._bits: dict[str, int] = {}
+        self._fingerprint: str | None = None
+        self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        # 延迟导入：init_data 依赖 rbac.cache
+        from src.rbac.init_data import BASE_PERMISSIONS
+
+        self.register(f"{p['target']}:{p['action']}" for p in BASE_PERMISSIONS)
+
+    def register(self, keys: Iterable[str]) -> None:
+        """为未登记的权限分配位序号"""
+        for key in keys:
+            if key not in self._bits:
+                self._bits[key] = len(self._keys)
+                self._keys.append(key)
+                self._fingerprint = None
+
+    def bit(self, key: str) -> int | None:
+        self._ensure_loaded()
+        return self._bits.get(key)
+
+    def mask_of(self, keys: Iterable[str]) -> int:
+        """权限键集合 -> 位掩码（未登记的键会被登记）"""
+        self._ensure_loaded()
+        keys = list(keys)
+        self.register(keys)
+        mask = 0
+        for key in keys:
+            mask |= 1 << self._bits[key]
+        return mask
+
+    def keys_of(self, mask: int) -> list[str]:
+        """位掩码 -> 权限键列表（按位序号）"""
+        self._ensure_loaded()
+        return [key for i, key in enumerate(self._keys) if mask >> i & 1]
+
+    def has(self, mask: int, key: str) -> bool:
+        bit = self.bit(key)
+        return bit is not None and bool(mask >> bit & 1)
+
+    @property
+    def fingerprint(self) -> str:
+        """注册表内容（键及其顺序）的短摘要"""
+        self._ensure_loaded()
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.blake2b(
+                "\n".join(self._keys).encode(), digest_size=4
+            ).hexdigest()
+        return self._fingerprint
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._keys)
+
+
+permission_registry = PermissionRegistry()
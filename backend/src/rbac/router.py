@@ -1,20 +1,22 @@
-from typing import List
+from typing import List, Literal, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth.models import User
+from src.auth.dependencies import get_current_user
+from src.auth.principal import Principal
 from src.database import get_async_db
 from src.pagination import get_pagination_params, PaginationParams
 from src.rbac import schemas, service
+from src.rbac.catalog import permission_groups_json
 from src.rbac.dependencies import (
     require_role_read,
     require_role_write,
     require_role_delete,
     require_permission_read,
-    get_current_user_permissions,
     get_current_user_roles,
 )
+from src.rbac.policy import PolicyEngine, get_policy_engine
 from src.schemas import MessageResponse
 
 router = APIRouter(
@@ -35,7 +37,7 @@ router = APIRouter(
 async def get_permissions(
     pagination: PaginationParams = Depends(get_pagination_params),
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_permission_read),
+    current_user: Principal = Depends(require_permission_read),
 ):
     """
     获取系统中所有权限的列表。
@@ -67,7 +69,7 @@ async def get_permissions(
 async def get_permission(
     permission_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_permission_read),
+    current_user: Principal = Depends(require_permission_read),
 ):
     """
     根据ID获取权限的详细信息。
@@ -86,7 +88,7 @@ async def get_permission(
 # Role endpoints
 @router.get(
     "/roles",
-    response_model=schemas.RoleListResponse,
+    response_model=Union[schemas.RoleListResponse, schemas.RoleSummaryListResponse],
     status_code=status.HTTP_200_OK,
     summary="Get roles list",
     description="获取系统角色列表，支持分页。包括核心角色（super_admin, admin, user）和自定义角色。",
@@ -96,24 +98,29 @@ async def get_permission(
     },
 )
 async def get_roles(
+    view: Literal["full", "summary"] = Query(
+        "full", description="full：完整权限列表；summary：只返回权限数量和权限标识"
+    ),
     pagination: PaginationParams = Depends(get_pagination_params),
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_read),
+    current_user: Principal = Depends(require_role_read),
 ):
     """
     获取系统中所有角色的列表。
 
-    每个角色包含其所有的权限列表。
+    每个角色包含其所有的权限列表（?view=summary 时只包含权限数量和权限标识）。
     核心角色（super_admin, admin, user）不可删除。
     需要 role:read 权限才能访问此接口。
     """
-    roles, total = await service.get_roles(db, pagination)
+    roles, total = await service.get_roles(db, pagination, view)
 
-    # 转换为响应格式
-    role_items = service._convert_roles_to_schemas(roles)
-
-    return schemas.RoleListResponse.create(
-        items=role_items,
+    response_cls = (
+        schemas.RoleSummaryListResponse
+        if view == "summary"
+        else schemas.RoleListResponse
+    )
+    return response_cls.create(
+        items=roles,
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
@@ -129,7 +136,7 @@ async def get_roles(
 async def create_role(
     role: schemas.RoleCreate,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_write),
+    current_user: Principal = Depends(require_role_write),
 ):
     """
     创建角色
@@ -153,7 +160,7 @@ async def create_role(
 async def get_role(
     role_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_read),
+    current_user: Principal = Depends(require_role_read),
 ):
     """
     根据ID获取角色
@@ -177,7 +184,7 @@ async def update_role(
     role_id: int,
     role: schemas.RoleUpdate,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_write),
+    current_user: Principal = Depends(require_role_write),
 ):
     """
     更新角色
@@ -202,7 +209,7 @@ async def update_role(
 async def delete_role(
     role_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_delete),
+    current_user: Principal = Depends(require_role_delete),
 ):
     """
     删除角色
@@ -238,7 +245,7 @@ async def delete_role(
 async def get_role_permissions(
     role_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_read),
+    current_user: Principal = Depends(require_role_read),
 ):
     """
     获取角色的权限列表
@@ -257,7 +264,7 @@ async def assign_role_permissions(
     role_id: int,
     permission_assign: schemas.RolePermissionAssign,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_write),
+    current_user: Principal = Depends(require_role_write),
 ):
     """
     为角色分配权限（替换式）
@@ -283,7 +290,7 @@ async def assign_user_roles(
     user_id: int,
     role_assign: schemas.UserRoleAssign,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_write),
+    current_user: Principal = Depends(require_role_write),
 ):
     """
     为用户分配角色
@@ -305,7 +312,7 @@ async def assign_user_roles(
 async def get_user_roles(
     user_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_read),
+    current_user: Principal = Depends(require_role_read),
 ):
     """
     获取用户的角色列表
@@ -325,13 +332,12 @@ async def get_user_roles(
 async def get_user_permissions(
     user_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(require_role_read),
+    current_user: Principal = Depends(require_role_read),
 ):
     """
-    获取用户的所有权限
+    获取用户的所有权限（权限位掩码走权限缓存，条目来自权限目录快照）
     """
-    permissions = await service.get_user_permissions(db, user_id)
-    return permissions
+    return await service.get_user_permission_entries_cached(db, user_id)
 
 
 # Current user endpoints
@@ -342,12 +348,58 @@ async def get_user_permissions(
     summary="Get current user permissions",
 )
 async def get_my_permissions(
-    permissions: List[dict] = Depends(get_current_user_permissions),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     """
     获取当前用户的权限列表（结构化格式）
+
+    直接返回权限目录快照中预先序列化的 JSON
     """
-    return permissions
+    return Response(
+        content=await service.get_user_permissions_json(db, current_user.id),
+        media_type="application/json",
+    )
+
+
+@router.post(
+    "/me/permissions/check",
+    response_model=schemas.PermissionCheckResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Check permissions in batch",
+    responses={
+        200: {"description": "权限检查结果"},
+        403: {"description": "检查其他用户的权限需要 user:read 权限"},
+    },
+)
+async def check_my_permissions(
+    check_in: schemas.PermissionCheckRequest,
+    db: AsyncSession = Depends(get_async_db),
+    policy: PolicyEngine = Depends(get_policy_engine),
+):
+    """
+    批量检查权限
+
+    返回每个权限标识是否被授予的映射。检查其他用户需要当前用户拥有 user:read 权限：
+    先用当前用户的位掩码完成授权，通过后再一次批量读取 user_ids 中各用户的权限缓存。
+    """
+    my_mask = await policy.mask()
+
+    users = None
+    if check_in.user_ids is not None:
+        await policy.require("user:read")
+        masks = await service.get_user_permission_masks_cached(db, check_in.user_ids)
+        users = {
+            user_id: service.check_permissions_in_mask(
+                masks[user_id], check_in.permissions
+            )
+            for user_id in check_in.user_ids
+        }
+
+    return schemas.PermissionCheckResponse(
+        permissions=service.check_permissions_in_mask(my_mask, check_in.permissions),
+        users=users,
+    )
 
 
 @router.get(
@@ -376,6 +428,4 @@ async def get_permission_groups():
 
     供前端权限管理页面使用，基于权限定义自动生成分组
     """
-    from .init_data import auto_generate_permission_groups
-
-    return auto_generate_permission_groups()
+    return Response(content=permission_groups_json(), media_type="application/json")
@@ -52,16 +52,19 @@ class RoleBase(CustomBaseModel):
 
 class RoleCreate(RoleBase):
     permission_ids: List[int] = Field(default=[], description="权限ID列表")
+    parent_ids: List[int] = Field(default=[], description="继承的父角色ID列表")
 
 
 class RoleUpdate(CustomBaseModel):
     display_name: Optional[str] = Field(None, description="角色显示名称")
     description: Optional[str] = Field(None, description="角色描述")
     permission_ids: Optional[List[int]] = Field(None, description="权限ID列表")
+    parent_ids: Optional[List[int]] = Field(None, description="继承的父角色ID列表")
 
 
 class RoleRead(RoleBase):
     id: int
+    parent_ids: List[int] = Field(default=[], description="直接继承的父角色ID列表")
     permissions: List[PermissionRead] = Field(
         default=[], description="角色拥有的权限列表"
     )
@@ -75,6 +78,25 @@ class RoleRead(RoleBase):
         return SystemRoles.is_core_role(self.name)
 
 
+class RoleSummary(RoleBase):
+    """角色列表的精简视图（?view=summary）"""
+
+    id: int
+    parent_ids: List[int] = Field(default=[], description="直接继承的父角色ID列表")
+    permission_count: int = Field(..., description="明确分配的权限数量")
+    permission_keys: List[str] = Field(
+        default=[], description="明确分配的权限标识（target:action）"
+    )
+
+    @computed_field
+    @property
+    def is_core_role(self) -> bool:
+        """是否为RBAC核心角色"""
+        from .models import SystemRoles
+
+        return SystemRoles.is_core_role(self.name)
+
+
 # User Role schemas
 class UserRoleAssign(CustomBaseModel):
     role_ids: List[int] = Field(..., description="要分配的角色ID列表")
@@ -85,8 +107,31 @@ class RolePermissionAssign(CustomBaseModel):
     permission_ids: List[int] = Field(..., description="要分配的权限ID列表")
 
 
+# Permission check schemas
+class PermissionCheckRequest(CustomBaseModel):
+    permissions: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        description="要检查的权限标识列表（target:action 格式）",
+    )
+    user_ids: Optional[List[int]] = Field(
+        None,
+        max_length=100,
+        description="同时检查的其他用户ID列表（需要 user:read 权限）",
+    )
+
+
+class PermissionCheckResponse(CustomBaseModel):
+    permissions: dict[str, bool] = Field(..., description="当前用户的权限检查结果")
+    users: Optional[dict[int, dict[str, bool]]] = Field(
+        None, description="按用户ID分组的权限检查结果（仅在请求了 user_ids 时返回）"
+    )
+
+
 # 使用统一的分页响应格式
 RoleListResponse = PaginatedResponse[RoleRead]
+RoleSummaryListResponse = PaginatedResponse[RoleSummary]
 PermissionListResponse = PaginatedResponse[PermissionRead]
 
 # 使用统一的消息响应（替代自定义响应）
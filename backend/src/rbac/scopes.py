@@ -0,0 +1,79 @@
+"""
+行级权限范围
+
+target:action 权限是全有或全无的。范围权限 target:action@scope（如 user:read@created）
+只授予部分行的访问权，由本模块编译为 SQLAlchemy WHERE 条件并下推到查询中，不在 Python 中过滤：
+
+- 各模块为自己的模型注册范围谓词：row_scopes.register("user", "created", lambda uid: ...)
+- compile_row_scope 经当前请求的 PolicyEngine 判断：拥有 target:action 时不加条件（返回 None）；
+  否则将已授予的各范围谓词用 OR 组合；一个范围都没有时抛出 403
+- 范围权限与普通权限一样登记在权限位图和缓存中，判断结果在请求内记忆
+"""
+
+from collections.abc import Callable
+
+from fastapi import Depends
+from sqlalchemy import ColumnElement, or_
+
+from src.rbac.exceptions import InsufficientPermissionsException
+from src.rbac.policy import PolicyEngine, get_policy_engine
+
+# 用户ID -> 该用户在此范围内可见行的 WHERE 条件
+ScopePredicate = Callable[[int], ColumnElement[bool]]
+
+
+def scoped_permission_key(target: str, action: str, scope: str) -> str:
+    return f"{target}:{action}@{scope}"
+
+
+class RowScopeRegistry:
+    """target -> {范围名 -> 谓词}"""
+
+    def __init__(self):
+        self._scopes: dict[str, dict[str, ScopePredicate]] = {}
+
+    def register(self, target: str, scope: str, predicate: ScopePredicate) -> None:
+        self._scopes.setdefault(target, {})[scope] = predicate
+
+    def scopes_of(self, target: str) -> dict[str, ScopePredicate]:
+        return self._scopes.get(target, {})
+
+
+row_scopes = RowScopeRegistry()
+
+
+async def compile_row_scope(
+    policy: PolicyEngine, target: str, action: str
+) -> ColumnElement[bool] | None:
+    """
+    将当前用户对 target:action 的授权编译为 WHERE 条件
+
+    Returns:
+        None 表示不限制（拥有 target:action）；否则为已授予范围的 OR 条件
+
+    Raises:
+        InsufficientPermissionsException: 既没有 target:action，也没有任何范围权限
+    """
+    permission = f"{target}:{action}"
+    if await policy.allows(permission):
+        return None
+
+    predicates = [
+        predicate(policy.user_id)
+        for scope, predicate in row_scopes.scopes_of(target).items()
+        if await policy.allows(scoped_permission_key(target, action, scope))
+    ]
+    if not predicates:
+        raise InsufficientPermissionsException(permission)
+    return or_(*predicates)
+
+
+def create_row_scope_dependency(target: str, action: str) -> Callable:
+    """创建返回行级范围条件的依赖函数（用于列表接口）"""
+
+    async def row_scope_dependency(
+        policy: PolicyEngine = Depends(get_policy_engine),
+    ) -> ColumnElement[bool] | None:
+        return await compile_row_scope(policy, target, action)
+
+    return row_scope_dependency
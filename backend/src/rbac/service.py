@@ -1,34 +1,33 @@
-import json
 from typing import List, Optional
 
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, text
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.auth.models import User
+from src.auth.principal import bump_principal_version, bump_principal_versions
 from src.pagination import PaginationParams
 from src.rbac import models, schemas
+from src.rbac.cache import (
+    bump_rbac_version,
+    bump_role_generations,
+    invalidate_user_permissions,
+    permission_cache,
+)
 from src.rbac.models import SystemRoles
+from src.rbac.catalog import PermissionEntry, permission_catalog
+from src.rbac.registry import permission_registry
+from src.rbac.constants import ROLE_HIERARCHY_LOCK_ID
 from src.rbac.exceptions import (
     RoleAlreadyExistsException,
+    RoleHierarchyException,
     RoleNotDeletableException,
     PermissionAlreadyExistsException,
 )
 
 
-# 缓存配置
-class _CacheConfig:
-    """内部缓存配置"""
-
-    KEY_USER_PERMISSIONS = "rbac:user_permissions:{user_id}"
-    TTL_PERMISSIONS = 600  # 10分钟
-
-    @classmethod
-    def user_permissions_key(cls, user_id: int) -> str:
-        """生成用户权限缓存键"""
-        return cls.KEY_USER_PERMISSIONS.format(user_id=user_id)
-
-
 # 工具函数
 def _parse_permission_key(permission_key: str) -> tuple[str, str]:
     """解析权限键 'target:action'"""
@@ -37,15 +36,6 @@ def _parse_permission_key(permission_key: str) -> tuple[str, str]:
     return permission_key.split(":", 1)
 
 
-def _check_permission_in_list(
-    permissions: List[dict], target: str, action: str
-) -> bool:
-    """检查权限是否在列表中"""
-    return any(
-        p.get("target") == target and p.get("action") == action for p in permissions
-    )
-
-
 # Permission service functions
 async def get_permission_by_id(
     db: AsyncSession, permission_id: int
@@ -105,6 +95,9 @@ async def create_permission(
     db.add(db_permission)
     await db.commit()
     await db.refresh(db_permission)
+
+    # all/admin 策略的角色自动获得新权限
+    await bump_rbac_version()
     return db_permission
 
 
@@ -116,7 +109,8 @@ async def get_role_by_id(db: AsyncSession, role_id: int) -> Optional[models.Role
         .options(
             selectinload(models.Role.role_permissions).selectinload(
                 models.RolePermission.permission
-            )
+            ),
+            selectinload(models.Role.parent_links),
         )
         .where(models.Role.id == role_id)
     )
@@ -130,28 +124,107 @@ async def get_role_by_name(db: AsyncSession, name: str) -> Optional[models.Role]
 
 
 async def get_roles(
-    db: AsyncSession, pagination: PaginationParams
-) -> tuple[List[models.Role], int]:
-    """获取角色列表"""
-    # 获取总数
-    count_result = await db.execute(select(func.count(models.Role.id)))
-    total = count_result.scalar()
+    db: AsyncSession, pagination: PaginationParams, view: str = "full"
+) -> tuple[List[dict], int]:
+    """
+    获取角色列表（一次查询）
+
+    每个角色的权限由 Postgres 聚合（json_agg / array_agg），总数由窗口函数返回，
+    不加载 RolePermission / Permission ORM 对象。
+
+    Args:
+        view: full 返回完整的权限列表；summary 只返回权限数量和权限标识
+    """
+    role = models.Role
+    permission = models.Permission
+    role_permission = models.RolePermission
+
+    order = (permission.target, permission.action)
+    if view == "summary":
+        aggregated = (
+            func.array_agg(
+                aggregate_order_by(
+                    func.concat(permission.target, ":", permission.action), *order
+                )
+            ),
+        )
+    else:
+        aggregated = (
+            func.json_agg(
+                aggregate_order_by(
+                    func.json_build_object(
+                        "id",
+                        permission.id,
+                        "target",
+                        permission.target,
+                        "action",
+                        permission.action,
+                        "display_name",
+                        permission.display_name,
+                        "description",
+                        permission.description,
+                    ),
+                    *order,
+                ),
+                type_=JSON,
+            ),
+        )
+    permissions = (
+        select(*aggregated)
+        .select_from(role_permission)
+        .join(permission, permission.id == role_permission.permission_id)
+        .where(role_permission.role_id == role.id)
+        .correlate(role)
+        .scalar_subquery()
+    )
 
-    # 获取分页数据
-    result = await db.execute(
-        select(models.Role)
-        .options(
-            selectinload(models.Role.role_permissions).selectinload(
-                models.RolePermission.permission
+    parent_ids = (
+        select(
+            func.array_agg(
+                aggregate_order_by(
+                    models.RoleParent.parent_id, models.RoleParent.parent_id
+                )
             )
         )
-        .order_by(models.Role.id.desc())
+        .where(models.RoleParent.role_id == role.id)
+        .correlate(role)
+        .scalar_subquery()
+    )
+
+    result = await db.execute(
+        select(
+            role.id,
+            role.name,
+            role.display_name,
+            role.description,
+            role.permission_strategy,
+            parent_ids.label("parent_ids"),
+            permissions.label("permissions"),
+            func.count().over().label("total"),
+        )
+        .order_by(role.id.desc())
         .offset(pagination.offset)
         .limit(pagination.limit)
     )
-    roles = result.scalars().all()
+    rows = result.all()
 
-    return list(roles), total
+    if rows:
+        total = rows[0].total
+    else:
+        # 页码超出范围时窗口函数没有返回行，单独统计总数
+        total = await db.scalar(select(func.count(role.id)))
+
+    roles = []
+    for row in rows:
+        item = row._asdict()
+        del item["total"]
+        item["permissions"] = item["permissions"] or []
+        item["parent_ids"] = item["parent_ids"] or []
+        if view == "summary":
+            item["permission_keys"] = item.pop("permissions")
+            item["permission_count"] = len(item["permission_keys"])
+        roles.append(item)
+    return roles, total
 
 
 async def create_role(db: AsyncSession, role: schemas.RoleCreate) -> models.Role:
@@ -162,17 +235,15 @@ async def create_role(db: AsyncSession, role: schemas.RoleCreate) -> models.Role
         raise RoleAlreadyExistsException(role.name)
 
     # 创建角色
-    role_data = role.model_dump(exclude={"permission_ids"})
+    role_data = role.model_dump(exclude={"permission_ids", "parent_ids"})
     db_role = models.Role(**role_data)
     db.add(db_role)
     await db.flush()  # 获取角色ID
 
-    # 添加权限关联
-    for permission_id in role.permission_ids:
-        role_permission = models.RolePermission(
-            role_id=db_role.id, permission_id=permission_id
-        )
-        db.add(role_permission)
+    # 添加权限关联和继承关系（新角色还没有用户，不需要使缓存失效）
+    await _sync_role_permissions(db, db_role.id, role.permission_ids)
+    if role.parent_ids:
+        await _set_role_parents(db, db_role.id, role.parent_ids)
 
     await db.commit()
     await db.refresh(db_role)
@@ -190,6 +261,9 @@ async def update_role(
     # 核心角色只能修改显示名称和描述，不能修改权限
     from .models import SystemRoles
 
+    # 只有权限策略、权限关联或继承关系变化时才影响用户的有效权限
+    permissions_changed = False
+    affected_role_ids: List[int] = []
     if SystemRoles.is_core_role(db_role.name):
         # 只允许修改显示名称和描述
         if role.display_name is not None:
@@ -198,29 +272,29 @@ async def update_role(
             db_role.description = role.description
     else:
         # 自定义角色可以修改所有字段
+        strategy = db_role.permission_strategy
         for field, value in role.model_dump(
-            exclude_unset=True, exclude={"permission_ids"}
+            exclude_unset=True, exclude={"permission_ids", "parent_ids"}
         ).items():
             setattr(db_role, field, value)
+        permissions_changed = db_role.permission_strategy != strategy
 
         # 更新权限关联
         if role.permission_ids is not None:
-            # 删除现有权限关联
-            await db.execute(
-                delete(models.RolePermission).where(
-                    models.RolePermission.role_id == role_id
-                )
-            )
+            if await _sync_role_permissions(db, role_id, role.permission_ids):
+                permissions_changed = True
 
-            # 添加新的权限关联
-            for permission_id in role.permission_ids:
-                role_permission = models.RolePermission(
-                    role_id=role_id, permission_id=permission_id
-                )
-                db.add(role_permission)
+        # 更新继承关系
+        if role.parent_ids is not None:
+            affected_role_ids = await _set_role_parents(db, role_id, role.parent_ids)
+
+    if permissions_changed and not affected_role_ids:
+        # 子孙角色继承了本角色的权限
+        affected_role_ids = await get_descendant_role_ids(db, role_id)
 
     await db.commit()
     await db.refresh(db_role)
+    await bump_role_generations(affected_role_ids)
     return db_role
 
 
@@ -234,11 +308,122 @@ async def delete_role(db: AsyncSession, role_id: int) -> bool:
     if SystemRoles.is_core_role(db_role.name):
         raise RoleNotDeletableException(db_role.name, "Core roles cannot be deleted")
 
+    # 子孙角色失去经由该角色继承的权限，重新计算其祖先
+    descendant_ids = (await get_descendant_role_ids(db, role_id))[1:]
+    # 删除会级联删除 user_roles，先记下受影响的用户（令牌中的角色声明需要失效）
+    result = await db.scalars(
+        select(models.UserRole.user_id)
+        .where(models.UserRole.role_id.in_([role_id, *descendant_ids]))
+        .distinct()
+    )
+    affected_user_ids = list(result.all())
     await db.delete(db_role)
+    await db.flush()
+    if descendant_ids:
+        await _rebuild_closure(db, descendant_ids)
     await db.commit()
+    await bump_role_generations([role_id, *descendant_ids])
+    await bump_principal_versions(affected_user_ids)
     return True
 
 
+# Role hierarchy service functions
+async def get_descendant_role_ids(db: AsyncSession, role_id: int) -> List[int]:
+    """角色自身及其全部子孙角色的ID（闭包表一次查询）"""
+    result = await db.scalars(
+        select(models.RoleClosure.descendant_id).where(
+            models.RoleClosure.ancestor_id == role_id
+        )
+    )
+    return [role_id, *result.all()]
+
+
+async def expand_role_ids(db: AsyncSession, role_ids: List[int]) -> List[int]:
+    """角色集合及其全部祖先角色的ID（闭包表一次查询）"""
+    if not role_ids:
+        return []
+    result = await db.scalars(
+        select(models.RoleClosure.ancestor_id).where(
+            models.RoleClosure.descendant_id.in_(role_ids)
+        )
+    )
+    return list(dict.fromkeys([*role_ids, *result.all()]))
+
+
+async def _rebuild_closure(db: AsyncSession, role_ids: List[int]) -> None:
+    """
+    根据 role_parents 重新计算这些角色的全部祖先（不提交）
+
+    调用方需传入受影响角色的全部子孙角色，闭包表中其他角色的行不受影响。
+    """
+    await db.execute(
+        delete(models.RoleClosure).where(models.RoleClosure.descendant_id.in_(role_ids))
+    )
+    await db.execute(
+        text("""
+            WITH RECURSIVE ancestors(descendant_id, ancestor_id, depth) AS (
+                SELECT role_id, parent_id, 1
+                FROM role_parents
+                WHERE role_id = ANY(:role_ids)
+                UNION ALL
+                SELECT a.descendant_id, rp.parent_id, a.depth + 1
+                FROM ancestors a
+                JOIN role_parents rp ON rp.role_id = a.ancestor_id
+            )
+            INSERT INTO role_closure (ancestor_id, descendant_id, depth)
+            SELECT ancestor_id, descendant_id, min(depth)
+            FROM ancestors
+            GROUP BY ancestor_id, descendant_id
+        """),
+        {"role_ids": list(role_ids)},
+    )
+
+
+async def _set_role_parents(
+    db: AsyncSession, role_id: int, parent_ids: List[int]
+) -> List[int]:
+    """
+    更新角色的直接父角色并维护闭包表（不提交）
+
+    Returns:
+        有效权限受影响的角色ID（自身及全部子孙角色）；继承关系未变化时为空列表
+
+    Raises:
+        RoleHierarchyException: 父角色不存在，或继承关系会形成环
+    """
+    # 串行化继承关系的修改，避免并发修改绕过环检测
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(:lock_id)"),
+        {"lock_id": ROLE_HIERARCHY_LOCK_ID},
+    )
+
+    parent_ids = list(dict.fromkeys(parent_ids))
+    missing = set(parent_ids) - await get_existing_role_ids(db, parent_ids)
+    if missing:
+        raise RoleHierarchyException(f"Parent roles not found: {sorted(missing)}")
+
+    affected_role_ids = await get_descendant_role_ids(db, role_id)
+    cycle = set(parent_ids) & set(affected_role_ids)
+    if cycle:
+        raise RoleHierarchyException(
+            f"Role {role_id} cannot inherit from {sorted(cycle)}: "
+            "inheritance cycle detected"
+        )
+
+    changed = await _sync_association(
+        db,
+        models.RoleParent,
+        models.RoleParent.role_id,
+        role_id,
+        models.RoleParent.parent_id,
+        parent_ids,
+    )
+    if not changed:
+        return []
+    await _rebuild_closure(db, affected_role_ids)
+    return affected_role_ids
+
+
 # User Role service functions
 async def get_user_roles(db: AsyncSession, user_id: int) -> List[models.Role]:
     """获取用户的角色列表"""
@@ -249,7 +434,8 @@ async def get_user_roles(db: AsyncSession, user_id: int) -> List[models.Role]:
         .options(
             selectinload(models.Role.role_permissions).selectinload(
                 models.RolePermission.permission
-            )
+            ),
+            selectinload(models.Role.parent_links),
         )
     )
     return list(result.scalars().all())
@@ -258,132 +444,182 @@ async def get_user_roles(db: AsyncSession, user_id: int) -> List[models.Role]:
 async def assign_user_roles(
     db: AsyncSession, user_id: int, role_ids: List[int]
 ) -> bool:
-    """为用户分配角色"""
+    """为用户分配角色（替换式，只写入差异）"""
     # 检查用户是否存在
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    user = user_result.scalar_one_or_none()
-    if not user:
+    user_exists = await db.scalar(select(User.id).where(User.id == user_id))
+    if user_exists is None:
         return False
 
-    # 删除现有角色关联
-    await db.execute(delete(models.UserRole).where(models.UserRole.user_id == user_id))
-
-    # 添加新的角色关联
-    for role_id in role_ids:
-        user_role = models.UserRole(user_id=user_id, role_id=role_id)
-        db.add(user_role)
-
+    changed = await _sync_user_roles(db, user_id, role_ids)
     await db.commit()
 
-    # 清除用户权限缓存
-    await clear_user_permissions_cache(user_id)
+    # 角色集合变化时清除用户权限缓存，并使令牌中的角色声明失效
+    if changed:
+        await clear_user_permissions_cache(user_id)
+        await bump_principal_version(user_id)
 
     return True
 
 
-async def get_user_permissions_db(
-    db: AsyncSession, user_id: int
-) -> List[models.Permission]:
-    """获取用户的所有权限（智能权限策略版本）"""
-    # 获取用户的所有角色及其权限策略
+async def get_existing_role_ids(db: AsyncSession, role_ids: List[int]) -> set[int]:
+    """一次查询返回 role_ids 中实际存在的角色ID"""
+    if not role_ids:
+        return set()
+    result = await db.scalars(
+        select(models.Role.id).where(models.Role.id.in_(set(role_ids)))
+    )
+    return set(result.all())
+
+
+async def _sync_association(
+    db: AsyncSession, model, owner_column, owner_id: int, item_column, item_ids
+) -> bool:
+    """
+    差量更新关联表（不提交）：只删除被移除的行，批量插入新增的行
+
+    Returns:
+        关联是否发生了变化
+    """
+    desired = set(item_ids)
+    current = set(
+        (await db.scalars(select(item_column).where(owner_column == owner_id))).all()
+    )
+    to_remove = current - desired
+    to_add = desired - current
+
+    if to_remove:
+        await db.execute(
+            delete(model).where(owner_column == owner_id, item_column.in_(to_remove))
+        )
+    if to_add:
+        await db.execute(
+            pg_insert(model)
+            .values([{owner_column.key: owner_id, item_column.key: i} for i in to_add])
+            .on_conflict_do_nothing(index_elements=[owner_column.key, item_column.key])
+        )
+    return bool(to_remove or to_add)
+
+
+async def _sync_role_permissions(
+    db: AsyncSession, role_id: int, permission_ids: List[int]
+) -> bool:
+    return await _sync_association(
+        db,
+        models.RolePermission,
+        models.RolePermission.role_id,
+        role_id,
+        models.RolePermission.permission_id,
+        permission_ids,
+    )
+
+
+async def _sync_user_roles(db: AsyncSession, user_id: int, role_ids: List[int]) -> bool:
+    return await _sync_association(
+        db,
+        models.UserRole,
+        models.UserRole.user_id,
+        user_id,
+        models.UserRole.role_id,
+        role_ids,
+    )
+
+
+async def _load_permission_catalog(db: AsyncSession) -> List[models.Permission]:
+    """全部权限（按 target、action 排序）"""
+    result = await db.execute(
+        select(models.Permission).order_by(
+            models.Permission.target, models.Permission.action
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def compile_role_masks(db: AsyncSession, role_ids: List[int]) -> dict[int, int]:
+    """将角色编译为权限位掩码（智能权限策略由权限目录计算）"""
+    if not role_ids:
+        return {}
+
     roles_result = await db.execute(
-        select(models.Role)
-        .join(models.UserRole)
-        .where(models.UserRole.user_id == user_id)
+        select(models.Role.id, models.Role.permission_strategy).where(
+            models.Role.id.in_(role_ids)
+        )
     )
-    user_roles = roles_result.scalars().all()
-
-    # 检查智能权限策略
-    for role in user_roles:
-        if role.permission_strategy == "all":
-            # 超级管理员：返回所有权限
-            all_permissions_result = await db.execute(
-                select(models.Permission).order_by(
-                    models.Permission.target, models.Permission.action
-                )
+    strategies = dict(roles_result.all())
+
+    masks = {}
+    if any(strategy in ("all", "admin") for strategy in strategies.values()):
+        catalog = await permission_catalog.get(db)
+        for role_id, strategy in strategies.items():
+            if strategy == "all":
+                masks[role_id] = catalog.all_mask
+            elif strategy == "admin":
+                masks[role_id] = catalog.admin_mask
+
+    explicit_ids = [role_id for role_id in strategies if role_id not in masks]
+    if explicit_ids:
+        result = await db.execute(
+            select(
+                models.RolePermission.role_id,
+                models.Permission.target,
+                models.Permission.action,
             )
-            return list(all_permissions_result.scalars().all())
-
-        elif role.permission_strategy == "admin":
-            # 管理员：返回除核心删除外的所有权限
-            admin_permissions_result = await db.execute(
-                select(models.Permission)
-                .where(
-                    ~(
-                        (models.Permission.target.in_(["user", "role", "permission"]))
-                        & (models.Permission.action == "delete")
-                    )
-                )
-                .order_by(models.Permission.target, models.Permission.action)
+            .join(
+                models.Permission,
+                models.RolePermission.permission_id == models.Permission.id,
             )
-            return list(admin_permissions_result.scalars().all())
-
-    # 对于explicit策略的角色，使用原有的子查询逻辑
-    subquery = (
-        select(models.RolePermission.permission_id)
-        .select_from(models.UserRole)
-        .join(
-            models.RolePermission,
-            models.UserRole.role_id == models.RolePermission.role_id,
+            .where(models.RolePermission.role_id.in_(explicit_ids))
         )
-        .where(models.UserRole.user_id == user_id)
-    )
+        keys_by_role: dict[int, list[str]] = {role_id: [] for role_id in explicit_ids}
+        for role_id, target, action in result:
+            keys_by_role[role_id].append(f"{target}:{action}")
+        for role_id, keys in keys_by_role.items():
+            masks[role_id] = permission_registry.mask_of(keys)
+
+    return masks
+
 
+async def compile_role_set_mask(db: AsyncSession, role_ids: List[int]) -> int:
+    """角色集合的有效权限位掩码（角色及其全部祖先角色的掩码按位或）"""
+    mask = 0
+    role_ids = await expand_role_ids(db, role_ids)
+    for role_mask in (await compile_role_masks(db, role_ids)).values():
+        mask |= role_mask
+    return mask
+
+
+async def get_user_role_ids(db: AsyncSession, user_id: int) -> List[int]:
+    """获取用户的角色ID列表"""
     result = await db.execute(
-        select(models.Permission)
-        .where(models.Permission.id.in_(subquery))
-        .order_by(models.Permission.target, models.Permission.action)
+        select(models.UserRole.role_id).where(models.UserRole.user_id == user_id)
     )
     return list(result.scalars().all())
 
 
+async def get_user_permission_mask_db(db: AsyncSession, user_id: int) -> int:
+    """从数据库计算用户的有效权限位掩码"""
+    return await compile_role_set_mask(db, await get_user_role_ids(db, user_id))
+
+
+def _permissions_in_mask(
+    catalog: List[models.Permission], mask: int
+) -> List[models.Permission]:
+    return [p for p in catalog if permission_registry.has(mask, p.permission_key)]
+
+
+async def get_user_permissions_db(
+    db: AsyncSession, user_id: int
+) -> List[models.Permission]:
+    """获取用户的所有权限（智能权限策略版本）"""
+    mask = await get_user_permission_mask_db(db, user_id)
+    return _permissions_in_mask(await _load_permission_catalog(db), mask)
+
+
 async def check_user_permission_by_target_action(
     db: AsyncSession, user_id: int, target: str, action: str
 ) -> bool:
     """检查用户是否有指定权限 - 智能权限策略版本"""
-    # 获取用户的所有角色及其权限策略
-    roles_result = await db.execute(
-        select(models.Role)
-        .join(models.UserRole)
-        .where(models.UserRole.user_id == user_id)
-    )
-    user_roles = roles_result.scalars().all()
-
-    # 检查智能权限策略
-    for role in user_roles:
-        if role.permission_strategy == "all":
-            return True  # 超级管理员拥有所有权限
-
-        elif role.permission_strategy == "admin":
-            # 管理员拥有除删除权限外的所有权限
-            if action != "delete":
-                return True
-            # 删除权限需要检查是否为核心资源
-            if target in ["user", "role", "permission"] and action == "delete":
-                continue  # 管理员不能删除核心资源
-            return True  # 管理员可以删除其他资源
-
-    # 对于explicit策略的角色，使用传统权限检查
-    exists_query = (
-        select(1)
-        .select_from(models.UserRole)
-        .join(
-            models.RolePermission,
-            models.UserRole.role_id == models.RolePermission.role_id,
-        )
-        .join(
-            models.Permission,
-            models.RolePermission.permission_id == models.Permission.id,
-        )
-        .where(
-            models.UserRole.user_id == user_id,
-            models.Permission.target == target,
-            models.Permission.action == action,
-        )
-    )
-
-    result = await db.execute(select(exists_query.exists()))
-    return result.scalar()
+    mask = await get_user_permission_mask_db(db, user_id)
+    return permission_registry.has(mask, f"{target}:{action}")
 
 
 async def check_user_permission(
@@ -413,30 +649,20 @@ async def get_role_permissions(
 async def assign_role_permissions(
     db: AsyncSession, role_id: int, permission_ids: List[int]
 ) -> bool:
-    """为角色分配权限（替换式）"""
+    """为角色分配权限（替换式，只写入差异）"""
     # 检查角色是否存在
-    db_role = await get_role_by_id(db, role_id)
-    if not db_role:
-        return False
-
-    # 删除现有权限关联
-    await db.execute(
-        delete(models.RolePermission).where(models.RolePermission.role_id == role_id)
+    role_exists = await db.scalar(
+        select(models.Role.id).where(models.Role.id == role_id)
     )
+    if role_exists is None:
+        return False
 
-    # 添加新的权限关联
-    for permission_id in permission_ids:
-        role_permission = models.RolePermission(
-            role_id=role_id, permission_id=permission_id
-        )
-        db.add(role_permission)
-
+    changed = await _sync_role_permissions(db, role_id, permission_ids)
+    affected_role_ids = await get_descendant_role_ids(db, role_id) if changed else []
     await db.commit()
 
-    # 清除所有拥有此角色的用户的权限缓存
-    users_with_role = await get_users_with_role(db, role_id)
-    for user in users_with_role:
-        await clear_user_permissions_cache(user.id)
+    # 权限变化时递增角色及其子孙角色的代数，拥有这些角色的用户的权限缓存随之失效（与用户数量无关）
+    await bump_role_generations(affected_role_ids)
 
     return True
 
@@ -446,80 +672,78 @@ async def assign_role_permissions(
 # ============================================================================
 
 
+async def get_user_permission_mask_cached(db: AsyncSession, user_id: int) -> int:
+    """获取用户有效权限位掩码（进程内 L1 + Redis L2 缓存）"""
+    return await permission_cache.get_or_load(
+        user_id,
+        load_role_ids=lambda: get_user_role_ids(db, user_id),
+        compile_mask=lambda role_ids: compile_role_set_mask(db, role_ids),
+    )
+
+
+async def get_user_permission_masks_cached(
+    db: AsyncSession, user_ids: List[int]
+) -> dict[int, int]:
+    """批量获取多个用户的有效权限位掩码（L1 未命中的用户只需一次 Redis 往返）"""
+    return await permission_cache.get_many(
+        user_ids,
+        load_role_ids=lambda user_id: get_user_role_ids(db, user_id),
+        compile_mask=lambda role_ids: compile_role_set_mask(db, role_ids),
+    )
+
+
+def check_permissions_in_mask(mask: int, permissions: List[str]) -> dict[str, bool]:
+    """在位掩码上批量判断权限（格式不正确的权限标识视为没有权限）"""
+    results = {}
+    for permission in permissions:
+        try:
+            _parse_permission_key(permission)
+        except ValueError:
+            results[permission] = False
+            continue
+        results[permission] = permission_registry.has(mask, permission)
+    return results
+
+
 async def get_user_permissions_cached(db: AsyncSession, user_id: int) -> List[dict]:
-    """获取用户权限（带Redis缓存，10分钟过期，结构化格式）"""
-    from src.redis_client import get_redis_client
+    """获取用户权限（带缓存，结构化格式）"""
+    mask = await get_user_permission_mask_cached(db, user_id)
+    catalog = await permission_catalog.get(db)
+    return [entry.to_dict() for entry in catalog.entries_in(mask)]
 
-    cache_key = _CacheConfig.user_permissions_key(user_id)
 
-    # 尝试从Redis获取缓存
-    try:
-        async for redis_client in get_redis_client():
-            cached = await redis_client.get(cache_key)
-            if cached:
-                return json.loads(cached)
-    except Exception:
-        pass  # 缓存失败时降级为数据库查询
-
-    # 数据库查询
-    permissions = await get_user_permissions_db(db, user_id)
-    permission_data = [
-        {
-            "target": p.target,
-            "action": p.action,
-            "display_name": p.display_name,
-            "description": p.description,
-        }
-        for p in permissions
-    ]
-
-    # 写入缓存
-    try:
-        async for redis_client in get_redis_client():
-            await redis_client.setex(
-                cache_key, _CacheConfig.TTL_PERMISSIONS, json.dumps(permission_data)
-            )
-    except Exception:
-        pass  # 缓存写入失败不影响功能
+async def get_user_permission_entries_cached(
+    db: AsyncSession, user_id: int
+) -> List[PermissionEntry]:
+    """获取用户权限（带缓存，权限目录快照条目，可直接校验为 PermissionRead）"""
+    mask = await get_user_permission_mask_cached(db, user_id)
+    catalog = await permission_catalog.get(db)
+    return catalog.entries_in(mask)
 
-    return permission_data
+
+async def get_user_permissions_json(db: AsyncSession, user_id: int) -> bytes:
+    """获取用户权限列表的 JSON（由权限目录快照中预先序列化的片段拼接）"""
+    mask = await get_user_permission_mask_cached(db, user_id)
+    catalog = await permission_catalog.get(db)
+    return catalog.permissions_json(mask)
 
 
 async def check_user_permission_cached(
     db: AsyncSession, user_id: int, permission: str
 ) -> bool:
-    """优化版权限检查（使用缓存）- 重构版本"""
-    # 先尝试从缓存获取用户权限列表
-    user_permissions = await get_user_permissions_cached(db, user_id)
-
-    # 解析权限键
+    """优化版权限检查（使用缓存的权限位掩码）"""
     try:
-        target, action = _parse_permission_key(permission)
+        _parse_permission_key(permission)
     except ValueError:
         return False
 
-    # 直接检查权限是否在缓存的权限列表中
-    return _check_permission_in_list(user_permissions, target, action)
+    mask = await get_user_permission_mask_cached(db, user_id)
+    return permission_registry.has(mask, permission)
 
 
 async def clear_user_permissions_cache(user_id: int):
     """清除用户权限缓存"""
-    from src.redis_client import get_redis_client
-
-    try:
-        async for redis_client in get_redis_client():
-            cache_key = _CacheConfig.user_permissions_key(user_id)
-            await redis_client.delete(cache_key)
-    except Exception:
-        pass
-
-
-async def get_users_with_role(db: AsyncSession, role_id: int) -> List[User]:
-    """获取拥有指定角色的用户列表"""
-    result = await db.execute(
-        select(User).join(models.UserRole).where(models.UserRole.role_id == role_id)
-    )
-    return list(result.scalars().all())
+    await invalidate_user_permissions(user_id)
 
 
 # ============================================================================
@@ -536,6 +760,7 @@ def _convert_role_to_schema(role: models.Role) -> schemas.RoleRead:
         display_name=role.display_name,
         description=role.description,
         permission_strategy=role.permission_strategy,
+        parent_ids=sorted(link.parent_id for link in role.parent_links),
         permissions=permissions,
     )
 
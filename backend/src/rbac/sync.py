@@ -0,0 +1,53 @@
+"""
+同步 RBAC 权限与角色定义
+
+与应用启动时的同步相同：校验和未变化时跳过，--force 强制执行完整同步。
+供部署流程在滚动重启之前执行一次，之后各 worker 启动时只需比较校验和。
+位于 src 包内，生产镜像（只复制 src/）中同样可用。
+
+用法（在 backend 目录下）:
+    python -m src.rbac.sync
+    python -m src.rbac.sync --force
+    python -m src.rbac.sync --check   # 只检查是否需要同步（需要时退出码为 1）
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+
+from src.database import AsyncSessionLocal
+from src.rbac.init_data import (
+    stored_definitions_checksum,
+    definitions_checksum,
+    init_rbac_data,
+)
+
+
+async def _run(force: bool, check: bool) -> int:
+    async with AsyncSessionLocal() as db:
+        if check:
+            stored = await stored_definitions_checksum(db)
+            current = definitions_checksum()
+            print(f"当前定义: {current}")
+            print(f"已同步:   {stored or '-'}")
+            return 0 if stored == current else 1
+
+        synced = await init_rbac_data(db, force=force)
+        print("已同步" if synced else "权限定义未变化，未执行同步")
+        return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="同步 RBAC 权限与角色定义")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--force", action="store_true", help="忽略校验和，强制同步")
+    group.add_argument("--check", action="store_true", help="只检查是否需要同步")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sys.exit(asyncio.run(_run(args.force, args.check)))
+
+
+if __name__ == "__main__":
+    main()
@@ -76,6 +76,7 @@ class HealthResponse(CustomBaseModel):
     service: str
     version: str | None = None
     checks: dict[str, str] | None = None
+    metrics: dict[str, dict] | None = None
 
 
 class RootResponse(CustomBaseModel):
@@ -2,27 +2,30 @@ from fastapi import Depends, HTTPException, status, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Annotated
 
-from src.auth.models import User
 from src.auth.dependencies import get_current_user
+from src.auth.models import User
+from src.auth.principal import Principal
 from src.database import get_async_db
-from src.rbac.service import check_user_permission
+from src.rbac.policy import PolicyEngine, get_policy_engine
+from src.rbac.scopes import create_row_scope_dependency, row_scopes
+
+# 用户列表的行级范围：user:read@self、user:read@created
+row_scopes.register("user", "self", lambda user_id: User.id == user_id)
+row_scopes.register("user", "created", lambda user_id: User.created_by_id == user_id)
+
+# 用户列表的范围条件（拥有 user:read 时为 None）
+require_user_read_scope = create_row_scope_dependency("user", "read")
 
 
 async def require_user_read_or_self(
     user_id: Annotated[int, Path()],
-    db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user),
-) -> User:
+    policy: PolicyEngine = Depends(get_policy_engine),
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """
     权限检查：用户可以访问自己的信息，或者有user:read权限的用户可以访问任何用户
     """
-    # 允许用户查看自己的信息
-    if current_user.id == user_id:
-        return current_user
-
-    # 检查是否有查看用户权限
-    has_permission = await check_user_permission(db, current_user.id, "user:read")
-    if not has_permission:
+    if not await policy.allows_or_self(user_id, "user:read"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
         )
@@ -32,19 +35,13 @@ async def require_user_read_or_self(
 
 async def require_user_write_or_self(
     user_id: Annotated[int, Path()],
-    db: AsyncSession = Depends(get_async_db),
-    current_user: User = Depends(get_current_user),
-) -> User:
+    policy: PolicyEngine = Depends(get_policy_engine),
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     """
     权限检查：用户可以修改自己的信息，或者有user:write权限的用户可以修改任何用户
     """
-    # 允许用户修改自己的信息
-    if current_user.id == user_id:
-        return current_user
-
-    # 检查是否有编辑用户权限
-    has_permission = await check_user_permission(db, current_user.id, "user:write")
-    if not has_permission:
+    if not await policy.allows_or_self(user_id, "user:write"):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
         )
@@ -53,8 +50,8 @@ async def require_user_write_or_self(
 
 
 async def require_user_delete_not_self(
-    user_id: Annotated[int, Path()], current_user: User = Depends(get_current_user)
-) -> User:
+    user_id: Annotated[int, Path()], current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     权限检查：不允许删除自己
     """
@@ -1,20 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import ColumnElement
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.auth import models as auth_models
 from src.auth import schemas as auth_schemas
-from src.auth.dependencies import get_current_user
+from src.auth.dependencies import get_current_user_snapshot
+from src.auth.user_cache import UserSnapshot
+from src.auth.principal import Principal
 from src.database import get_async_db
 from src.users import schemas, service
 from src.pagination import get_pagination_params, PaginationParams
 from src.rbac.dependencies import (
-    require_user_read,
     require_user_delete,
     require_user_write,
 )
 from src.rbac import service as rbac_service
 from src.users.dependencies import (
     require_user_read_or_self,
+    require_user_read_scope,
     require_user_write_or_self,
     require_user_delete_not_self,
 )
@@ -32,7 +34,7 @@ router = APIRouter(
     summary="Get current user",
 )
 async def read_users_me(
-    current_user: auth_models.User = Depends(get_current_user),
+    current_user: UserSnapshot = Depends(get_current_user_snapshot),
     db: AsyncSession = Depends(get_async_db),
 ):
     """
@@ -57,14 +59,15 @@ async def read_users_me(
 async def read_users(
     pagination: PaginationParams = Depends(get_pagination_params),
     db: AsyncSession = Depends(get_async_db),
-    _: auth_models.User = Depends(require_user_read),
+    scope: ColumnElement[bool] | None = Depends(require_user_read_scope),
 ):
     """
     Get list of users with pagination.
 
-    Returns a paginated list of users. Only accessible to users with user:read permission.
+    Returns a paginated list of users. Users with user:read see everyone; users with
+    only scoped grants (user:read@self, user:read@created) see the matching rows.
     """
-    users, total = await service.get_users(db, pagination)
+    users, total = await service.get_users(db, pagination, scope)
 
     # 批量获取用户和角色信息，避免N+1查询
     user_list = await service.get_users_with_roles_batch(db, users)
@@ -86,11 +89,13 @@ async def read_users(
 async def create_user_admin(
     user_create: schemas.UserAdminCreate,
     db: AsyncSession = Depends(get_async_db),
-    _: auth_models.User = Depends(require_user_write),
+    current_user: Principal = Depends(require_user_write),
 ):
     """管理员创建用户并可选分配角色"""
 
-    new_user = await service.create_user_admin(db, user_create)
+    new_user = await service.create_user_admin(
+        db, user_create, created_by_id=current_user.id
+    )
     return new_user
 
 
@@ -103,7 +108,7 @@ async def create_user_admin(
 async def read_user(
     user_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: auth_models.User = Depends(require_user_read_or_self),
+    current_user: Principal = Depends(require_user_read_or_self),
 ):
     """
     Get user by ID.
@@ -130,7 +135,7 @@ async def update_user(
     user_id: int,
     user_update: schemas.UserUpdate,
     db: AsyncSession = Depends(get_async_db),
-    current_user: auth_models.User = Depends(require_user_write_or_self),
+    current_user: Principal = Depends(require_user_write_or_self),
 ):
     """
     Update user information.
@@ -158,8 +163,8 @@ async def update_user(
 async def delete_user(
     user_id: int,
     db: AsyncSession = Depends(get_async_db),
-    current_user: auth_models.User = Depends(require_user_delete),
-    _: auth_models.User = Depends(require_user_delete_not_self),
+    current_user: Principal = Depends(require_user_delete),
+    _: Principal = Depends(require_user_delete_not_self),
 ):
     """
     Delete user.
@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import ColumnElement, select, func
 from typing import Optional, List, Tuple
 
 from src.auth.models import User
@@ -8,6 +8,10 @@ from src.users import schemas
 from src.pagination import PaginationParams
 from src.rbac import service as rbac_service
 from src.auth import service as auth_service
+from src.auth import api_keys
+from src.auth.principal import bump_principal_version
+from src.auth.token_epoch import revoke_user_tokens_after_commit
+from src.auth.user_cache import invalidate_user_snapshot
 from fastapi import HTTPException, status
 
 
@@ -18,17 +22,27 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
 
 
 async def get_users(
-    db: AsyncSession, pagination: PaginationParams
+    db: AsyncSession,
+    pagination: PaginationParams,
+    scope: Optional[ColumnElement[bool]] = None,
 ) -> Tuple[List[User], int]:
-    """获取用户列表（分页）"""
+    """获取用户列表（分页）
+
+    scope 为行级范围条件（见 rbac.scopes），同时作用于总数和分页查询。
+    """
+    count_query = select(func.count(User.id))
+    query = select(User)
+    if scope is not None:
+        count_query = count_query.where(scope)
+        query = query.where(scope)
+
     # 获取总数
-    count_result = await db.execute(select(func.count(User.id)))
+    count_result = await db.execute(count_query)
     total = count_result.scalar()
 
     # 获取用户列表
     result = await db.execute(
-        select(User)
-        .order_by(User.created_at.desc())
+        query.order_by(User.created_at.desc())
         .offset(pagination.offset)
         .limit(pagination.limit)
     )
@@ -51,15 +65,23 @@ async def update_user(
     for field, value in update_data.items():
         if field == "password":
             # 如果更新密码，需要哈希处理
-            from src.auth.security import pwd_context
+            from src.auth.hashing import hash_password
 
-            value = pwd_context.hash(value)
+            value = await hash_password(value)
             setattr(user, "hashed_password", value)
         else:
             setattr(user, field, value)
 
     await db.commit()
     await db.refresh(user)
+
+    # 用户名可能已变化，使令牌中的主体声明和用户快照失效
+    await bump_principal_version(user_id)
+    await invalidate_user_snapshot(user_id)
+    if "password" in update_data:
+        # 管理员重置密码后，该用户已签发的令牌和 API 密钥全部失效
+        await revoke_user_tokens_after_commit(user_id)
+        await api_keys.revoke_user_api_keys(db, user_id)
     return user
 
 
@@ -71,6 +93,9 @@ async def delete_user(db: AsyncSession, user_id: int) -> bool:
 
     await db.delete(user)
     await db.commit()
+
+    await bump_principal_version(user_id)
+    await invalidate_user_snapshot(user_id)
     return True
 
 
@@ -138,23 +163,23 @@ def convert_user_to_schema(user: User, role_names: List[str]) -> auth_schemas.Us
 
 
 async def create_user_admin(
-    db: AsyncSession, user_create: schemas.UserAdminCreate
+    db: AsyncSession,
+    user_create: schemas.UserAdminCreate,
+    created_by_id: int | None = None,
 ) -> auth_schemas.UserRead:
     """管理员创建用户，并可选分配角色"""
 
     role_ids: list[int] | None = None
     if user_create.role_ids:
         # 去重并验证角色是否存在
-        unique_role_ids = list(dict.fromkeys(user_create.role_ids))
-        role_ids = []
-        for role_id in unique_role_ids:
-            role = await rbac_service.get_role_by_id(db, role_id)
-            if not role:
+        role_ids = list(dict.fromkeys(user_create.role_ids))
+        existing = await rbac_service.get_existing_role_ids(db, role_ids)
+        for role_id in role_ids:
+            if role_id not in existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"角色ID {role_id} 不存在",
                 )
-            role_ids.append(role_id)
 
     # 复用通用创建逻辑
     new_user = await auth_service.create_user(
@@ -165,6 +190,7 @@ async def create_user_admin(
             password=user_create.password,
         ),
         role_ids=role_ids,
+        created_by_id=created_by_id,
     )
 
     user_roles = await rbac_service.get_user_roles(db, new_user.id)
@@ -100,8 +100,12 @@ async def async_client(
     redis_client: redis.Redis,
 ) -> AsyncGenerator[AsyncClient, None]:
     """提供 FastAPI 应用的异步测试客户端"""
+    from src.rate_limit import limiter
     from src.redis_client import get_redis_client
 
+    # 限流计数保存在进程内存中，每个测试重新计数
+    limiter.reset()
+
     async def override_get_async_db() -> AsyncGenerator[AsyncSession, None]:
         yield async_db_session
 
@@ -122,6 +126,35 @@ async def async_client(
     app.dependency_overrides.clear()
 
 
+# --- Auth Fixtures ---
+@pytest.fixture
+def register_and_login(async_client: AsyncClient):
+    """注册用户并登录，返回 /auth/token 的响应（access_token、refresh_token）"""
+
+    async def _register_and_login(
+        username: str, password: str = "testpassword123"
+    ) -> dict:
+        payload = {"username": username, "password": password}
+        response = await async_client.post("/api/v1/auth/register", json=payload)
+        assert response.status_code == 201
+        response = await async_client.post("/api/v1/auth/token", data=payload)
+        assert response.status_code == 200
+        return response.json()
+
+    return _register_and_login
+
+
+@pytest.fixture
+def auth_headers(register_and_login):
+    """注册用户并登录，返回 Bearer 认证请求头"""
+
+    async def _auth_headers(username: str, password: str = "testpassword123") -> dict:
+        tokens = await register_and_login(username, password)
+        return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    return _auth_headers
+
+
 # --- Redis Fixture ---
 @pytest_asyncio.fixture
 async def redis_client() -> AsyncGenerator[redis.Redis, None]:
@@ -0,0 +1,149 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import service as auth_service
+from src.auth.api_keys import api_key_cache
+from src.pubsub import invalidation_bus
+from src.users import schemas as user_schemas
+from src.users import service as user_service
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_api_key_authenticates_requests(async_client: AsyncClient, auth_headers):
+    headers = await auth_headers("service_account")
+
+    response = await async_client.post(
+        "/api/v1/auth/api-keys", json={"name": "ci"}, headers=headers
+    )
+    assert response.status_code == 201
+    created = response.json()
+    assert created["key"].startswith(created["prefix"])
+
+    response = await async_client.get(
+        "/api/v1/users/me", headers={"X-API-Key": created["key"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["username"] == "service_account"
+
+    response = await async_client.get("/api/v1/auth/api-keys", headers=headers)
+    assert [key["name"] for key in response.json()] == ["ci"]
+    assert "key" not in response.json()[0]
+
+    response = await async_client.get(
+        "/api/v1/users/me", headers={"X-API-Key": "sk_not-a-real-key"}
+    )
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid API key"
+
+
+async def test_revoked_api_key_is_rejected_on_cached_path(
+    async_client: AsyncClient, monkeypatch, auth_headers
+):
+    monkeypatch.setattr(invalidation_bus, "_listening", True)
+    api_key_cache.clear()
+    headers = await auth_headers("revoke_service")
+    created = (
+        await async_client.post(
+            "/api/v1/auth/api-keys", json={"name": "ci"}, headers=headers
+        )
+    ).json()
+    key_headers = {"X-API-Key": created["key"]}
+
+    for _ in range(2):
+        response = await async_client.get("/api/v1/users/me", headers=key_headers)
+        assert response.status_code == 200
+    assert api_key_cache.stats()["hits"] >= 1
+
+    response = await async_client.delete(
+        f"/api/v1/auth/api-keys/{created['id']}", headers=headers
+    )
+    assert response.status_code == 200
+
+    response = await async_client.get("/api/v1/users/me", headers=key_headers)
+    assert response.status_code == 401
+    api_key_cache.clear()
+
+
+async def test_api_keys_cannot_manage_keys_or_log_out(
+    async_client: AsyncClient, auth_headers
+):
+    headers = await auth_headers("bearer_only")
+    created = (
+        await async_client.post(
+            "/api/v1/auth/api-keys", json={"name": "ci"}, headers=headers
+        )
+    ).json()
+    key_headers = {"X-API-Key": created["key"]}
+
+    response = await async_client.post(
+        "/api/v1/auth/api-keys", json={"name": "minted"}, headers=key_headers
+    )
+    assert response.status_code == 401
+    response = await async_client.get("/api/v1/auth/api-keys", headers=key_headers)
+    assert response.status_code == 401
+    response = await async_client.post("/api/v1/auth/logout", headers=key_headers)
+    assert response.status_code == 401
+    response = await async_client.post("/api/v1/auth/logout-all", headers=key_headers)
+    assert response.status_code == 401
+    # 密钥仍然有效：上面的请求都没有产生作用
+    response = await async_client.get("/api/v1/users/me", headers=key_headers)
+    assert response.status_code == 200
+
+
+async def test_password_change_and_logout_all_revoke_api_keys(
+    async_client: AsyncClient,
+    auth_headers,
+):
+    headers = await auth_headers("rotate_service")
+    for endpoint, body in (
+        (
+            "/api/v1/auth/change-password",
+            {
+                "current_password": "testpassword123",
+                "new_password": "newpassword456",
+            },
+        ),
+        ("/api/v1/auth/logout-all", None),
+    ):
+        created = (
+            await async_client.post(
+                "/api/v1/auth/api-keys", json={"name": "ci"}, headers=headers
+            )
+        ).json()
+        response = await async_client.post(endpoint, json=body, headers=headers)
+        assert response.status_code == 200
+
+        response = await async_client.get(
+            "/api/v1/users/me", headers={"X-API-Key": created["key"]}
+        )
+        assert response.status_code == 401
+
+        # 原有令牌已吊销，重新登录
+        response = await async_client.post(
+            "/api/v1/auth/token",
+            data={"username": "rotate_service", "password": "newpassword456"},
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def test_admin_password_reset_revokes_api_keys(
+    async_client: AsyncClient, async_db_session: AsyncSession, auth_headers
+):
+    headers = await auth_headers("reset_service")
+    created = (
+        await async_client.post(
+            "/api/v1/auth/api-keys", json={"name": "ci"}, headers=headers
+        )
+    ).json()
+    user = await auth_service.get_user_by_username(async_db_session, "reset_service")
+
+    await user_service.update_user(
+        async_db_session, user.id, user_schemas.UserUpdate(password="resetpass789")
+    )
+
+    response = await async_client.get(
+        "/api/v1/users/me", headers={"X-API-Key": created["key"]}
+    )
+    assert response.status_code == 401
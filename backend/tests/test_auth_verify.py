@@ -0,0 +1,120 @@
+import pytest
+from httpx import AsyncClient
+
+from src.auth.verify import verify_metrics
+
+pytestmark = pytest.mark.asyncio
+
+VERIFY_URL = "/api/v1/auth/verify"
+
+
+async def test_verify_returns_identity_headers(async_client: AsyncClient, auth_headers):
+    headers = await auth_headers("verify_user")
+    me = (await async_client.get("/api/v1/users/me", headers=headers)).json()
+
+    response = await async_client.get(VERIFY_URL, headers=headers)
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["x-user-id"] == str(me["id"])
+    assert response.headers["x-user-name"] == "verify_user"
+    assert len(response.headers["x-user-roles"].split(",")) == 1  # 默认 user 角色
+
+    # nginx 子请求沿用原请求的方法
+    response = await async_client.post(VERIFY_URL, headers=headers)
+    assert response.status_code == 200
+
+
+async def test_verify_rejects_missing_invalid_and_revoked_tokens(
+    async_client: AsyncClient,
+    auth_headers,
+):
+    response = await async_client.get(VERIFY_URL)
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+
+    response = await async_client.get(
+        VERIFY_URL, headers={"Authorization": "Bearer not-a-token"}
+    )
+    assert response.status_code == 401
+
+    headers = await auth_headers("verify_logout")
+    await async_client.post("/api/v1/auth/logout", headers=headers)
+    response = await async_client.get(VERIFY_URL, headers=headers)
+    assert response.status_code == 401
+
+
+async def test_verify_checks_required_permission(
+    async_client: AsyncClient, auth_headers
+):
+    headers = await auth_headers("verify_perm")
+
+    response = await async_client.get(
+        VERIFY_URL, params={"permission": "dashboard:access"}, headers=headers
+    )
+    assert response.status_code == 200
+
+    response = await async_client.get(
+        VERIFY_URL, headers={**headers, "X-Required-Permission": "user:delete"}
+    )
+    assert response.status_code == 403
+    assert "x-user-id" not in response.headers
+
+    before = verify_metrics.stats()["forbidden"]
+    await async_client.get(
+        VERIFY_URL, params={"permission": "not-a-permission"}, headers=headers
+    )
+    assert verify_metrics.stats()["forbidden"] == before + 1
+
+
+async def test_verify_accepts_api_keys(async_client: AsyncClient, auth_headers):
+    headers = await auth_headers("verify_service")
+    created = (
+        await async_client.post(
+            "/api/v1/auth/api-keys", json={"name": "proxy"}, headers=headers
+        )
+    ).json()
+
+    response = await async_client.get(VERIFY_URL, headers={"X-API-Key": created["key"]})
+    assert response.status_code == 200
+    assert response.headers["x-user-name"] == "verify_service"
+
+    response = await async_client.get(VERIFY_URL, headers={"X-API-Key": "sk_unknown"})
+    assert response.status_code == 401
+
+
+async def test_verify_treats_undecodable_input_as_denied(
+    async_client: AsyncClient, auth_headers
+):
+    headers = await auth_headers("verify_bytes")
+
+    response = await async_client.get(
+        VERIFY_URL, headers={**headers, "X-Required-Permission": b"user:\xff"}
+    )
+    assert response.status_code == 403
+
+    response = await async_client.get(
+        VERIFY_URL + "?permission=%ff%fe", headers=headers
+    )
+    assert response.status_code == 403
+
+    response = await async_client.get(
+        VERIFY_URL, headers={"Authorization": b"Bearer \xff\xfe"}
+    )
+    assert response.status_code == 401
+
+
+async def test_verify_returns_503_on_backend_failure(
+    async_client: AsyncClient, auth_headers, monkeypatch
+):
+    headers = await auth_headers("verify_outage")
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr("src.auth.verify.is_token_blacklisted", unavailable)
+    before = verify_metrics.stats()["unavailable"]
+
+    response = await async_client.get(VERIFY_URL, headers=headers)
+    assert response.status_code == 503
+    assert "x-user-id" not in response.headers
+    assert verify_metrics.stats()["unavailable"] == before + 1
@@ -0,0 +1,114 @@
+import pytest
+from httpx import AsyncClient
+
+from src.auth import hashing, lockout
+from src.auth.constants import REDIS_LOGIN_LOCK_PREFIX
+from src.config import settings
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _login(async_client: AsyncClient, password: str):
+    return await async_client.post(
+        "/api/v1/auth/token",
+        data={"username": "lockout_user", "password": password},
+    )
+
+
+async def test_lockout_rejects_before_password_verification(
+    async_client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_USER", 2)
+    response = await async_client.post(
+        "/api/v1/auth/register",
+        json={"username": "lockout_user", "password": "testpassword123"},
+    )
+    assert response.status_code == 201
+
+    for _ in range(2):
+        response = await _login(async_client, "wrongpassword123")
+        assert response.status_code == 401
+
+    calls = []
+    original_verify = hashing.verify_password
+
+    async def counting_verify(*args):
+        calls.append(args)
+        return await original_verify(*args)
+
+    monkeypatch.setattr(hashing, "verify_password", counting_verify)
+
+    # 即使密码正确，锁定期内也直接拒绝
+    response = await _login(async_client, "testpassword123")
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 30
+    assert calls == []
+
+
+async def test_lockout_backs_off_exponentially(redis_client, monkeypatch):
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_USER", 1)
+    lock_key = f"{REDIS_LOGIN_LOCK_PREFIX}user:{lockout._username_id('victim')}"
+
+    ttls = []
+    for _ in range(4):
+        await lockout.record_login_failure(redis_client, "victim", "10.0.0.1")
+        ttls.append(await redis_client.ttl(lock_key))
+    assert ttls == [30, 60, 120, 240]
+
+    # 来源维度尚未达到阈值
+    await lockout.ensure_login_allowed(redis_client, "someone-else", "10.0.0.1")
+
+
+async def test_source_lock_uses_client_ip_behind_trusted_proxy(
+    async_client: AsyncClient, monkeypatch
+):
+    # httpx 测试客户端的对端地址为 127.0.0.1，充当 nginx
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["127.0.0.1"])
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_SOURCE", 2)
+    response = await async_client.post(
+        "/api/v1/auth/register",
+        json={"username": "proxied_user", "password": "testpassword123"},
+    )
+    assert response.status_code == 201
+
+    async def login(client_ip: str, username: str, password: str):
+        return await async_client.post(
+            "/api/v1/auth/token",
+            data={"username": username, "password": password},
+            headers={"X-Real-IP": client_ip},
+        )
+
+    for username in ("guess_a", "guess_b"):
+        response = await login("203.0.113.1", username, "wrongpassword123")
+        assert response.status_code == 401
+
+    # 同一代理之后的另一个客户端不受影响
+    response = await login("203.0.113.1", "proxied_user", "testpassword123")
+    assert response.status_code == 429
+    response = await login("203.0.113.2", "proxied_user", "testpassword123")
+    assert response.status_code == 200
+
+
+async def test_source_lock_skipped_without_trusted_proxies(
+    async_client: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", [])
+    monkeypatch.setattr(settings, "LOGIN_MAX_FAILURES_PER_SOURCE", 2)
+    response = await async_client.post(
+        "/api/v1/auth/register",
+        json={"username": "shared_proxy_user", "password": "testpassword123"},
+    )
+    assert response.status_code == 201
+
+    # 所有请求都来自代理地址：失败不会累积到一个共享的来源计数上
+    for username in ("guess_c", "guess_d", "guess_e"):
+        response = await async_client.post(
+            "/api/v1/auth/token",
+            data={"username": username, "password": "wrongpassword123"},
+        )
+        assert response.status_code == 401
+    response = await async_client.post(
+        "/api/v1/auth/token",
+        data={"username": "shared_proxy_user", "password": "testpassword123"},
+    )
+    assert response.status_code == 200
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.auth.hashing import PasswordHashingService
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_hash_and_verify_round_trip():
+    service = PasswordHashingService(
+        max_workers=1, max_concurrency=1, max_queue_size=4
+    )
+    try:
+        hashed = await service.hash("testpassword123")
+        assert await service.verify("testpassword123", hashed)
+        assert not await service.verify("wrongpassword123", hashed)
+
+        stats = service.stats()
+        assert stats["completed"] == 3
+        assert stats["queue_depth"] == 0
+        assert stats["in_flight"] == 0
+    finally:
+        service.shutdown()
+
+
+async def test_full_queue_rejects_with_503():
+    service = PasswordHashingService(
+        max_workers=1, max_concurrency=1, max_queue_size=1
+    )
+    try:
+        results = await asyncio.gather(
+            *(service.hash("testpassword123") for _ in range(3)),
+            return_exceptions=True,
+        )
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        assert len(rejected) == 1
+        assert rejected[0].status_code == 503
+        assert service.stats()["rejected"] == 1
+    finally:
+        service.shutdown()
+
+
+async def test_calibration_stays_within_bounds():
+    service = PasswordHashingService(max_workers=1, max_concurrency=1, max_queue_size=4)
+    try:
+        # 任意 cost 都超过目标耗时：退回安全下限
+        assert await service.calibrate(target_ms=0, min_rounds=4, max_rounds=6) == 4
+        # 目标耗时足够宽松：取上限
+        assert (
+            await service.calibrate(target_ms=60_000, min_rounds=4, max_rounds=5) == 5
+        )
+    finally:
+        service.shutdown()
+
+
+async def test_login_rehashes_password_below_security_floor(async_db_session):
+    from src.auth import models, security
+    from src.auth import service as auth_service
+
+    user = models.User(
+        username="legacy_hash_user",
+        hashed_password=security.hash_password("testpassword123", rounds=4),
+    )
+    async_db_session.add(user)
+    await async_db_session.commit()
+
+    authenticated = await auth_service.authenticate_user(
+        async_db_session, "legacy_hash_user", "testpassword123"
+    )
+    assert authenticated is not None
+    assert security.get_hash_rounds(authenticated.hashed_password) == (
+        security.get_bcrypt_rounds()
+    )
+    assert not security.needs_rehash(authenticated.hashed_password)
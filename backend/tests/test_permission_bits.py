@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.models import User
+from src.rbac import schemas
+from src.rbac import service as rbac_service
+from src.rbac.models import SystemRoles
+from src.rbac.registry import PermissionRegistry, permission_registry
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _create_user(db: AsyncSession, username: str, role_names: list[str]) -> int:
+    user = User(username=username, hashed_password="x")
+    db.add(user)
+    await db.flush()
+    role_ids = [
+        (await rbac_service.get_role_by_name(db, name)).id for name in role_names
+    ]
+    await rbac_service.assign_user_roles(db, user.id, role_ids)
+    return user.id
+
+
+def test_registry_assigns_stable_bits():
+    registry = PermissionRegistry()
+    registry.register(["user:read", "user:write"])
+    fingerprint = registry.fingerprint
+
+    mask = registry.mask_of(["user:write", "report:export"])
+    assert registry.has(mask, "user:write")
+    assert not registry.has(mask, "user:read")
+    assert not registry.has(mask, "unknown:key")
+    # 新权限追加在末尾，已有位序号不变，指纹随之变化
+    assert registry.bit("user:read") == 0
+    assert registry.keys_of(mask) == ["user:write", "report:export"]
+    assert registry.fingerprint != fingerprint
+
+
+async def test_strategy_roles_compile_to_masks(async_db_session: AsyncSession):
+    db = async_db_session
+    super_id = await _create_user(db, "mask_super", [SystemRoles.SUPER_ADMIN])
+    admin_id = await _create_user(db, "mask_admin", [SystemRoles.ADMIN])
+    user_id = await _create_user(db, "mask_user", [SystemRoles.USER])
+
+    super_mask = await rbac_service.get_user_permission_mask_db(db, super_id)
+    admin_mask = await rbac_service.get_user_permission_mask_db(db, admin_id)
+    user_mask = await rbac_service.get_user_permission_mask_db(db, user_id)
+
+    assert permission_registry.keys_of(super_mask) == permission_registry.keys_of(
+        (1 << len(permission_registry)) - 1
+    )
+    assert permission_registry.has(admin_mask, "user:write")
+    assert not permission_registry.has(admin_mask, "user:delete")
+    assert permission_registry.keys_of(user_mask) == ["dashboard:access"]
+
+
+async def test_user_mask_is_union_of_role_masks(async_db_session: AsyncSession):
+    db = async_db_session
+    delete_permission = await rbac_service.get_permission_by_target_action(
+        db, "user", "delete"
+    )
+    await rbac_service.create_role(
+        db,
+        schemas.RoleCreate(
+            name="user_deleter",
+            display_name="User deleter",
+            permission_ids=[delete_permission.id],
+        ),
+    )
+    user_id = await _create_user(db, "mask_union", [SystemRoles.ADMIN, "user_deleter"])
+
+    assert await rbac_service.check_user_permission_cached(db, user_id, "user:delete")
+    assert await rbac_service.check_user_permission(db, user_id, "user:delete")
+    assert await rbac_service.check_user_permission_cached(db, user_id, "role:write")
+    assert not await rbac_service.check_user_permission_cached(
+        db, user_id, "role:delete"
+    )
+
+    keys = {
+        p.permission_key
+        for p in await rbac_service.get_user_permissions_db(db, user_id)
+    }
+    assert "user:delete" in keys and "role:delete" not in keys
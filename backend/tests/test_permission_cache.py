@@ -0,0 +1,138 @@
+import pytest
+import redis.asyncio as redis
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import service as auth_service
+from src.auth.schemas import UserCreate
+from src.pubsub import invalidation_bus
+from src.rbac import schemas
+from src.rbac import service as rbac_service
+from src.rbac.cache import permission_cache
+from src.rbac.constants import (
+    REDIS_RBAC_VERSION_KEY,
+    REDIS_ROLE_GENERATIONS_KEY,
+    REDIS_ROLE_SET_MASK_PREFIX,
+)
+from src.rbac.models import SystemRoles
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _grant_user_read_via_new_role(db: AsyncSession, user_id: int) -> int:
+    role = await rbac_service.create_role(
+        db, schemas.RoleCreate(name="reader", display_name="Reader")
+    )
+    current = [r.id for r in await rbac_service.get_user_roles(db, user_id)]
+    await rbac_service.assign_user_roles(db, user_id, current + [role.id])
+    user_read = await rbac_service.get_permission_by_target_action(db, "user", "read")
+    await rbac_service.assign_role_permissions(db, role.id, [user_read.id])
+    return role.id
+
+
+async def test_role_change_bumps_role_generation_only(
+    async_client: AsyncClient,
+    async_db_session: AsyncSession,
+    redis_client: redis.Redis,
+    auth_headers,
+):
+    db = async_db_session
+    headers = await auth_headers("gen_user")
+    other = await auth_headers("gen_other")
+    user = await auth_service.get_user_by_username(db, "gen_user")
+    other_user = await auth_service.get_user_by_username(db, "gen_other")
+
+    response = await async_client.get("/api/v1/rbac/me/permissions", headers=headers)
+    assert [p["target"] for p in response.json()] == ["dashboard"]
+    response = await async_client.get(f"/api/v1/users/{user.id}", headers=other)
+    assert response.status_code == 403
+    # 拥有相同角色的用户共享同一个角色集合掩码
+    assert len(await redis_client.keys(f"{REDIS_ROLE_SET_MASK_PREFIX}*")) == 1
+
+    version = await redis_client.get(REDIS_RBAC_VERSION_KEY)
+    user_role = await rbac_service.get_role_by_name(db, SystemRoles.USER)
+    user_read = await rbac_service.get_permission_by_target_action(db, "user", "read")
+    dashboard = await rbac_service.get_permission_by_target_action(
+        db, "dashboard", "access"
+    )
+    await rbac_service.assign_role_permissions(
+        db, user_role.id, [dashboard.id, user_read.id]
+    )
+    assert await redis_client.get(REDIS_RBAC_VERSION_KEY) == version
+    assert await redis_client.hget(REDIS_ROLE_GENERATIONS_KEY, str(user_role.id)) == "1"
+
+    for user_id in (user.id, other_user.id):
+        assert await rbac_service.check_user_permission_cached(db, user_id, "user:read")
+    response = await async_client.get(f"/api/v1/users/{user.id}", headers=other)
+    assert response.status_code == 200
+
+
+async def test_l1_serves_repeated_checks_and_follows_version(
+    async_db_session: AsyncSession, redis_client: redis.Redis, monkeypatch
+):
+    monkeypatch.setattr(invalidation_bus, "_listening", True)
+    monkeypatch.setattr(permission_cache, "version", None)
+    await permission_cache.on_resync(redis_client)
+
+    user = await auth_service.create_user(
+        async_db_session,
+        UserCreate(username="l1_user", password="testpassword123"),
+    )
+
+    assert not await rbac_service.check_user_permission_cached(
+        async_db_session, user.id, "user:read"
+    )
+    l1_hits = permission_cache.stats()["l1_hits"]
+    await redis_client.flushdb()  # L1 命中不访问 Redis
+    assert not await rbac_service.check_user_permission_cached(
+        async_db_session, user.id, "user:read"
+    )
+    assert permission_cache.stats()["l1_hits"] == l1_hits + 1
+
+    await _grant_user_read_via_new_role(async_db_session, user.id)
+    assert await rbac_service.check_user_permission_cached(
+        async_db_session, user.id, "user:read"
+    )
+    assert permission_cache.stats()["l1_role_sets"] >= 2
+
+
+async def test_user_permissions_endpoint_uses_permission_cache(
+    async_client: AsyncClient, async_db_session: AsyncSession, auth_headers
+):
+    db = async_db_session
+    headers = await auth_headers("perm_list_admin")
+    await auth_headers("perm_list_target")
+    admin = await auth_service.get_user_by_username(db, "perm_list_admin")
+    target = await auth_service.get_user_by_username(db, "perm_list_target")
+    admin_role = await rbac_service.get_role_by_name(db, SystemRoles.ADMIN)
+    await rbac_service.assign_user_roles(db, admin.id, [admin_role.id])
+    url = f"/api/v1/rbac/users/{target.id}/permissions"
+
+    response = await async_client.get(url, headers=headers)
+    assert response.status_code == 200
+    dashboard = await rbac_service.get_permission_by_target_action(
+        db, "dashboard", "access"
+    )
+    assert response.json() == [
+        {
+            "id": dashboard.id,
+            "target": "dashboard",
+            "action": "access",
+            "display_name": dashboard.display_name,
+            "description": dashboard.description,
+            "permission_key": "dashboard:access",
+            "permission_type": "page",
+        }
+    ]
+
+    misses = permission_cache.stats()["misses"]
+    response = await async_client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert permission_cache.stats()["misses"] == misses
+
+    await _grant_user_read_via_new_role(db, target.id)
+    response = await async_client.get(url, headers=headers)
+    assert [p["permission_key"] for p in response.json()] == [
+        "dashboard:access",
+        "user:read",
+    ]
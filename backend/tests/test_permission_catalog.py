@@ -0,0 +1,67 @@
+import pytest
+import redis.asyncio as redis
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import service as auth_service
+from src.pubsub import invalidation_bus
+from src.rbac import schemas
+from src.rbac import service as rbac_service
+from src.rbac.cache import permission_cache
+from src.rbac.catalog import permission_catalog
+from src.rbac.init_data import BASE_PERMISSIONS, auto_generate_permission_groups
+from src.rbac.models import SystemRoles
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_my_permissions_served_from_catalog_json(
+    async_client: AsyncClient, async_db_session: AsyncSession, auth_headers
+):
+    headers = await auth_headers("catalog_user")
+    user = await auth_service.get_user_by_username(async_db_session, "catalog_user")
+
+    response = await async_client.get("/api/v1/rbac/me/permissions", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == await rbac_service.get_user_permissions_cached(
+        async_db_session, user.id
+    )
+
+    admin_role = await rbac_service.get_role_by_name(
+        async_db_session, SystemRoles.ADMIN
+    )
+    await rbac_service.assign_user_roles(async_db_session, user.id, [admin_role.id])
+    response = await async_client.get("/api/v1/rbac/me/permissions", headers=headers)
+    keys = [f"{p['target']}:{p['action']}" for p in response.json()]
+    assert keys == sorted(keys, key=lambda k: tuple(k.split(":")))
+    assert len(keys) == len(BASE_PERMISSIONS) - 3  # 不含核心资源的删除权限
+    assert "user:delete" not in keys
+
+
+async def test_permission_groups_endpoint(async_client: AsyncClient):
+    response = await async_client.get("/api/v1/rbac/permission-groups")
+    assert response.status_code == 200
+    assert response.json() == auto_generate_permission_groups()
+
+
+async def test_catalog_snapshot_is_dropped_on_permission_change(
+    async_db_session: AsyncSession, redis_client: redis.Redis, monkeypatch
+):
+    monkeypatch.setattr(invalidation_bus, "_listening", True)
+    monkeypatch.setattr(permission_cache, "version", None)
+    await permission_cache.on_resync(redis_client)
+    await permission_catalog.on_resync(redis_client)
+
+    first = await permission_catalog.get(async_db_session)
+    assert await permission_catalog.get(async_db_session) is first
+
+    await rbac_service.create_permission(
+        async_db_session,
+        schemas.PermissionCreate(
+            target="reports", action="export", display_name="导出报表"
+        ),
+    )
+    second = await permission_catalog.get(async_db_session)
+    assert second is not first
+    assert "reports:export" in {e.permission_key for e in second.entries}
+    permission_catalog.clear()
@@ -0,0 +1,80 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import service as auth_service
+from src.rbac import service as rbac_service
+from src.rbac.cache import permission_cache
+from src.rbac.models import SystemRoles
+
+pytestmark = pytest.mark.asyncio
+
+
+def _count_cache_reads(monkeypatch) -> list[list[int]]:
+    reads = []
+    get_many = permission_cache.get_many
+
+    async def counting_get_many(user_ids, *args, **kwargs):
+        reads.append(list(user_ids))
+        return await get_many(user_ids, *args, **kwargs)
+
+    monkeypatch.setattr(permission_cache, "get_many", counting_get_many)
+    return reads
+
+
+async def test_check_my_permissions(
+    async_client: AsyncClient, monkeypatch, auth_headers
+):
+    headers = await auth_headers("check_user")
+    reads = _count_cache_reads(monkeypatch)
+
+    response = await async_client.post(
+        "/api/v1/rbac/me/permissions/check",
+        json={"permissions": ["dashboard:access", "user:read", "not-a-key"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "permissions": {
+            "dashboard:access": True,
+            "user:read": False,
+            "not-a-key": False,
+        },
+        "users": None,
+    }
+
+    response = await async_client.post(
+        "/api/v1/rbac/me/permissions/check",
+        json={"permissions": ["dashboard:access"], "user_ids": [1, 2]},
+        headers=headers,
+    )
+    assert response.status_code == 403
+    # 未授权时不读取（也不加载）其他用户的权限
+    assert all(len(user_ids) == 1 for user_ids in reads)
+
+
+async def test_admin_checks_other_users_after_authorizing(
+    async_client: AsyncClient, async_db_session: AsyncSession, monkeypatch, auth_headers
+):
+    headers = await auth_headers("check_admin")
+    await auth_headers("check_target")
+    admin = await auth_service.get_user_by_username(async_db_session, "check_admin")
+    target = await auth_service.get_user_by_username(async_db_session, "check_target")
+    admin_role = await rbac_service.get_role_by_name(
+        async_db_session, SystemRoles.ADMIN
+    )
+    await rbac_service.assign_user_roles(async_db_session, admin.id, [admin_role.id])
+
+    reads = _count_cache_reads(monkeypatch)
+
+    response = await async_client.post(
+        "/api/v1/rbac/me/permissions/check",
+        json={"permissions": ["user:read", "user:delete"], "user_ids": [target.id]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["permissions"] == {"user:read": True, "user:delete": False}
+    assert body["users"] == {str(target.id): {"user:read": False, "user:delete": False}}
+    # 先读取当前用户的位掩码完成授权，再批量读取被检查的用户
+    assert reads == [[admin.id], [target.id]]
@@ -0,0 +1,71 @@
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import service as auth_service
+from src.rbac import service as rbac_service
+from src.rbac.models import SystemRoles
+from src.rbac.policy import PolicyEngine, policy_metrics
+
+pytestmark = pytest.mark.asyncio
+
+
+def _count_mask_reads(monkeypatch) -> list[int]:
+    reads = []
+    get_mask = rbac_service.get_user_permission_mask_cached
+
+    async def counting_get_mask(db, user_id):
+        reads.append(user_id)
+        return await get_mask(db, user_id)
+
+    monkeypatch.setattr(
+        rbac_service, "get_user_permission_mask_cached", counting_get_mask
+    )
+    return reads
+
+
+async def test_engine_reads_mask_once_and_memoizes(
+    async_client: AsyncClient, async_db_session: AsyncSession, monkeypatch, auth_headers
+):
+    await auth_headers("policy_user")
+    user = await auth_service.get_user_by_username(async_db_session, "policy_user")
+    reads = _count_mask_reads(monkeypatch)
+    memoized = policy_metrics.stats()["memoized"]
+
+    policy = PolicyEngine(async_db_session, user.id)
+    assert await policy.allows("dashboard:access")
+    assert await policy.allows("dashboard:access")
+    assert await policy.allows_or_self(user.id, "user:write")
+    with pytest.raises(HTTPException) as exc_info:
+        await policy.require("user:read")
+    assert exc_info.value.status_code == 403
+
+    assert reads == [user.id]
+    stats = policy_metrics.stats()
+    assert stats["memoized"] == memoized + 1
+    assert stats["permissions"]["user:read"]["denied"] >= 1
+    assert stats["permissions"]["dashboard:access"]["allowed"] >= 1
+
+
+async def test_request_authorizes_against_one_mask_read(
+    async_client: AsyncClient, async_db_session: AsyncSession, monkeypatch, auth_headers
+):
+    headers = await auth_headers("policy_admin")
+    await auth_headers("policy_target")
+    admin = await auth_service.get_user_by_username(async_db_session, "policy_admin")
+    target = await auth_service.get_user_by_username(async_db_session, "policy_target")
+    admin_role = await rbac_service.get_role_by_name(
+        async_db_session, SystemRoles.ADMIN
+    )
+    await rbac_service.assign_user_roles(async_db_session, admin.id, [admin_role.id])
+    reads = _count_mask_reads(monkeypatch)
+
+    response = await async_client.get(f"/api/v1/users/{target.id}", headers=headers)
+    assert response.status_code == 200
+    response = await async_client.get(
+        f"/api/v1/rbac/users/{target.id}/permissions", headers=headers
+    )
+    assert response.status_code == 200
+    assert [p["target"] for p in response.json()] == ["dashboard"]
+    assert reads == [admin.id, admin.id, target.id]
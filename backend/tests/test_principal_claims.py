@@ -0,0 +1,77 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import security
+from src.auth import service as auth_service
+from src.auth.principal import (
+    bump_principal_version,
+    ensure_principal_version,
+    principal_from_claims,
+)
+from src.rbac import schemas
+from src.rbac import service as rbac_service
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_login_token_carries_principal_claims(
+    async_client: AsyncClient, register_and_login
+):
+    token = (await register_and_login("claims_user"))["access_token"]
+
+    payload = security.decode_and_verify_token(token)
+    assert isinstance(payload["uid"], int)
+    assert len(payload["rid"]) == 1  # 默认 user 角色
+    assert "ver" in payload
+
+    response = await async_client.get(
+        "/api/v1/rbac/me/roles", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    assert [role["name"] for role in response.json()] == ["user"]
+
+
+async def test_stale_version_falls_back_to_database(redis_client):
+    version = await ensure_principal_version(redis_client, 4242)
+    payload = {"sub": "someone", "uid": 4242, "rid": [3], "ver": version}
+
+    principal = await principal_from_claims(redis_client, payload)
+    assert principal is not None
+    assert principal.id == 4242
+    assert principal.role_ids == (3,)
+
+    await bump_principal_version(4242)
+    assert await principal_from_claims(redis_client, payload) is None
+
+    # 没有主体声明的令牌始终回退数据库
+    assert await principal_from_claims(redis_client, {"sub": "someone"}) is None
+
+
+async def test_deleting_role_invalidates_holders_claims(
+    async_client: AsyncClient,
+    async_db_session: AsyncSession,
+    redis_client,
+    register_and_login,
+):
+    db = async_db_session
+    await register_and_login("role_holder")
+    user = await auth_service.get_user_by_username(db, "role_holder")
+    role = await rbac_service.create_role(
+        db, schemas.RoleCreate(name="temporary", display_name="Temporary")
+    )
+    role_id = role.id
+    current = [r.id for r in await rbac_service.get_user_roles(db, user.id)]
+    await rbac_service.assign_user_roles(db, user.id, current + [role_id])
+
+    # 分配角色之后签发的令牌携带该角色
+    response = await async_client.post(
+        "/api/v1/auth/token",
+        data={"username": "role_holder", "password": "testpassword123"},
+    )
+    payload = security.decode_and_verify_token(response.json()["access_token"])
+    assert role_id in payload["rid"]
+    assert await principal_from_claims(redis_client, payload) is not None
+
+    await rbac_service.delete_role(db, role_id)
+    assert await principal_from_claims(redis_client, payload) is None
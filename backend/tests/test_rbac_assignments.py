@@ -0,0 +1,95 @@
+import pytest
+import redis.asyncio as redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.models import User
+from src.rbac import models, schemas
+from src.rbac import service as rbac_service
+from src.rbac.constants import REDIS_ROLE_GENERATIONS_KEY
+from src.rbac.models import SystemRoles
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _permission_ids(db: AsyncSession, *keys: str) -> list[int]:
+    ids = []
+    for key in keys:
+        target, action = key.split(":")
+        permission = await rbac_service.get_permission_by_target_action(
+            db, target, action
+        )
+        ids.append(permission.id)
+    return ids
+
+
+async def _association_rows(db: AsyncSession, role_id: int) -> dict[int, int]:
+    result = await db.execute(
+        select(models.RolePermission.permission_id, models.RolePermission.id).where(
+            models.RolePermission.role_id == role_id
+        )
+    )
+    return dict(result.all())
+
+
+async def test_role_permission_writes_are_diffed(
+    async_db_session: AsyncSession, redis_client: redis.Redis
+):
+    db = async_db_session
+    read, write, delete = await _permission_ids(
+        db, "user:read", "user:write", "user:delete"
+    )
+    role = await rbac_service.create_role(
+        db,
+        schemas.RoleCreate(
+            name="editor", display_name="Editor", permission_ids=[read, write]
+        ),
+    )
+    rows = await _association_rows(db, role.id)
+
+    # 相同集合：不写入，不使缓存失效
+    assert await rbac_service.assign_role_permissions(db, role.id, [write, read])
+    assert await _association_rows(db, role.id) == rows
+    assert await redis_client.hget(REDIS_ROLE_GENERATIONS_KEY, str(role.id)) is None
+
+    # 只删除被移除的、插入新增的，保留的行不变
+    assert await rbac_service.assign_role_permissions(db, role.id, [read, delete])
+    new_rows = await _association_rows(db, role.id)
+    assert set(new_rows) == {read, delete}
+    assert new_rows[read] == rows[read]
+    assert await redis_client.hget(REDIS_ROLE_GENERATIONS_KEY, str(role.id)) == "1"
+
+    # 只修改显示名称不影响有效权限
+    await rbac_service.update_role(
+        db, role.id, schemas.RoleUpdate(display_name="Editor 2")
+    )
+    assert await redis_client.hget(REDIS_ROLE_GENERATIONS_KEY, str(role.id)) == "1"
+
+
+async def test_unchanged_user_roles_skip_invalidation(
+    async_db_session: AsyncSession, monkeypatch
+):
+    db = async_db_session
+    user = User(username="assign_user", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    user_role = await rbac_service.get_role_by_name(db, SystemRoles.USER)
+    admin_role = await rbac_service.get_role_by_name(db, SystemRoles.ADMIN)
+
+    invalidated = []
+
+    async def record_invalidation(user_id):
+        invalidated.append(user_id)
+
+    monkeypatch.setattr(
+        rbac_service, "invalidate_user_permissions", record_invalidation
+    )
+
+    await rbac_service.assign_user_roles(db, user.id, [user_role.id])
+    await rbac_service.assign_user_roles(db, user.id, [user_role.id])
+    await rbac_service.assign_user_roles(db, user.id, [user_role.id, admin_role.id])
+    assert invalidated == [user.id, user.id]
+
+    assert await rbac_service.get_existing_role_ids(
+        db, [user_role.id, admin_role.id, 999999]
+    ) == {user_role.id, admin_role.id}
@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.rbac import init_data, models
+from src.rbac import service as rbac_service
+from src.rbac.init_data import (
+    BASE_PERMISSIONS,
+    _sync_permissions,
+    create_module_permissions,
+    definitions_checksum,
+    init_rbac_data,
+    stored_definitions_checksum,
+)
+from src.rbac.models import SystemRoles
+
+pytestmark = pytest.mark.asyncio
+
+
+def _count_version_bumps(monkeypatch) -> list[None]:
+    bumps = []
+
+    async def counting_bump():
+        bumps.append(None)
+
+    monkeypatch.setattr(init_data, "bump_rbac_version", counting_bump)
+    return bumps
+
+
+async def test_sync_is_noop_when_database_matches(
+    async_db_session: AsyncSession, monkeypatch
+):
+    bumps = _count_version_bumps(monkeypatch)
+
+    await init_rbac_data(async_db_session, force=True)
+
+    assert bumps == []
+    total = await async_db_session.scalar(select(func.count(models.Permission.id)))
+    assert total == len(BASE_PERMISSIONS)
+
+
+async def test_sync_reconciles_drift(async_db_session: AsyncSession, monkeypatch):
+    db = async_db_session
+    bumps = _count_version_bumps(monkeypatch)
+
+    # 代码中未定义的权限（已分配给角色）、被修改的显示名称、被修改的角色策略
+    legacy = models.Permission(target="legacy", action="read", display_name="旧权限")
+    db.add(legacy)
+    await db.flush()
+    user_role_id = (await rbac_service.get_role_by_name(db, SystemRoles.USER)).id
+    db.add(models.RolePermission(role_id=user_role_id, permission_id=legacy.id))
+    user_read = await rbac_service.get_permission_by_target_action(db, "user", "read")
+    user_read.display_name = "changed"
+    admin_role = await rbac_service.get_role_by_name(db, SystemRoles.ADMIN)
+    admin_role.permission_strategy = "explicit"
+    await db.commit()
+
+    # 数据库被直接修改，定义校验和未变化，需要强制同步
+    assert not await init_rbac_data(db)
+    assert await init_rbac_data(db, force=True)
+
+    assert bumps == [None]
+    db.expire_all()
+    assert (
+        await rbac_service.get_permission_by_target_action(db, "legacy", "read") is None
+    )
+    user_read = await rbac_service.get_permission_by_target_action(db, "user", "read")
+    assert user_read.display_name != "changed"
+    admin_role = await rbac_service.get_role_by_name(db, SystemRoles.ADMIN)
+    assert admin_role.permission_strategy == "admin"
+    # explicit 角色已有的权限分配由管理员维护，同步不会覆盖
+    assert [
+        p.permission_key
+        for p in await rbac_service.get_role_permissions(db, user_role_id)
+    ] == ["dashboard:access"]
+
+
+async def test_sync_skipped_when_checksum_matches(
+    async_db_session: AsyncSession, monkeypatch
+):
+    assert await stored_definitions_checksum(async_db_session) == (
+        definitions_checksum()
+    )
+
+    async def fail(db):
+        raise AssertionError("sync should be skipped")
+
+    monkeypatch.setattr(init_data, "_sync_permissions", fail)
+    assert not await init_rbac_data(async_db_session)
+
+    # 定义变化后执行同步并更新校验和
+    monkeypatch.setattr(init_data, "_sync_permissions", _sync_permissions)
+    monkeypatch.setattr(
+        init_data,
+        "BASE_PERMISSIONS",
+        [*BASE_PERMISSIONS, *create_module_permissions("reports", ["export"])],
+    )
+    checksum = definitions_checksum()
+    assert await init_rbac_data(async_db_session)
+    assert await stored_definitions_checksum(async_db_session) == checksum
+    assert await rbac_service.get_permission_by_target_action(
+        async_db_session, "reports", "export"
+    )
@@ -0,0 +1,74 @@
+import pytest
+from httpx import AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _refresh(async_client: AsyncClient, refresh_token: str):
+    return await async_client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+    )
+
+
+async def test_refresh_rotates_tokens(async_client: AsyncClient, register_and_login):
+    tokens = await register_and_login("refresh_user")
+    assert tokens["refresh_token"]
+
+    response = await _refresh(async_client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    response = await async_client.get(
+        "/api/v1/users/me",
+        headers={"Authorization": f"Bearer {rotated['access_token']}"},
+    )
+    assert response.status_code == 200
+    assert response.json()["username"] == "refresh_user"
+
+
+async def test_reused_refresh_token_revokes_session(
+    async_client: AsyncClient, register_and_login
+):
+    tokens = await register_and_login("refresh_reuse_user")
+    rotated = (await _refresh(async_client, tokens["refresh_token"])).json()
+
+    # 已轮换的令牌再次出现：整个会话失效，包括最新的刷新令牌
+    response = await _refresh(async_client, tokens["refresh_token"])
+    assert response.status_code == 401
+    response = await _refresh(async_client, rotated["refresh_token"])
+    assert response.status_code == 401
+
+    response = await _refresh(async_client, "not-a-refresh-token")
+    assert response.status_code == 401
+
+
+async def test_logout_all_revokes_refresh_tokens(
+    async_client: AsyncClient, register_and_login
+):
+    tokens = await register_and_login("refresh_logout_user")
+
+    response = await async_client.post(
+        "/api/v1/auth/logout-all",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert response.status_code == 200
+
+    response = await _refresh(async_client, tokens["refresh_token"])
+    assert response.status_code == 401
+
+
+async def test_logout_with_refresh_token_ends_session(
+    async_client: AsyncClient, register_and_login
+):
+    tokens = await register_and_login("refresh_single_logout")
+
+    response = await async_client.post(
+        "/api/v1/auth/logout",
+        json={"refresh_token": tokens["refresh_token"]},
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+    assert response.status_code == 200
+
+    response = await _refresh(async_client, tokens["refresh_token"])
+    assert response.status_code == 401
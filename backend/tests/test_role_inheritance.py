@@ -0,0 +1,118 @@
+import pytest
+import redis.asyncio as redis
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import service as auth_service
+from src.auth.models import User
+from src.rbac import models, schemas
+from src.rbac import service as rbac_service
+from src.rbac.constants import REDIS_ROLE_GENERATIONS_KEY
+from src.rbac.models import SystemRoles
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _permission_id(db: AsyncSession, key: str) -> int:
+    target, action = key.split(":")
+    permission = await rbac_service.get_permission_by_target_action(db, target, action)
+    return permission.id
+
+
+async def _create_role(db: AsyncSession, name: str, **kwargs) -> int:
+    role = await rbac_service.create_role(
+        db, schemas.RoleCreate(name=name, display_name=name, **kwargs)
+    )
+    return role.id
+
+
+async def _closure(db: AsyncSession) -> set[tuple[int, int, int]]:
+    result = await db.execute(
+        select(
+            models.RoleClosure.ancestor_id,
+            models.RoleClosure.descendant_id,
+            models.RoleClosure.depth,
+        )
+    )
+    return set(result.all())
+
+
+async def test_roles_inherit_permissions_through_closure(
+    async_db_session: AsyncSession, redis_client: redis.Redis
+):
+    db = async_db_session
+    base = await _create_role(
+        db, "base", permission_ids=[await _permission_id(db, "user:read")]
+    )
+    team = await _create_role(db, "team", parent_ids=[base])
+    squad = await _create_role(db, "squad", parent_ids=[team])
+    assert await _closure(db) == {(base, team, 1), (team, squad, 1), (base, squad, 2)}
+
+    user = User(username="inherit_user", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    await rbac_service.assign_user_roles(db, user.id, [squad])
+    assert await rbac_service.check_user_permission_cached(db, user.id, "user:read")
+
+    # 父角色的权限变更使全部子孙角色的缓存失效
+    await rbac_service.assign_role_permissions(
+        db, base, [await _permission_id(db, "user:write")]
+    )
+    generations = await redis_client.hgetall(REDIS_ROLE_GENERATIONS_KEY)
+    assert {generations.get(str(r)) for r in (base, team, squad)} == {"1"}
+    assert not await rbac_service.check_user_permission_cached(db, user.id, "user:read")
+    assert await rbac_service.check_user_permission_cached(db, user.id, "user:write")
+
+    # 删除中间角色后，子孙角色不再经由它继承
+    await rbac_service.delete_role(db, team)
+    assert await _closure(db) == set()
+    assert not await rbac_service.check_user_permission_cached(
+        db, user.id, "user:write"
+    )
+
+
+async def test_inheritance_cycles_are_rejected(async_db_session: AsyncSession):
+    db = async_db_session
+    parent = await _create_role(db, "parent")
+    child = await _create_role(db, "child", parent_ids=[parent])
+
+    # 父角色不能继承子孙角色或自身，也不能继承不存在的角色
+    for role_id, parent_ids in ((parent, [child]), (parent, [parent]), (child, [999])):
+        with pytest.raises(HTTPException) as exc_info:
+            await rbac_service.update_role(
+                db, role_id, schemas.RoleUpdate(parent_ids=parent_ids)
+            )
+        assert exc_info.value.status_code == 400
+    assert await _closure(db) == {(parent, child, 1)}
+
+
+async def test_role_api_exposes_parent_ids(
+    async_client: AsyncClient, async_db_session: AsyncSession, auth_headers
+):
+    db = async_db_session
+    headers = await auth_headers("inherit_admin")
+    admin = await auth_service.get_user_by_username(db, "inherit_admin")
+    admin_role = await rbac_service.get_role_by_name(db, SystemRoles.ADMIN)
+    await rbac_service.assign_user_roles(db, admin.id, [admin_role.id])
+    user_role = await rbac_service.get_role_by_name(db, SystemRoles.USER)
+
+    response = await async_client.post(
+        "/api/v1/rbac/roles",
+        json={
+            "name": "support",
+            "display_name": "Support",
+            "parent_ids": [user_role.id],
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+    assert response.json()["parent_ids"] == [user_role.id]
+
+    response = await async_client.get(
+        "/api/v1/rbac/roles", params={"view": "summary"}, headers=headers
+    )
+    items = {r["name"]: r for r in response.json()["items"]}
+    assert items["support"]["parent_ids"] == [user_role.id]
+    assert items["user"]["parent_ids"] == []
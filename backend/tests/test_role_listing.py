@@ -0,0 +1,89 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import service as auth_service
+from src.pagination import PaginationParams
+from src.rbac import schemas
+from src.rbac import service as rbac_service
+from src.rbac.models import SystemRoles
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _admin_headers(auth_headers, db: AsyncSession) -> dict:
+    headers = await auth_headers("roles_admin")
+    user = await auth_service.get_user_by_username(db, "roles_admin")
+    admin_role = await rbac_service.get_role_by_name(db, SystemRoles.ADMIN)
+    await rbac_service.assign_user_roles(db, user.id, [admin_role.id])
+    return headers
+
+
+async def test_role_listing_aggregates_permissions_in_one_query(
+    async_client: AsyncClient, async_db_session: AsyncSession, auth_headers
+):
+    db = async_db_session
+    headers = await _admin_headers(auth_headers, db)
+    user_read = await rbac_service.get_permission_by_target_action(db, "user", "read")
+    dashboard = await rbac_service.get_permission_by_target_action(
+        db, "dashboard", "access"
+    )
+    await rbac_service.create_role(
+        db,
+        schemas.RoleCreate(
+            name="auditor",
+            display_name="Auditor",
+            permission_ids=[user_read.id, dashboard.id],
+        ),
+    )
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        roles, total = await rbac_service.get_roles(
+            db, PaginationParams(page=1, page_size=10)
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert len(statements) == 1
+    assert total == 4
+
+    response = await async_client.get("/api/v1/rbac/roles", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 4
+    auditor = body["items"][0]
+    assert auditor["name"] == "auditor"
+    assert auditor["is_core_role"] is False
+    assert [p["permission_key"] for p in auditor["permissions"]] == [
+        "dashboard:access",
+        "user:read",
+    ]
+    assert {r["name"]: r for r in body["items"]}["admin"]["permissions"] == []
+
+
+async def test_role_listing_summary_view(
+    async_client: AsyncClient, async_db_session: AsyncSession, auth_headers
+):
+    headers = await _admin_headers(auth_headers, async_db_session)
+
+    response = await async_client.get(
+        "/api/v1/rbac/roles", params={"view": "summary"}, headers=headers
+    )
+    assert response.status_code == 200
+    items = {r["name"]: r for r in response.json()["items"]}
+    assert items["user"]["permission_keys"] == ["dashboard:access"]
+    assert items["user"]["permission_count"] == 1
+    assert "permissions" not in items["user"]
+
+    response = await async_client.get(
+        "/api/v1/rbac/roles", params={"page": 5}, headers=headers
+    )
+    assert response.json()["items"] == []
+    assert response.json()["total"] == 3
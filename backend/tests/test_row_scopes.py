@@ -0,0 +1,80 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import service as auth_service
+from src.rbac import schemas
+from src.rbac import service as rbac_service
+from src.rbac.policy import PolicyEngine
+from src.rbac.scopes import compile_row_scope
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _grant(db: AsyncSession, username: str, role: str, *keys: str) -> int:
+    permission_ids = []
+    for key in keys:
+        target, action = key.split(":")
+        permission = await rbac_service.get_permission_by_target_action(
+            db, target, action
+        )
+        permission_ids.append(permission.id)
+    role = await rbac_service.create_role(
+        db,
+        schemas.RoleCreate(
+            name=role,
+            display_name=role,
+            permission_ids=permission_ids,
+        ),
+    )
+    user = await auth_service.get_user_by_username(db, username)
+    current = [r.id for r in await rbac_service.get_user_roles(db, user.id)]
+    await rbac_service.assign_user_roles(db, user.id, current + [role.id])
+    return user.id
+
+
+async def test_user_list_is_filtered_by_created_scope(
+    async_client: AsyncClient, async_db_session: AsyncSession, auth_headers
+):
+    db = async_db_session
+    headers = await auth_headers("scope_manager")
+    await auth_headers("scope_other")
+    manager_id = await _grant(
+        db, "scope_manager", "creator", "user:write", "user:read@created"
+    )
+
+    for username in ("scoped_a", "scoped_b"):
+        response = await async_client.post(
+            "/api/v1/users",
+            json={"username": username, "password": "testpassword123"},
+            headers=headers,
+        )
+        assert response.status_code == 201
+
+    response = await async_client.get("/api/v1/users", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 2
+    assert {u["username"] for u in body["items"]} == {"scoped_a", "scoped_b"}
+
+    # 范围条件以 OR 组合，并被编译为 SQL 谓词
+    await _grant(db, "scope_manager", "self_reader", "user:read@self")
+    scope = await compile_row_scope(PolicyEngine(db, manager_id), "user", "read")
+    sql = str(scope.compile(compile_kwargs={"literal_binds": True}))
+    assert f"users.id = {manager_id}" in sql
+    assert f"users.created_by_id = {manager_id}" in sql
+
+
+async def test_user_list_requires_read_or_scope(
+    async_client: AsyncClient, async_db_session: AsyncSession, auth_headers
+):
+    headers = await auth_headers("scope_none")
+    response = await async_client.get("/api/v1/users", headers=headers)
+    assert response.status_code == 403
+
+    user_id = await _grant(async_db_session, "scope_none", "reader", "user:read")
+    # 拥有完整权限时不附加任何行过滤条件
+    policy = PolicyEngine(async_db_session, user_id)
+    assert await compile_row_scope(policy, "user", "read") is None
+    response = await async_client.get("/api/v1/users", headers=headers)
+    assert response.json()["total"] == 1
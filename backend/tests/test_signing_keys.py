@@ -0,0 +1,93 @@
+import json
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi import HTTPException
+from httpx import AsyncClient
+from jose import jwt
+
+from src.auth import codecs, keys, security
+from src.config import settings
+
+pytestmark = pytest.mark.asyncio
+
+
+def _write_private_key(path, private_key) -> None:
+    path.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+
+
+def _use_current_keys(monkeypatch) -> None:
+    signing_keys = keys.load_signing_keys()
+    monkeypatch.setattr(keys, "signing_keys", signing_keys)
+    monkeypatch.setattr(
+        codecs, "token_codec", codecs.create_codec("jose", signing_keys)
+    )
+
+
+@pytest.fixture
+def rsa_keys(tmp_path, monkeypatch):
+    for kid in ("2024-01", "2024-02"):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        _write_private_key(tmp_path / f"{kid}.pem", private_key)
+
+    monkeypatch.setattr(settings, "ALGORITHM", "RS256")
+    monkeypatch.setattr(settings, "JWT_KEYS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", "2024-01")
+    _use_current_keys(monkeypatch)
+    return tmp_path
+
+
+def test_rs256_tokens_carry_kid_and_survive_rotation(rsa_keys, monkeypatch):
+    token = security.create_access_token(subject="alice")
+    assert jwt.get_unverified_header(token)["kid"] == "2024-01"
+
+    # 下游服务只凭 JWKS 中的公钥即可验证
+    jwks = json.loads(keys.signing_keys.jwks)
+    assert {key["kid"] for key in jwks["keys"]} == {"2024-01", "2024-02"}
+    assert all("d" not in key for key in jwks["keys"])
+    claims = jwt.decode(token, jwks, algorithms=["RS256"])
+    assert claims["sub"] == "alice"
+
+    # 切换签名密钥后，旧密钥签发的令牌仍然有效
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", "2024-02")
+    _use_current_keys(monkeypatch)
+    assert security.decode_and_verify_token(token)["sub"] == "alice"
+    new_token = security.create_access_token(subject="alice")
+    assert jwt.get_unverified_header(new_token)["kid"] == "2024-02"
+
+
+def test_unknown_kid_is_rejected(rsa_keys):
+    forged = jwt.encode(
+        {"sub": "mallory"},
+        (rsa_keys / "2024-01.pem").read_text(),
+        algorithm="RS256",
+        headers={"kid": "missing"},
+    )
+    with pytest.raises(HTTPException):
+        security.decode_and_verify_token(forged)
+
+
+def test_es256_keys(tmp_path, monkeypatch):
+    _write_private_key(tmp_path / "ec-1.pem", ec.generate_private_key(ec.SECP256R1()))
+    monkeypatch.setattr(settings, "ALGORITHM", "ES256")
+    monkeypatch.setattr(settings, "JWT_KEYS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", "ec-1")
+    _use_current_keys(monkeypatch)
+
+    token = security.create_access_token(subject="bob")
+    assert security.decode_and_verify_token(token)["sub"] == "bob"
+    assert json.loads(keys.signing_keys.jwks)["keys"][0]["kty"] == "EC"
+
+
+async def test_jwks_endpoint(async_client: AsyncClient, rsa_keys):
+    response = await async_client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.content == keys.signing_keys.jwks
+    assert len(response.json()["keys"]) == 2
@@ -0,0 +1,69 @@
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from src.auth import security
+from src.auth.token_cache import TokenCache, token_cache
+
+
+def test_cache_hit_until_exp_and_lru_eviction():
+    cache = TokenCache(max_entries=2, negative_ttl=5, max_token_bytes=4096)
+    now = time.time()
+
+    for name in ("a", "b", "c"):
+        cache.put_valid(cache.digest(name), name, {"sub": name, "exp": now + 60})
+    cache.put_valid(cache.digest("d"), "d", {"sub": "d", "exp": now - 1})
+
+    # "a"、"b" 被 LRU 淘汰，"d" 已过期（读取时移除）
+    assert cache.get(cache.digest("a")) == (False, None)
+    assert cache.get(cache.digest("d")) == (False, None)
+    assert cache.get(cache.digest("c")) == (True, {"sub": "c", "exp": now + 60})
+
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["evictions"] == 2
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_oversized_tokens_are_not_cached():
+    cache = TokenCache(max_entries=10, negative_ttl=5, max_token_bytes=8)
+    token = "x" * 9
+    cache.put_valid(cache.digest(token), token, {"exp": time.time() + 60})
+    assert cache.get(cache.digest(token)) == (False, None)
+
+
+def test_invalid_tokens_do_not_evict_valid_ones():
+    cache = TokenCache(
+        max_entries=2, negative_ttl=5, max_token_bytes=4096, negative_max_entries=2
+    )
+    payload = {"sub": "valid", "exp": time.time() + 60}
+    cache.put_valid(cache.digest("valid"), "valid", payload)
+
+    for i in range(10):
+        cache.put_invalid(cache.digest(f"garbage-{i}"))
+
+    assert cache.get(cache.digest("valid")) == (True, payload)
+    assert cache.get(cache.digest("garbage-9")) == (True, None)
+    assert cache.get(cache.digest("garbage-0")) == (False, None)
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["negative_size"] == 2
+
+
+def test_decode_uses_positive_and_negative_cache():
+    token_cache.clear()
+    token = security.create_access_token("cached_user", timedelta(minutes=5))
+
+    assert security.decode_and_verify_token(token)["sub"] == "cached_user"
+    hit, payload = token_cache.get(token_cache.digest(token))
+    assert hit and payload["sub"] == "cached_user"
+
+    garbage = "not-a-jwt"
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            security.decode_and_verify_token(garbage)
+        assert exc_info.value.status_code == 401
+    assert token_cache.stats()["negative_hits"] >= 1
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from src.auth import keys
+from src.auth.codecs import CODECS, InvalidTokenError, create_codec
+
+
+def _codec(name: str):
+    if name == "pyjwt":
+        pytest.importorskip("jwt")
+    return create_codec(name, keys.load_signing_keys())
+
+
+@pytest.mark.parametrize("name", sorted(CODECS))
+def test_round_trip_and_cross_backend_compatibility(name):
+    codec = _codec(name)
+    claims = {"sub": "alice", "exp": int(time.time()) + 60, "iat": time.time()}
+
+    token = codec.encode(claims)
+    assert codec.decode(token) == claims
+    # 各后端签发的令牌可以互相验证
+    assert _codec("jose").decode(token) == claims
+    assert codec.decode(_codec("jose").encode(claims)) == claims
+
+
+@pytest.mark.parametrize("name", sorted(CODECS))
+def test_rejects_expired_tampered_and_unsigned_tokens(name):
+    codec = _codec(name)
+
+    expired = codec.encode({"sub": "alice", "exp": int(time.time()) - 10})
+    with pytest.raises(InvalidTokenError):
+        codec.decode(expired)
+
+    header, payload, signature = codec.encode(
+        {"sub": "alice", "exp": int(time.time()) + 60}
+    ).split(".")
+    forged_payload = payload[:-2] + ("AA" if payload[-2:] != "AA" else "BB")
+    with pytest.raises(InvalidTokenError):
+        codec.decode(f"{header}.{forged_payload}.{signature}")
+
+    # alg=none
+    unsigned = "eyJhbGciOiJub25lIiwidHlwIjoiSldUIn0." + payload + "."
+    with pytest.raises(InvalidTokenError):
+        codec.decode(unsigned)
+
+    with pytest.raises(InvalidTokenError):
+        codec.decode("not-a-jwt")
+
+
+def test_native_codec_requires_shared_secret():
+    rs256_keys = keys.SigningKeys(algorithm="RS256", signing_key=None)
+    with pytest.raises(RuntimeError):
+        create_codec("native", rs256_keys)
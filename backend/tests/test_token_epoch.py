@@ -0,0 +1,104 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth import security, token_epoch
+from src.auth import service as auth_service
+from src.auth.token_epoch import is_token_before_epoch, revoke_user_tokens
+from src.users import schemas as user_schemas
+from src.users import service as user_service
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _login(async_client: AsyncClient, username: str, password: str) -> str:
+    response = await async_client.post(
+        "/api/v1/auth/token", data={"username": username, "password": password}
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+async def test_logout_all_revokes_every_session(
+    async_client: AsyncClient, register_and_login
+):
+    first = (await register_and_login("epoch_user"))["access_token"]
+    second = await _login(async_client, "epoch_user", "testpassword123")
+
+    response = await async_client.post(
+        "/api/v1/auth/logout-all", headers={"Authorization": f"Bearer {first}"}
+    )
+    assert response.status_code == 200
+
+    for token in (first, second):
+        response = await async_client.get(
+            "/api/v1/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token has been revoked"
+
+    # 立即重新登录得到的令牌不受影响
+    fresh = await _login(async_client, "epoch_user", "testpassword123")
+    response = await async_client.get(
+        "/api/v1/users/me", headers={"Authorization": f"Bearer {fresh}"}
+    )
+    assert response.status_code == 200
+
+
+async def test_change_password_revokes_existing_tokens(
+    async_client: AsyncClient, register_and_login
+):
+    token = (await register_and_login("epoch_pw_user"))["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.post(
+        "/api/v1/auth/change-password",
+        json={"current_password": "testpassword123", "new_password": "newpassword456"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+    response = await async_client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+
+    fresh = await _login(async_client, "epoch_pw_user", "newpassword456")
+    response = await async_client.get(
+        "/api/v1/users/me", headers={"Authorization": f"Bearer {fresh}"}
+    )
+    assert response.status_code == 200
+
+
+async def test_token_without_iat_is_revoked_by_epoch(redis_client):
+    assert not await is_token_before_epoch(redis_client, 5151, {"sub": "someone"})
+
+    await revoke_user_tokens(redis_client, 5151)
+    assert await is_token_before_epoch(redis_client, 5151, {"sub": "someone"})
+
+    payload = security.decode_and_verify_token(
+        security.create_access_token(subject="someone")
+    )
+    assert not await is_token_before_epoch(redis_client, 5151, payload)
+
+
+async def test_password_reset_survives_revocation_failure(
+    async_client: AsyncClient,
+    async_db_session: AsyncSession,
+    monkeypatch,
+    register_and_login,
+):
+    await register_and_login("epoch_reset_user")
+    user = await auth_service.get_user_by_username(async_db_session, "epoch_reset_user")
+
+    async def failing_revoke(redis_client, user_id):
+        raise ConnectionError("redis unavailable")
+
+    monkeypatch.setattr(token_epoch, "revoke_user_tokens", failing_revoke)
+
+    # 密码已提交，吊销失败只记录日志
+    updated = await user_service.update_user(
+        async_db_session,
+        user.id,
+        user_schemas.UserUpdate(password="resetpassword789"),
+    )
+    assert updated is not None
+    await _login(async_client, "epoch_reset_user", "resetpassword789")
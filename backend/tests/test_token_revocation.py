@@ -0,0 +1,54 @@
+import pytest
+from httpx import AsyncClient
+
+from src.auth import security
+from src.auth.blacklist import BloomFilter, RevocationFilter
+from src.auth.constants import REDIS_BLACKLIST_JTI_PREFIX
+from src.config import settings
+
+pytestmark = pytest.mark.asyncio
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+async def test_logout_revokes_token_for_remaining_lifetime(
+    async_client: AsyncClient, redis_client
+):
+    payload = {"username": "revoke_user", "password": "testpassword123"}
+    response = await async_client.post("/api/v1/auth/register", json=payload)
+    assert response.status_code == 201
+    response = await async_client.post("/api/v1/auth/token", data=payload)
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.post("/api/v1/auth/logout", headers=headers)
+    assert response.status_code == 200
+
+    claims = security.decode_and_verify_token(token)
+    key = f"{REDIS_BLACKLIST_JTI_PREFIX}{claims['jti']}"
+    ttl = await redis_client.ttl(key)
+    assert 0 < ttl <= settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    response = await async_client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+
+
+async def test_filter_rebuilds_from_redis(redis_client):
+    await redis_client.set(f"{REDIS_BLACKLIST_JTI_PREFIX}rebuilt-jti", "1", ex=60)
+
+    revocation_filter = RevocationFilter(capacity=100, error_rate=0.01)
+    await revocation_filter.rebuild(redis_client)
+
+    assert "rebuilt-jti" in revocation_filter._bloom
+    assert await revocation_filter.is_revoked(redis_client, "rebuilt-jti")
+    assert not await revocation_filter.is_revoked(redis_client, "unknown-jti")
@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from src.auth.user_cache import UserSnapshot, UserSnapshotCache, user_cache
+from src.pubsub import invalidation_bus
+from src.users import schemas as user_schemas
+from src.users import service as user_service
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def bus_listening(monkeypatch):
+    # 缓存只在消息总线监听时启用
+    monkeypatch.setattr(invalidation_bus, "_listening", True)
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+def _snapshot(user_id: int, username: str) -> UserSnapshot:
+    now = datetime.now(timezone.utc)
+    return UserSnapshot(
+        id=user_id, username=username, email=None, created_at=now, updated_at=now
+    )
+
+
+def test_cache_lookup_eviction_and_stale_loads(bus_listening):
+    cache = UserSnapshotCache(max_entries=2, ttl=60)
+    for user_id in (1, 2, 3):
+        cache.put(_snapshot(user_id, f"user{user_id}"), cache.generation)
+
+    assert cache.get(user_id=1) is None  # 已被淘汰
+    assert cache.get(username="user3").id == 3
+    assert cache.get(user_id=2).username == "user2"
+
+    # 加载期间发生失效时，加载结果不写入缓存
+    generation = cache.generation
+    cache.invalidate(2)
+    cache.put(_snapshot(2, "user2"), generation)
+    assert cache.get(user_id=2) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["evictions"] == 1
+
+
+def test_cache_disabled_without_bus():
+    cache = UserSnapshotCache(max_entries=10, ttl=60)
+    cache.put(_snapshot(1, "user1"), cache.generation)
+    assert cache.get(user_id=1) is None
+    assert cache.stats()["size"] == 0
+
+
+async def test_update_user_invalidates_snapshot(
+    async_client: AsyncClient, async_db_session, bus_listening
+):
+    payload = {"username": "snapshot_user", "password": "testpassword123"}
+    response = await async_client.post("/api/v1/auth/register", json=payload)
+    user_id = response.json()["id"]
+    response = await async_client.post("/api/v1/auth/token", data=payload)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    for _ in range(2):
+        response = await async_client.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 200
+    assert user_cache.get(user_id=user_id) is not None
+
+    await user_service.update_user(
+        async_db_session,
+        user_id,
+        user_schemas.UserUpdate(email="snapshot@example.com"),
+    )
+    assert user_cache.get(user_id=user_id) is None
+
+    response = await async_client.get("/api/v1/users/me", headers=headers)
+    assert response.json()["email"] == "snapshot@example.com"